@@ -0,0 +1,10 @@
+"""
+Performance benchmarks for the load -> validate -> build pipeline.
+
+These are not run as part of the test suite. Run them with:
+    python -m benchmarks
+
+Microbenchmarks run against synthetic data derived from source_data/
+at several scale factors, to expose operations that grow superlinearly.
+Results are appended to a history file so that runs can be compared.
+"""
@@ -0,0 +1,32 @@
+import click
+
+from . import harness
+from . import suite
+
+@click.command()
+@click.option('--scales', default='1,10', help="Comma separated scale factors for synthetic data")
+@click.option('--filter', 'name_filter', default=None, help="Only run benchmarks containing this text")
+@click.option('--history', default='benchmarks/history.jsonl', help="File to store results in")
+@click.option('--save/--no-save', default=True, help="Whether to append results to the history file")
+def run(scales, name_filter, history, save):
+    "Runs the benchmark suite, comparing against the last saved run"
+    scales = [int(s) for s in scales.split(',')]
+    results = harness.run_benchmarks(scales, name_filter=name_filter)
+
+    flagged = harness.find_superlinear(results)
+    if flagged:
+        print("\nWarning: These benchmarks grow faster than the data")
+        for name, scale, growth in flagged:
+            print(f"{name} x{scale}: {growth:.1f}x slower than the smallest scale")
+
+    previous_runs = harness.load_history(history)
+    if previous_runs:
+        print(f"\nCompared to the run at commit {previous_runs[-1]['commit']}")
+        for name, scale, old, new, ratio in harness.compare(previous_runs[-1]['results'], results):
+            print(f"{name} x{scale}: {old * 1000:.2f}ms -> {new * 1000:.2f}ms ({ratio - 1:+.1%})")
+
+    if save:
+        harness.save_history(history, results)
+
+if __name__ == '__main__':
+    run()
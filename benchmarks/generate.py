@@ -0,0 +1,15 @@
+import click
+
+from . import synthetic
+
+@click.command()
+@click.argument('output_dir', type=click.Path(file_okay=False))
+@click.option('--scale', default=10, help="Number of copies of each entry to generate")
+def generate(output_dir, scale):
+    """Writes a synthetic copy of source_data/ to OUTPUT_DIR that is SCALE times larger.
+    Load it using load_data(OUTPUT_DIR) or load_data_processed(OUTPUT_DIR)"""
+    counts = synthetic.generate_scaled_source(output_dir, scale)
+    print(f"Wrote {sum(counts.values())} rows in {len(counts)} files to {output_dir}")
+
+if __name__ == '__main__':
+    generate()
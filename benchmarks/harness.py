@@ -0,0 +1,112 @@
+"""
+A small benchmark runner. 
+
+Benchmarks are registered using the benchmark decorator.
+The decorated function receives a scale factor and returns the function to time,
+allowing setup work to be excluded from the measurement.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+registry = {}
+
+# Benchmarks stop repeating once they've used this much time
+TIME_BUDGET = 2.0
+
+def benchmark(name=None, *, scalable=True, slow=False):
+    """Decorator that registers a benchmark setup function.
+    Non-scalable benchmarks only run once, at scale 1.
+    Slow benchmarks only run when explicitly selected with a filter."""
+    def deco(fn):
+        registry[name or fn.__name__] = (fn, scalable, slow)
+        return fn
+    return deco
+
+def time_fn(fn, *, max_repeat=10):
+    "Times a function several times, returning (min, median) in seconds"
+    timings = []
+    budget_start = time.perf_counter()
+    for _ in range(max_repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+        if time.perf_counter() - budget_start > TIME_BUDGET:
+            break
+    return min(timings), statistics.median(timings)
+
+def run_benchmarks(scales, *, name_filter=None):
+    """Runs all registered benchmarks at each scale.
+    Returns a mapping of benchmark name -> scale (as a string) -> { min, median }
+    """
+    results = {}
+    for name, (setup_fn, scalable, slow) in registry.items():
+        if name_filter and name_filter not in name:
+            continue
+        if slow and not name_filter:
+            continue
+
+        for scale in (scales if scalable else [1]):
+            fn = setup_fn(scale)
+            best, median = time_fn(fn)
+            results.setdefault(name, {})[str(scale)] = { 'min': best, 'median': median }
+            print(f"{name} x{scale}: min {best * 1000:.2f}ms, median {median * 1000:.2f}ms")
+
+    return results
+
+def find_superlinear(results, *, tolerance=2.0):
+    """Returns a list of (name, scale, growth) for benchmarks whose time grows
+    more than tolerance times faster than the scale factor, relative to the smallest scale."""
+    flagged = []
+    for name, by_scale in results.items():
+        scales = sorted(by_scale.keys(), key=float)
+        if len(scales) < 2:
+            continue
+        base_scale = float(scales[0])
+        base_time = by_scale[scales[0]]['min']
+        for scale in scales[1:]:
+            growth = by_scale[scale]['min'] / base_time if base_time else 0
+            if growth > (float(scale) / base_scale) * tolerance:
+                flagged.append((name, scale, growth))
+    return flagged
+
+def _current_commit():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_history(location):
+    "Loads all previous runs from a json lines history file"
+    if not os.path.exists(location):
+        return []
+    with open(location, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def save_history(location, results):
+    "Appends a run to the json lines history file"
+    record = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'commit': _current_commit(),
+        'results': results
+    }
+    with open(location, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+def compare(previous, current):
+    """Returns a list of (name, scale, previous min, current min, change ratio)
+    for benchmarks that exist in both runs"""
+    comparisons = []
+    for name, by_scale in current.items():
+        for scale, timing in by_scale.items():
+            old = previous.get(name, {}).get(scale, None)
+            if not old or not old['min']:
+                continue
+            ratio = timing['min'] / old['min']
+            comparisons.append((name, scale, old['min'], timing['min'], ratio))
+    return comparisons
@@ -0,0 +1,129 @@
+"""
+Benchmark definitions. Importing this module registers all benchmarks.
+"""
+
+import contextlib
+import functools
+import io
+import os
+import subprocess
+import sys
+import tempfile
+
+from mhdata.io import DataMap, merge_list
+from mhdata.io.csv import read_csv
+from mhdata.io.functions import to_basic
+from mhdata.util import group_fields
+
+from .harness import benchmark
+from . import synthetic
+
+ROOT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+@functools.lru_cache(maxsize=None)
+def grouped_item_rows(scale):
+    rows = synthetic.scaled_item_rows(scale)
+    return [group_fields(r, groups=['name', 'description']) for r in rows]
+
+@functools.lru_cache(maxsize=None)
+def item_map(scale):
+    result = DataMap(languages=['en'])
+    result.extend(grouped_item_rows(scale))
+    return result
+
+@functools.lru_cache(maxsize=None)
+def processed_data():
+    from mhdata.load import load_data_processed
+    with contextlib.redirect_stdout(io.StringIO()):
+        return load_data_processed()
+
+@benchmark()
+def read_csv_translations(scale):
+    location = synthetic.write_scaled_csv('items/item_base_translations.csv', scale)
+    return lambda: read_csv(location)
+
+@benchmark()
+def group_fields_items(scale):
+    rows = synthetic.scaled_item_rows(scale)
+    return lambda: [group_fields(r, groups=['name', 'description']) for r in rows]
+
+@benchmark()
+def datamap_insert(scale):
+    rows = grouped_item_rows(scale)
+    return lambda: DataMap(languages=['en']).extend(rows)
+
+@benchmark()
+def datamap_id_of(scale):
+    data_map = item_map(scale)
+    names = [row['name']['en'] for row in grouped_item_rows(scale)]
+    return lambda: [data_map.id_of('en', name) for name in names]
+
+@benchmark()
+def merge_list_items(scale):
+    data_map = item_map(scale)
+    rows = [{ 'name_en': r['name']['en'], 'value': idx } for idx, r in enumerate(grouped_item_rows(scale))]
+    # merge_list consumes the key fields of the rows, so each run needs a fresh copy
+    return lambda: merge_list(data_map, [dict(r) for r in rows], key='extra', many=True)
+
+@benchmark()
+def to_basic_items(scale):
+    data_map = item_map(scale)
+    return lambda: to_basic(data_map)
+
+@benchmark()
+def schema_load_items(scale):
+    from mhdata.load import schema
+    item_schema = schema.ItemSchema()
+    rows = synthetic.scaled_item_rows(scale)
+    return lambda: item_schema.load(rows, many=True)
+
+@benchmark(scalable=False)
+def load_data(scale):
+    from mhdata.load import load_data as load_data_fn
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            load_data_fn()
+    return run
+
+@benchmark(scalable=False)
+def validate(scale):
+    from mhdata.load import validate as validate_fn
+    data = processed_data()
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            validate_fn(data)
+    return run
+
+@benchmark(scalable=False)
+def build_sql_database(scale):
+    from mhdata.build import build_sql_database as build_fn
+    data = processed_data()
+    output = os.path.join(tempfile.mkdtemp(prefix='mhdata_bench_'), 'mhw.db')
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            build_fn(output, data)
+    return run
+
+@benchmark(scalable=False)
+def build_py(scale):
+    "Runs build.py in a subprocess, including interpreter startup and imports"
+    working_dir = tempfile.mkdtemp(prefix='mhdata_bench_')
+    script = os.path.join(ROOT_DIRECTORY, 'build.py')
+    return lambda: subprocess.run(
+        [sys.executable, script], cwd=working_dir, check=True, stdout=subprocess.DEVNULL)
+
+@benchmark(slow=True)
+def pipeline_scaled(scale):
+    "Loads, validates, and builds a synthetic copy of source_data/ scaled by scale"
+    from mhdata.load import load_data_processed
+    from mhdata.build import build_sql_database as build_fn
+
+    working_dir = tempfile.mkdtemp(prefix='mhdata_bench_')
+    source_path = os.path.join(working_dir, 'source_data')
+    synthetic.generate_scaled_source(source_path, scale)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = load_data_processed(source_path)
+            build_fn(os.path.join(working_dir, 'mhw.db'), data)
+    return run
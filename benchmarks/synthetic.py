@@ -0,0 +1,143 @@
+"""
+Generators for synthetic data derived from the real source_data/ folder.
+
+Rows are replicated scale times. Copies after the first have a numbered suffix
+added to every name field and name reference, so that names stay unique in every language,
+and have their ids offset so that ids stay unique.
+"""
+
+import csv
+import os
+import tempfile
+
+from mhdata.io import data_path
+from mhdata.io.csv import read_csv, save_csv
+
+def is_name_field(field):
+    return field.startswith('name_') or field.startswith('base_name_')
+
+# Columns that refer to the names of scaled entities.
+# Each copy suffixes these the same way as the names themselves.
+reference_columns = (
+    'previous_en', 'unlocks', 'skill', 'item_en', 'monster_en',
+    'result', 'first', 'second',
+    'monster', 'bonus', 'head', 'chest', 'arms', 'waist', 'legs',
+    'skill1_name', 'skill2_name',
+    'item1_name', 'item2_name', 'item3_name', 'item4_name',
+)
+
+# Columns containing ids. Each copy offsets these by the same amount.
+id_columns = ('id', 'base_id')
+
+def _copy_suffix(copy_idx):
+    return f" #{copy_idx}"
+
+def _calculate_id_stride(rows):
+    "Returns an id offset larger than every id in rows"
+    max_id = 0
+    for row in rows:
+        for column in id_columns:
+            if row.get(column, None):
+                max_id = max(max_id, int(row[column]))
+    return max_id + 1
+
+def scale_rows(rows, scale, *, id_stride=None):
+    """Returns a new list of rows, where each row is repeated scale times.
+    Copies after the first suffix all names and name references, and offset all ids by id_stride,
+    so that each copy is self-consistent. id_stride defaults to one more than the largest id in rows."""
+    if id_stride is None:
+        id_stride = _calculate_id_stride(rows)
+
+    results = []
+    for copy_idx in range(scale):
+        suffix = _copy_suffix(copy_idx)
+        for row in rows:
+            new_row = dict(row)
+            if copy_idx > 0:
+                for key, value in row.items():
+                    if not value:
+                        continue
+                    if is_name_field(key) or key in reference_columns:
+                        new_row[key] = value + suffix
+                    elif key in id_columns:
+                        new_row[key] = str(int(value) + id_stride * copy_idx)
+            results.append(new_row)
+    return results
+
+def read_source_csv(relative_path):
+    "Reads a csv from the source_data/ folder"
+    return read_csv(os.path.join(data_path, relative_path))
+
+def scaled_item_rows(scale):
+    """Returns item base rows with translations joined in, scaled by scale.
+    These rows are in the same format as a csv row, before grouping."""
+    base_rows = read_source_csv('items/item_base.csv')
+    translations = { r['name_en']:r for r in read_source_csv('items/item_base_translations.csv') }
+
+    rows = []
+    for row in base_rows:
+        rows.append({ **row, **translations.get(row['name_en'], {}) })
+    return scale_rows(rows, scale)
+
+def write_scaled_csv(relative_path, scale, directory=None):
+    """Writes a scaled copy of a source_data csv to a temporary directory.
+    Returns the location of the written file"""
+    directory = directory or tempfile.mkdtemp(prefix='mhdata_bench_')
+    rows = scale_rows(read_source_csv(relative_path), scale)
+    location = os.path.join(directory, os.path.basename(relative_path))
+
+    # The csv writer expects strings, not nulls
+    rows = [{ k:(v if v is not None else '') for k, v in row.items() } for row in rows]
+    save_csv(rows, location)
+    return location
+
+
+# Files that are shared reference data. These are copied as is, and never scaled.
+# Anything referencing them (like a reward's condition_en or a quest's location_en) stays valid.
+unscaled_files = (
+    'decorations/decoration_droprates.csv',
+    'locations/gather_stacks.csv',
+    'locations/location_base.csv',
+    'locations/location_camps.csv',
+    'locations/location_items.csv',
+    'monsters/reward_conditions_base.csv',
+    'weapons/weapon_ammo.csv',
+    'weapons/weapon_melody_base.csv',
+    'weapons/weapon_melody_base_translations.csv',
+    'weapons/weapon_melody_notes.csv',
+)
+
+def _find_source_csvs(source_path):
+    "Returns the paths of all csv files relative to source_path"
+    results = []
+    for dirpath, _, filenames in os.walk(source_path):
+        for filename in filenames:
+            if filename.endswith('.csv'):
+                full_path = os.path.join(dirpath, filename)
+                results.append(os.path.relpath(full_path, source_path).replace(os.sep, '/'))
+    return sorted(results)
+
+def generate_scaled_source(output_path, scale, source_path=data_path):
+    """Writes a copy of the source data folder to output_path that has scale times as many entries.
+    The result can be loaded using load_data(output_path).
+    Returns a mapping of relative file path -> number of rows written."""
+    relative_paths = _find_source_csvs(source_path)
+    scaled_paths = [p for p in relative_paths if p not in unscaled_files]
+    id_stride = _calculate_id_stride(
+        [row for p in scaled_paths for row in read_csv(os.path.join(source_path, p))])
+
+    counts = {}
+    for relative_path in relative_paths:
+        with open(os.path.join(source_path, relative_path), encoding='utf-8') as f:
+            fields = next(csv.reader(f))
+        rows = read_csv(os.path.join(source_path, relative_path))
+
+        if relative_path not in unscaled_files:
+            rows = scale_rows(rows, scale, id_stride=id_stride)
+
+        destination = os.path.join(output_path, relative_path)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        save_csv(rows, destination, fields=fields)
+        counts[relative_path] = len(rows)
+
+    return counts
@@ -1,7 +1,9 @@
 import click
+import os
 import sys
 
-from mhdata.merge import mhwdb, binary
+# The merge modules import requests, regex and pycryptodome,
+# so they are imported by the commands that use them
 
 # todo: organize
 
@@ -14,17 +16,87 @@ def binary_cmd():
     "Commands to work with binary data."
 
 @binary_cmd.command()
-def update():
+@click.option('--dry-run', is_flag=True, help="Print the files that would change without writing them")
+@click.option('--changed-only', is_flag=True, help="Only run the stages that read game files changed since the last update")
+@click.option('--manifest', 'manifest_path', type=click.Path(dir_okay=False), default=None,
+    help="Manifest of the game files read by the last update. Defaults to mergedchunks.manifest.json")
+def update(dry_run, changed_only, manifest_path):
     "Performs an update using ingame binaries"
-    binary.update_all()
+    import contextlib
+    from mhdata.merge import binary
+    from mhdata.merge.binary.scheduler import StageOutput
+
+    # Stages run concurrently, so what each one prints is kept together
+    stage_output = StageOutput(sys.stdout)
+    with contextlib.redirect_stdout(stage_output):
+        binary.update_all(dry_run=dry_run, changed_only=changed_only, manifest_path=manifest_path,
+            stage_output=stage_output)
 
 @binary_cmd.command()
-@click.argument('file', type=click.Path(exists=True))
-@click.argument('outfile', type=click.File('w', 'utf8'))
-def dump(file, outfile: click.File):
-    "Parses and dumps the file into stdout"
-    dumped = binary.dump_file(click.format_filename(file))
-    outfile.write(dumped)
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+@click.argument('outfile', type=click.File('w', 'utf8'), default='-')
+@click.option('--type', 'file_type', default=None, help="File type to parse as, instead of detecting it")
+def dump(file, outfile: click.File, file_type):
+    "Parses a binary file and writes its records to OUTFILE (or stdout) as NDJSON"
+    from mhdata.merge import binary
+    binary.dump_file(click.format_filename(file), outfile, file_type)
+
+@binary_cmd.command(name='dump-tree')
+@click.argument('root', type=click.Path(exists=True, file_okay=False))
+@click.argument('output_dir', type=click.Path(file_okay=False))
+@click.option('--workers', type=int, default=None, help="Number of worker processes. Defaults to the number of cpus")
+def dump_tree(root, output_dir, workers):
+    "Dumps every binary file of a known type under ROOT to OUTPUT_DIR as NDJSON files, in parallel"
+    from mhdata.merge.binary import dump
+
+    results = dump.dump_tree(root, output_dir, max_workers=workers)
+    errors = 0
+    for rel_path, result in results.items():
+        if isinstance(result, Exception):
+            errors += 1
+            print(f"ERROR: Failed to dump {rel_path}: {result}")
+    print(f"Dumped {len(results) - errors} files to {output_dir}")
+    if errors:
+        raise click.ClickException(f"{errors} files could not be dumped")
+
+@binary_cmd.group()
+def manifest():
+    "Commands to compare the game files read by updates between game patches"
+
+@manifest.command()
+@click.argument('output', type=click.Path(dir_okay=False))
+@click.option('--manifest', 'manifest_path', type=click.Path(exists=True, dir_okay=False), default=None,
+    help="Manifest of the last update, which lists the files to include. Defaults to mergedchunks.manifest.json")
+def snapshot(output, manifest_path):
+    "Writes the current state of the game files read by the last update to OUTPUT"
+    from mhdata.binary.load.manifest import Manifest, get_default_manifest_path
+
+    manifest_path = manifest_path or get_default_manifest_path()
+    if not os.path.exists(manifest_path):
+        raise click.ClickException(f"No manifest found at {manifest_path}, run an update first")
+    result = Manifest.load(manifest_path).snapshot()
+    result.save(output)
+    print(f"Saved a manifest of {len(result.files)} files to {output}")
+
+@manifest.command(name='diff')
+@click.argument('old', type=click.Path(exists=True, dir_okay=False))
+@click.argument('new', type=click.Path(exists=True, dir_okay=False))
+def manifest_diff(old, new):
+    "Lists the game files that changed between two manifests, and the update stages they affect"
+    from mhdata.binary.load.manifest import Manifest
+
+    old_manifest = Manifest.load(old)
+    diff = old_manifest.compare(Manifest.load(new))
+    for label, paths in (('Added', diff.added), ('Removed', diff.removed), ('Changed', diff.changed)):
+        for rel_path in paths:
+            stages = ", ".join(sorted(old_manifest.stages_of(rel_path))) or "no stage"
+            print(f"{label}: {rel_path} ({stages})")
+
+    stages = old_manifest.affected_stages(diff)
+    if stages is None:
+        print("Affected stages: all")
+    else:
+        print("Affected stages: " + (", ".join(sorted(stages)) or "none"))
 
 if __name__ == '__main__':
     binary_cmd()
\ No newline at end of file
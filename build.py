@@ -1,8 +1,9 @@
 import click
+import os
 import sys
 
-from mhdata import build
-from mhdata.load import load_data_processed
+# Modules that import SQLAlchemy or marshmallow are imported by the commands that use them,
+# so that --help and light commands start quickly
 
 # Python 3.6 dictionaries preserve insertion order,
 # and python 3.7 officially added it to the spec.
@@ -14,11 +15,184 @@ if sys.version_info < (3,6):
     print("When creating a final build, make sure to use a newer version of python.")
 
 
-@click.command()
-def build_cmd():
-    data = load_data_processed()
+@click.group(invoke_without_command=True)
+@click.option('--lookups/--no-lookups', default=True, help="Whether to build denormalized lookup tables")
+@click.option('--search/--no-search', default=True, help="Whether to build the full-text search tables")
+@click.option('--profile', is_flag=True, help="Write per-stage timings to build_profile.json")
+@click.option('--cprofile', is_flag=True, help="Write a cProfile dump to build_profile.pstats")
+@click.option('--daemon', is_flag=True, help="Build using a running daemon (see the serve command) if there is one")
+@click.pass_context
+def build_cmd(ctx, lookups, search, profile, cprofile, daemon):
+    "Builds mhw.db from the source_data/ folder when no subcommand is given"
+    if ctx.invoked_subcommand is not None:
+        return
+
     output_filename = 'mhw.db'
-    build.build_sql_database(output_filename, data)
-    
+
+    if daemon:
+        from mhdata.daemon import connect, DaemonError
+        from mhdata.io import data_path
+
+        client = connect(source_path=data_path)
+        if client:
+            try:
+                result = client.build(os.path.abspath(output_filename), lookups=lookups, search=search)
+            except DaemonError as ex:
+                raise click.ClickException(str(ex))
+            if result['steps'] is not None:
+                print(f"Rebuilt {len(result['steps'])} steps: {', '.join(result['steps'])}")
+            print(f"Daemon built {result['output']} in {result['seconds']:.2f}s")
+            return
+        print("No daemon is running, building without one")
+
+    from mhdata import build
+    from mhdata.load import load_data_processed
+    from mhdata.util import profiling
+
+    if profile:
+        profiling.enable(profiling.BuildProfiler())
+    if cprofile:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    data = load_data_processed()
+
+    build.build_sql_database(output_filename, data, lookup_tables=lookups, search_index=search)
+
+    if cprofile:
+        profiler.disable()
+        profiler.dump_stats('build_profile.pstats')
+        print("Wrote cProfile dump to build_profile.pstats")
+    if profile:
+        profiling.disable().save_report('build_profile.json')
+        print("Wrote build profile to build_profile.json")
+
+@build_cmd.command()
+@click.argument('old', type=click.Path(exists=True, dir_okay=False))
+@click.argument('new', type=click.Path(exists=True, dir_okay=False))
+@click.option('--output', '-o', default='mhw.patch.json', help="Location to write the changeset")
+def diff(old, new, output):
+    "Creates a changeset that updates the OLD database to the NEW one"
+    from mhdata.build import diff as dbdiff
+
+    changeset = dbdiff.diff_databases(old, new)
+    patch_size = dbdiff.save_changeset(changeset, output)
+
+    for table_name, (inserted, updated, deleted) in dbdiff.count_changes(changeset).items():
+        print(f"{table_name}: {inserted} inserted, {updated} updated, {deleted} deleted")
+
+    db_size = os.path.getsize(new)
+    print(f"Changeset is {patch_size} bytes, database is {db_size} bytes " +
+        f"({patch_size / db_size:.2%} of the full database)")
+
+@build_cmd.command()
+@click.argument('database', type=click.Path(exists=True, dir_okay=False))
+@click.argument('changeset', type=click.Path(exists=True, dir_okay=False))
+def patch(database, changeset):
+    "Applies a changeset created by the diff command to DATABASE"
+    from mhdata.build import diff as dbdiff
+
+    dbdiff.apply_changeset(database, dbdiff.load_changeset(changeset))
+    print(f"Applied changeset to {database}")
+
+@build_cmd.command()
+@click.argument('output_dir', type=click.Path(file_okay=False))
+@click.option('--format', 'file_format', default='ndjson',
+    type=click.Choice(['ndjson', 'parquet', 'arrow']), help="Output file format")
+def export(output_dir, file_format):
+    "Exports the processed source data to OUTPUT_DIR as one file per table"
+    from mhdata.build import export as data_export
+    from mhdata.load import load_data_processed
+
+    data = load_data_processed()
+    counts = data_export.export_data(data, output_dir, file_format=file_format)
+    for table_name, count in counts.items():
+        print(f"Exported {count} rows to {table_name}")
+
+@build_cmd.command(name='search')
+@click.argument('database', type=click.Path(exists=True, dir_okay=False))
+@click.argument('query')
+@click.option('--lang', default='en', help="Language to search in")
+@click.option('--benchmark', is_flag=True, help="Compare query time against a LIKE scan")
+def search_cmd(database, query, lang, benchmark):
+    "Searches the full-text index of a built DATABASE"
+    import sqlite3
+    from mhdata.build import search
+
+    conn = sqlite3.connect(database)
+    try:
+        for entity_type, entity_id, name in search.search(conn, query, lang):
+            print(f"{entity_type} {entity_id}: {name}")
+
+        if benchmark:
+            for _, _, fts_time, like_time, _ in search.benchmark_search(conn, [(query, lang)]):
+                print(f"Full-text search: {fts_time * 1000:.3f}ms, LIKE scan: {like_time * 1000:.3f}ms")
+    finally:
+        conn.close()
+
+@build_cmd.command()
+@click.option('--output', '-o', default='mhw.db', help="Database to build and keep updated")
+@click.option('--interval', default=0.5, help="Seconds between checks for changed files")
+@click.pass_context
+def watch(ctx, output, interval):
+    "Builds the database, then updates it whenever a source_data file is saved"
+    from mhdata.build.watch import BuildWatcher
+
+    options = ctx.parent.params
+    watcher = BuildWatcher(output, lookup_tables=options['lookups'], search_index=options['search'])
+    if not watcher.start():
+        raise click.ClickException("Validation Failed")
+    print(f"Finished initial build of {output}")
+
+    try:
+        watcher.watch(interval=interval)
+    except KeyboardInterrupt:
+        pass
+
+@build_cmd.command()
+@click.option('--output', '-o', default='mhw.db', help="Database the daemon builds by default")
+@click.option('--port', type=int, default=None, help="Port to listen on. Defaults to $MHDATA_DAEMON_PORT or 8947")
+@click.pass_context
+def serve(ctx, output, port):
+    "Starts a daemon that keeps the data loaded, and runs commands for other tools such as build --daemon"
+    from mhdata.daemon.server import BuildDaemon, create_server
+
+    options = ctx.parent.params
+    daemon = BuildDaemon(output, lookup_tables=options['lookups'], search_index=options['search'])
+    daemon.start()
+
+    server = create_server(daemon, port)
+    print(f"Serving on http://127.0.0.1:{server.server_address[1]}. Press Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+@build_cmd.command(name='compile-sources')
+@click.option('--force', is_flag=True, help="Recompile every subsystem, even if it is up to date")
+@click.option('--check', is_flag=True, help="Only list csv files that changed since they were compiled")
+def compile_sources_cmd(force, check):
+    "Compiles the source_data csv files into source_data/.compiled, which loads faster"
+    from mhdata.io import data_path
+    from mhdata.io.compiled import CompiledSources, compile_sources
+
+    if check:
+        stale = CompiledSources(data_path).stale_files()
+        for rel_path in stale:
+            print(f"Stale: {rel_path}")
+        if stale:
+            raise click.ClickException(f"{len(stale)} files are not compiled or changed since they were compiled")
+        print("All compiled sources are up to date")
+        return
+
+    compiled = compile_sources(data_path, force=force)
+    for subsystem in compiled:
+        print(f"Compiled {subsystem}")
+    if not compiled:
+        print("All compiled sources are up to date")
+
 if __name__ == '__main__':
     build_cmd()
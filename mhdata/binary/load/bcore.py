@@ -10,6 +10,7 @@ from os.path import dirname, abspath, join
 from mhw_armor_edit import ftypes
 from mhw_armor_edit.ftypes import gmd
 from ..parsers import structreader as sr
+from . import registry
 
 # Location of MHW binary data.
 # Looks for a folder called /mergedchunks neighboring the main project folder.
@@ -37,11 +38,17 @@ def get_chunk_root():
     return CHUNK_DIRECTORY
 
 def load_schema(schema: Union[Type[ftypes.StructFile],Type[sr.Readable]], relative_dir: str) -> ftypes.StructFile:
-    "Uses an ftypes struct file class to load() a file relative to the chunk directory"
-    with open(join(CHUNK_DIRECTORY, relative_dir), 'rb') as f:
-        if isinstance(schema, sr.Readable) or issubclass(schema, sr.Readable):
-            return sr.read_struct(bytearray(f.read()), schema)
-        return schema.load(f)
+    """Uses an ftypes struct file class to load() a file relative to the chunk directory.
+    If a resource registry is enabled, the result is shared with other loads of the same file"""
+    path = join(CHUNK_DIRECTORY, relative_dir)
+
+    def load():
+        with open(path, 'rb') as f:
+            if isinstance(schema, sr.Readable) or issubclass(schema, sr.Readable):
+                return sr.read_struct(bytearray(f.read()), schema)
+            return schema.load(f)
+
+    return registry.memoized(('schema', relative_dir, schema), [path], load)
 
 class GmdGroup(Mapping[Union[int, str], Mapping[str,str]]):
     def __init__(self, indexed_entries, keyed_entries):
@@ -67,17 +74,32 @@ class GmdGroup(Mapping[Union[int, str], Mapping[str,str]]):
         yield from self.indexed_entries
         yield from self.keyed_entries
 
+    def copy(self):
+        "Returns a copy of the group, where every entry is a new dictionary"
+        return GmdGroup(
+            { key: dict(entry) for key, entry in self.indexed_entries.items() },
+            { key: dict(entry) for key, entry in self.keyed_entries.items() })
+
 def load_text(basepath: str, exclude_indices=False, exclude_keys=False) -> GmdGroup:
     """Parses a series of GMD files, returning a mapping from index -> language -> value
     
     The given base path is the relative directory from the chunk folder,
     excluding the _eng.gmd ending. All GMD files starting with the given basepath
     and ending with the language are combined together into a single result.
+    If a resource registry is enabled, the files are only parsed once, and each call gets a copy.
     """
+    key = ('text', basepath, exclude_indices, exclude_keys)
+    paths = [join(CHUNK_DIRECTORY, f"{basepath}_{ext_lang}.gmd") for ext_lang in lang_map.keys()]
+    group = registry.memoized(key, paths, lambda: _parse_text(basepath, exclude_indices, exclude_keys))
+    return group.copy() if registry.enabled() else group
+
+def _parse_text(basepath, exclude_indices, exclude_keys):
     indexed_entries = {}
     keyed_entries = {}
     for ext_lang, lang in lang_map.items():
-        data = load_schema(gmd.Gmd, f"{basepath}_{ext_lang}.gmd")
+        # Not loaded through load_schema(), as the files are already counted by load_text()
+        with open(join(CHUNK_DIRECTORY, f"{basepath}_{ext_lang}.gmd"), 'rb') as f:
+            data = gmd.Gmd.load(f)
         for idx, value_obj in enumerate(data.items):
             if idx not in indexed_entries and not exclude_indices:
                 indexed_entries[idx] = {}
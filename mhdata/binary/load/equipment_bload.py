@@ -194,6 +194,13 @@ class AugmentedWeapon():
         return value + getattr(prop, destination_prop)
 
 class EquipmentTree():
+    """A forest of equipment nodes, linked by their parent and children.
+
+    A pre-order index of the trees is built once. The descendants of a node are the nodes
+    between its position and its end position, so that subtree queries don't walk the tree.
+    Nodes are indexed under their parent only, and nodes that aren't reachable
+    from a root or isolated node (such as a cycle) are not indexed."""
+
     def __init__(self, weapon_map: Mapping[int, EquipmentNode]):
         self.weapon_map = weapon_map
 
@@ -215,6 +222,37 @@ class EquipmentTree():
             else:
                 self.roots.append(weapon)
 
+        # Pre-order index. Positions of nodes, and the parent position, depth and end position at each position
+        self._order = []
+        self._position = {}
+        self._parent_pos = []
+        self._depth = []
+        for root in self.roots:
+            self._index_tree(root)
+        self._crafted_count = len(self._order)
+        for weapon in self._isolated:
+            self._index_tree(weapon)
+
+        self._end = [pos + 1 for pos in range(len(self._order))]
+        for pos in reversed(range(len(self._order))):
+            parent_pos = self._parent_pos[pos]
+            if parent_pos != -1:
+                self._end[parent_pos] = max(self._end[parent_pos], self._end[pos])
+
+        # position -> total crafting cost, filled in by crafting_cost()
+        self._costs = {}
+
+    def _index_tree(self, root: EquipmentNode):
+        stack = [(root, -1)]
+        while stack:
+            node, parent_pos = stack.pop()
+            pos = len(self._order)
+            self._position[node.id] = pos
+            self._order.append(node)
+            self._parent_pos.append(parent_pos)
+            self._depth.append(0 if parent_pos == -1 else self._depth[parent_pos] + 1)
+            stack.extend((child, pos) for child in reversed(node.children) if child.parent is node)
+
     def by_id(self, entry_id):
         return self.weapon_map[entry_id]
 
@@ -223,14 +261,7 @@ class EquipmentTree():
 
     def crafted(self) -> Iterable[EquipmentNode]:
         "Depth-first search iteration of the weapon tree"
-        stack = []
-        stack.extend(reversed(self.roots))
-
-        while stack:
-            current_item = stack.pop()
-            yield current_item
-            if current_item.children:
-                stack.extend(reversed(current_item.children))
+        yield from self._order[:self._crafted_count]
 
     def isolated(self) -> Iterable[EquipmentNode]:
         "Iteration of the isolated weapons"
@@ -243,6 +274,57 @@ class EquipmentTree():
         for entry in self.isolated():
             yield entry
 
+    def descendants_of(self, entry_id) -> Iterable[EquipmentNode]:
+        "Returns every node that the entry upgrades into, directly or not, in depth-first order"
+        pos = self._position[entry_id]
+        return self._order[pos+1:self._end[pos]]
+
+    def is_descendant(self, entry_id, ancestor_id):
+        "Returns true if the entry is upgraded from the ancestor, directly or not"
+        pos = self._position.get(entry_id)
+        ancestor_pos = self._position.get(ancestor_id)
+        if pos is None or ancestor_pos is None:
+            return False
+        return ancestor_pos < pos < self._end[ancestor_pos]
+
+    def depth_of(self, entry_id):
+        "Returns the number of upgrades from the root of the tree, or None if the entry isn't indexed"
+        pos = self._position.get(entry_id)
+        return self._depth[pos] if pos is not None else None
+
+    def path_to(self, entry_id) -> Iterable[EquipmentNode]:
+        "Returns the nodes from the root of the tree to the entry, including both"
+        path = []
+        pos = self._position[entry_id]
+        while pos != -1:
+            path.append(self._order[pos])
+            pos = self._parent_pos[pos]
+        path.reverse()
+        return path
+
+    def crafting_cost(self, entry_id) -> Iterable[Tuple[int, int]]:
+        """Returns the total (item id, quantity) materials to create the entry from scratch,
+        which is the craft recipe of the root followed by every upgrade recipe down to the entry.
+        Totals are cached, so the shared part of two paths is only added once"""
+        target_pos = self._position[entry_id]
+
+        # Walk up to the closest node with a known total
+        path = []
+        pos = target_pos
+        while pos != -1 and pos not in self._costs:
+            path.append(pos)
+            pos = self._parent_pos[pos]
+
+        totals = dict(self._costs[pos]) if pos != -1 else {}
+        for pos in reversed(path):
+            node = self._order[pos]
+            recipe = node.upgrade if self._parent_pos[pos] != -1 else node.craft
+            for item_id, qty in recipe:
+                totals[item_id] = totals.get(item_id, 0) + qty
+            self._costs[pos] = list(totals.items())
+
+        return list(self._costs[target_pos])
+
 def apply_variation(name_dict, variation_map):
     name = { **name_dict }
     for lang, transform in variation_map.items():
@@ -0,0 +1,138 @@
+"""
+A manifest of the chunk files read by a binary merge, used to find what changed between game patches.
+
+The manifest records the size, modification time and hash of every file the loaders read,
+along with which merge stage read each file (see registry.py). Comparing the manifest of the
+last merge with a new snapshot of the chunk folder gives the changed files, and therefore
+the stages that need to run again.
+"""
+
+import hashlib
+import json
+import os
+import typing
+from pathlib import Path
+
+from . import registry
+from .bcore import get_chunk_root
+
+def hash_file(path):
+    "Returns a blake2b hash of a file, read in blocks so that large files aren't loaded at once"
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_default_manifest_path():
+    "Returns the location of the manifest of the last merge, next to the chunk folder"
+    return os.path.normpath(get_chunk_root()) + '.manifest.json'
+
+
+class ManifestDiff(typing.NamedTuple):
+    added: typing.List[str]
+    removed: typing.List[str]
+    changed: typing.List[str]
+
+    def all(self):
+        return sorted(self.added + self.removed + self.changed)
+
+
+class Manifest:
+    """Files read by each stage, and the state of those files.
+    Paths are relative to the chunk folder, and patterns are (folder, filename pattern) pairs"""
+
+    def __init__(self, files=None, stage_files=None, stage_patterns=None):
+        self.files = files or {}
+        self.stage_files = stage_files or {}
+        self.stage_patterns = stage_patterns or {}
+
+    @classmethod
+    def from_registry(cls, resources: registry.ResourceRegistry, root=None, previous: 'Manifest'=None):
+        "Creates a manifest from the files recorded by a registry"
+        root = root or get_chunk_root()
+        def relative(path):
+            return os.path.relpath(path, root).replace(os.sep, '/')
+
+        stage_files = { stage: sorted(relative(p) for p in paths) for stage, paths in resources.files.items() }
+        stage_patterns = {
+            stage: sorted([relative(folder), pattern] for folder, pattern in patterns)
+            for stage, patterns in resources.patterns.items()
+        }
+        return cls(stage_files=stage_files, stage_patterns=stage_patterns).snapshot(root, previous)
+
+    def snapshot(self, root=None, previous: 'Manifest'=None):
+        """Returns a manifest with the same stages, and the current state of the files they read.
+        Files matching a stage's patterns are included, so that new files are found.
+        Hashes from previous (or this manifest) are reused for files with the same size and mtime."""
+        root = root or get_chunk_root()
+        previous = previous or self
+
+        paths = set(p for paths in self.stage_files.values() for p in paths)
+        for patterns in self.stage_patterns.values():
+            for folder, pattern in patterns:
+                for path in Path(root, folder).rglob(pattern):
+                    paths.add(os.path.relpath(path, root).replace(os.sep, '/'))
+
+        files = {}
+        for rel_path in sorted(paths):
+            path = os.path.join(root, rel_path)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            old = previous.files.get(rel_path, None)
+            if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime_ns:
+                file_hash = old['hash']
+            else:
+                file_hash = hash_file(path)
+            files[rel_path] = { 'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'hash': file_hash }
+
+        return Manifest(files, dict(self.stage_files), dict(self.stage_patterns))
+
+    def compare(self, other: 'Manifest') -> ManifestDiff:
+        "Returns the files added, removed, or changed in other. Files are compared by hash"
+        return ManifestDiff(
+            added=sorted(f for f in other.files if f not in self.files),
+            removed=sorted(f for f in self.files if f not in other.files),
+            changed=sorted(f for f, entry in other.files.items()
+                if f in self.files and self.files[f]['hash'] != entry['hash']))
+
+    def stages_of(self, rel_path):
+        "Returns the stages that read a file, or would find it using one of their patterns"
+        stages = set(stage for stage, paths in self.stage_files.items() if rel_path in paths)
+        for stage, patterns in self.stage_patterns.items():
+            if any(registry.matches_pattern(rel_path, folder, pattern) for folder, pattern in patterns):
+                stages.add(stage)
+        return stages
+
+    def affected_stages(self, diff: ManifestDiff):
+        """Returns the stages affected by the files of a diff, or None if every stage is affected,
+        such as when a file read outside of a stage changed"""
+        stages = set()
+        for rel_path in diff.all():
+            stages.update(self.stages_of(rel_path))
+        if registry.shared_stage in stages:
+            return None
+        return stages
+
+    def update(self, other: 'Manifest', root=None):
+        """Returns a snapshot of the stages of other, and of the stages of this manifest that aren't in other.
+        Used after a merge that only ran some of the stages"""
+        stage_files = { **self.stage_files, **other.stage_files }
+        stage_patterns = { **self.stage_patterns, **other.stage_patterns }
+        known_files = Manifest({ **self.files, **other.files })
+        return Manifest(stage_files=stage_files, stage_patterns=stage_patterns).snapshot(root, known_files)
+
+    def to_dict(self):
+        return { 'files': self.files, 'stages': self.stage_files, 'patterns': self.stage_patterns }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data['files'], data['stages'], data['patterns'])
@@ -1,6 +1,7 @@
 from typing import Iterable, NamedTuple
 
 from .bcore import get_chunk_root, load_text
+from . import registry
 from ..parsers import msk
 
 
@@ -31,8 +32,11 @@ class WeaponMelodyCollection:
     melodies: Iterable[WeaponMelody]
 
     def __init__(self):
-        song_data = msk.load_mske(get_chunk_root() + '/common/pl/music_skill_efc.mske')
-        note_data = msk.load_msk(get_chunk_root() + '/hm/wp/wp05/music_skill.msk')
+        song_path = get_chunk_root() + '/common/pl/music_skill_efc.mske'
+        note_path = get_chunk_root() + '/hm/wp/wp05/music_skill.msk'
+        registry.record_files([song_path, note_path])
+        song_data = msk.load_mske(song_path)
+        note_data = msk.load_msk(note_path)
         song_text = load_text("common/text/vfont/music_skill")
 
         notes_by_id = {}
@@ -2,6 +2,7 @@ from typing import Iterable, Tuple, Iterator
 from pathlib import Path
 
 from .bcore import load_schema, load_text, get_chunk_root
+from . import registry
 from ..metadata import MonsterMetadata, MonsterMetaEntry
 from ..parsers import load_epg, DttEpg
 
@@ -96,7 +97,7 @@ class MonsterCollection(Iterable[MonsterData]):
             return False
 
         root = Path(get_chunk_root())
-        for filename in root.joinpath('em/').rglob('*.dtt_epg'):
+        for filename in registry.rglob(root.joinpath('em/'), '*.dtt_epg'):
             epg_binary = load_epg(filename)
 
             try:
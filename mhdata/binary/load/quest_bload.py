@@ -7,6 +7,7 @@ from pathlib import Path
 import re
 
 from .bcore import load_schema, load_text, get_chunk_root
+from . import registry
 from mhdata.binary.parsers import read_struct_from_file, Mib, load_quest, RemFile
 
 class QuestInfo:
@@ -40,7 +41,14 @@ def load_quests() -> Iterable[QuestInfo]:
     quest_base_path = Path(get_chunk_root()).joinpath('quest')
     rem_base_path = quest_base_path.joinpath('rem')
 
-    quest_files = quest_base_path.rglob("*.mib")
+    # Many quests share the same reward files, so each is only read once
+    rem_cache = {}
+    def load_rem(path):
+        if path not in rem_cache:
+            rem_cache[path] = read_struct_from_file(path, RemFile)
+        return rem_cache[path]
+
+    quest_files = registry.rglob(quest_base_path, "*.mib")
 
     for path in quest_files:
         quest_text_fname = path.stem.replace('questData_', 'q')
@@ -63,8 +71,11 @@ def load_quests() -> Iterable[QuestInfo]:
         # Load REMS (reward files)
         rem_ids = binary.objective.rem_ids
         rem_files = [rem_base_path.joinpath(f'remData_{rem_id}.rem') for rem_id in rem_ids]
-        rem_files = filter(lambda r: r.exists(), rem_files)
-        rem_files = [read_struct_from_file(path, RemFile) for path in rem_files]
+
+        # Missing files are recorded too, so that adding one in a patch reruns the quest merge
+        registry.record_files(rem_files)
+        rem_files = [r for r in rem_files if r.exists()]
+        rem_files = [load_rem(path) for path in rem_files]
 
         quests.append(QuestInfo(quest_id, name, objective, description, binary, rem_files))
 
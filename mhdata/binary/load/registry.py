@@ -0,0 +1,146 @@
+"""
+A registry that memoizes parsed binary resources for the length of a session, such as a merge.
+
+Resources are parsed only once while a registry is enabled, and later loads of the same
+resource with the same options return the parsed result. Nothing is cached unless a registry
+is enabled, so one-off loads (such as dumping a file) aren't kept in memory.
+
+Parsed resources are shared by every caller and must be treated as read-only.
+Text (GMD) groups are copied per caller instead, since updaters edit names in place.
+Registries can be used from several threads, and each resource is still only parsed once.
+
+Registries also record which files each merge stage reads, including the patterns used to
+search for files, which is what the chunk manifest (see manifest.py) uses to find the stages
+affected by changed files. Files read outside of a stage are recorded under shared_stage.
+"""
+
+import contextlib
+import fnmatch
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+_active_registry = None
+_current_stage = threading.local()
+
+shared_stage = '_shared'
+
+class ResourceRegistry:
+    "Stores parsed resources by key, and counts how often they were reused"
+
+    def __init__(self):
+        self._resources = {}
+        self.loads = 0
+        self.bytes_read = 0
+        self.hits = Counter()
+        self.bytes_saved = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self.files = {}
+        self.patterns = {}
+
+    def record_files(self, stage, paths):
+        with self._lock:
+            self.files.setdefault(stage, set()).update(str(path) for path in paths)
+
+    def record_pattern(self, stage, root, pattern):
+        with self._lock:
+            self.patterns.setdefault(stage, set()).add((str(root), pattern))
+
+    def get(self, key, paths, load_fn):
+        """Returns the resource stored for the key, or calls load_fn to load and store it.
+        Paths are the files load_fn reads, which are used to count bytes read and saved."""
+        # Threads loading the same resource wait for the first one, while other resources load in parallel
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            if key in self._resources:
+                resource, size = self._resources[key]
+                with self._lock:
+                    self.hits[key] += 1
+                    self.bytes_saved += size
+                return resource
+
+            resource = load_fn()
+            size = sum(os.path.getsize(path) for path in paths)
+            self._resources[key] = (resource, size)
+            with self._lock:
+                self.loads += 1
+                self.bytes_read += size
+            return resource
+
+    def print_report(self, count=5):
+        "Prints the number of resources parsed and reused, and the most reused resources"
+        total_hits = sum(self.hits.values())
+        print(f"Binary resources: parsed {self.loads} ({self.bytes_read} bytes), " +
+            f"reused {total_hits} times ({self.bytes_saved} bytes not parsed again)")
+        for key, hits in self.hits.most_common(count):
+            print(f"    {key[1]}: reused {hits} times")
+
+
+def enable(registry: ResourceRegistry):
+    "Activates a registry. Resources loaded afterwards are memoized by it"
+    global _active_registry
+    _active_registry = registry
+
+def disable():
+    "Deactivates the current registry, returning it"
+    global _active_registry
+    registry = _active_registry
+    _active_registry = None
+    return registry
+
+@contextlib.contextmanager
+def session():
+    "Context manager that memoizes resources loaded inside it, yielding the registry"
+    registry = ResourceRegistry()
+    enable(registry)
+    try:
+        yield registry
+    finally:
+        disable()
+
+def enabled():
+    return _active_registry is not None
+
+def memoized(key, paths, load_fn):
+    "Calls load_fn, unless a registry is enabled and has already loaded the key"
+    if _active_registry is None:
+        return load_fn()
+    record_files(paths)
+    return _active_registry.get(key, paths, load_fn)
+
+@contextlib.contextmanager
+def stage(name):
+    "Context manager that records files read by the current thread inside it under a stage name"
+    previous = getattr(_current_stage, 'name', None)
+    _current_stage.name = name
+    try:
+        yield
+    finally:
+        _current_stage.name = previous
+
+def current_stage():
+    return getattr(_current_stage, 'name', None) or shared_stage
+
+def record_files(paths):
+    "Records files read by the current stage, if a registry is enabled"
+    if _active_registry is not None:
+        _active_registry.record_files(current_stage(), paths)
+
+def rglob(root, pattern):
+    """Returns the files matching pattern in root and all subfolders, like Path.rglob().
+    The pattern is recorded, so that files added later are known to affect the current stage."""
+    root = Path(root)
+    paths = sorted(root.rglob(pattern))
+    if _active_registry is not None:
+        _active_registry.record_pattern(current_stage(), root, pattern)
+        record_files(paths)
+    return paths
+
+def matches_pattern(path, root, pattern):
+    "Returns true if a path would be returned by rglob(root, pattern)"
+    rel_path = os.path.relpath(path, root)
+    return not rel_path.startswith('..') and fnmatch.fnmatch(os.path.basename(path), pattern)
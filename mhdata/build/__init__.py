@@ -2,7 +2,10 @@
 The main build module that transforms loaded data into a SQLite file.
 
 This module takes the load results from the mhdata.load function,
-and can use it to create a build result
+and can use it to create a build result.
+Building imports SQLAlchemy, so build_sql_database is imported when first used.
 """
 
-from .sql import build_sql_database
+from mhdata.util import lazy_attributes
+
+__getattr__ = lazy_attributes(__name__, { 'build_sql_database': '.sql' })
@@ -0,0 +1,185 @@
+"""
+Creates and applies changesets between two built databases.
+
+A changeset lists the inserted, updated, and deleted rows of every table
+defined in mhdata.sql.mappings. Rows are matched using each table's primary key,
+so a small edit in source_data results in a small changeset
+instead of a full database download.
+
+Tables with a surrogate key (an autoincrement id) number their rows in insertion order,
+so an added row would renumber every row after it. Their rows are matched by the values
+of every other column instead, and are only ever inserted or deleted.
+"""
+
+import json
+import sqlite3
+
+import mhdata.sql as db
+from . import search
+
+CHANGESET_VERSION = 2
+
+def _get_tables():
+    """Returns the (name, key columns, surrogate) of every mapped table, in dependency order.
+    The key columns of a table with a surrogate key are its other columns"""
+    results = []
+    for table in db.Base.metadata.sorted_tables:
+        pk_columns = [c.name for c in table.primary_key.columns]
+        surrogate = len(pk_columns) == 1 and table.primary_key.columns[pk_columns[0]].autoincrement is True
+        if surrogate:
+            pk_columns = [c.name for c in table.columns if c.name not in pk_columns]
+        results.append((table.name, pk_columns, surrogate))
+    return results
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _table_exists(conn, table_name):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone()
+    return row is not None
+
+def _read_table(conn, table_name, pk_columns, surrogate=False):
+    """Reads a table into a tuple of (columns, { key tuple -> row tuple }).
+    Rows of a table with a surrogate key are read without it, and are keyed by their values
+    and how many identical rows came before them"""
+    if not _table_exists(conn, table_name):
+        return [], {}
+
+    if surrogate:
+        column_str = ', '.join(_quote(c) for c in pk_columns)
+        cursor = conn.execute(f"SELECT {column_str} FROM {_quote(table_name)}")
+    else:
+        cursor = conn.execute(f"SELECT * FROM {_quote(table_name)}")
+    columns = [d[0] for d in cursor.description]
+    pk_indices = [columns.index(c) for c in pk_columns]
+
+    rows = {}
+    occurrences = {}
+    for row in cursor:
+        key = tuple(row[i] for i in pk_indices)
+        if surrogate:
+            occurrences[key] = occurrences.get(key, 0) + 1
+            key = key + (occurrences[key],)
+        rows[key] = row
+    return columns, rows
+
+def diff_databases(old_filename, new_filename):
+    """Compares two built databases table by table, and returns a changeset.
+
+    The changeset is a json-serializable dictionary. Tables without changes are omitted.
+    Updated rows are stored in full, as most rows are small.
+    """
+    old_conn = sqlite3.connect(old_filename)
+    new_conn = sqlite3.connect(new_filename)
+
+    try:
+        tables = {}
+        for table_name, pk_columns, surrogate in _get_tables():
+            old_columns, old_rows = _read_table(old_conn, table_name, pk_columns, surrogate)
+            new_columns, new_rows = _read_table(new_conn, table_name, pk_columns, surrogate)
+
+            if old_columns and new_columns and old_columns != new_columns:
+                raise Exception(f"Table {table_name} has a different set of columns, " +
+                    "schema changes require a full database")
+
+            inserted = []
+            updated = []
+            for key, row in new_rows.items():
+                old_row = old_rows.get(key, None)
+                if old_row is None:
+                    inserted.append(list(row))
+                elif old_row != row:
+                    updated.append(list(row))
+
+            deleted = [list(key[:len(pk_columns)]) for key in old_rows.keys() if key not in new_rows]
+
+            if inserted or updated or deleted:
+                tables[table_name] = {
+                    'columns': new_columns or old_columns,
+                    'primary_key': pk_columns,
+                    'surrogate': surrogate,
+                    'insert': inserted,
+                    'update': updated,
+                    'delete': deleted
+                }
+
+        return { 'version': CHANGESET_VERSION, 'tables': tables }
+    finally:
+        old_conn.close()
+        new_conn.close()
+
+def apply_changeset(filename, changeset):
+    """Applies a changeset created by diff_databases to the database at filename.
+    All changes are applied in a single transaction.
+    Search tables are derived data, so they are rebuilt if the database has them.
+    """
+    if changeset.get('version', None) != CHANGESET_VERSION:
+        raise Exception(f"Unsupported changeset version {changeset.get('version', None)}")
+
+    table_order = [name for name, _, _ in _get_tables()]
+    tables = changeset['tables']
+
+    unknown_tables = [name for name in tables.keys() if name not in table_order]
+    if unknown_tables:
+        raise Exception("Changeset contains unknown tables " + ', '.join(unknown_tables))
+
+    conn = sqlite3.connect(filename)
+    try:
+        with conn:
+            # Deletes go in reverse dependency order, everything else in dependency order
+            for table_name in reversed(table_order):
+                if table_name not in tables:
+                    continue
+                table = tables[table_name]
+                if table['surrogate']:
+                    # Only one of several identical rows is deleted per entry. Values may be NULL
+                    where = ' AND '.join(f"{_quote(c)} IS ?" for c in table['primary_key'])
+                    conn.executemany(
+                        f"DELETE FROM {_quote(table_name)} WHERE rowid = " +
+                            f"(SELECT rowid FROM {_quote(table_name)} WHERE {where} LIMIT 1)",
+                        table['delete'])
+                else:
+                    where = ' AND '.join(f"{_quote(c)} = ?" for c in table['primary_key'])
+                    conn.executemany(
+                        f"DELETE FROM {_quote(table_name)} WHERE {where}",
+                        table['delete'])
+
+            for table_name in table_order:
+                if table_name not in tables:
+                    continue
+                table = tables[table_name]
+                columns = table['columns']
+                column_str = ', '.join(_quote(c) for c in columns)
+                params_str = ', '.join('?' for _ in columns)
+
+                # An update is a full row replacement, keyed by the primary key.
+                # Rows of a table with a surrogate key get a new id
+                statement = 'INSERT' if table['surrogate'] else 'INSERT OR REPLACE'
+                conn.executemany(
+                    f"{statement} INTO {_quote(table_name)} ({column_str}) VALUES ({params_str})",
+                    table['update'] + table['insert'])
+
+            if tables and _table_exists(conn, search.SEARCH_TABLE):
+                for statement in search.index_statements():
+                    conn.execute(statement)
+    finally:
+        conn.close()
+
+def count_changes(changeset):
+    "Returns a mapping of table name -> (inserted, updated, deleted) counts"
+    return {
+        name: (len(table['insert']), len(table['update']), len(table['delete']))
+        for name, table in changeset['tables'].items()
+    }
+
+def save_changeset(changeset, filename):
+    "Writes a changeset to a json file. Returns the number of bytes written"
+    data = json.dumps(changeset, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(filename, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+def load_changeset(filename):
+    with open(filename, encoding='utf-8') as f:
+        return json.load(f)
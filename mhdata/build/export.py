@@ -0,0 +1,195 @@
+"""
+Exports the loaded data directly to NDJSON or columnar (Parquet/Arrow IPC) files.
+
+This is an alternative to the SQLite build for analytics use. Each collection in the
+loaded data becomes a table file, and translated fields of DataMaps are split off
+into a separate {table}_text file with one row per language.
+
+Rows are produced by generators and written in batches, so memory use does not grow
+with the size of the output. Tables are written concurrently.
+Columnar formats require the optional pyarrow package.
+"""
+
+import json
+import os
+import typing
+from collections import abc
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from mhdata import cfg
+from mhdata.io import DataMap
+from mhdata.io.functions import to_basic
+
+supported_formats = ('ndjson', 'parquet', 'arrow')
+
+# Number of rows per batch for columnar formats
+BATCH_SIZE = 1024
+
+def is_translation(value):
+    "Returns true if the value is a dictionary of language code -> text"
+    if not isinstance(value, abc.Mapping) or 'en' not in value:
+        return False
+    return all(key in cfg.all_languages for key in value.keys())
+
+def _to_plain(value):
+    "Converts a value to basic json-compatible types"
+    value = to_basic(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, dict):
+        return { k:_to_plain(v) for k, v in value.items() }
+    if isinstance(value, list):
+        return [_to_plain(v) for v in value]
+    return value
+
+def iter_entity_rows(data_map: DataMap):
+    "Yields the rows of a DataMap, excluding translated fields"
+    for entry in data_map.values():
+        yield {
+            key: _to_plain(value) for key, value in entry.items()
+            if not is_translation(value)
+        }
+
+def iter_translation_rows(data_map: DataMap):
+    "Yields one row per entry and language, containing all translated fields"
+    for entry in data_map.values():
+        fields = [key for key, value in entry.items() if is_translation(value)]
+        for lang in cfg.supported_languages:
+            row = { 'id': entry.id, 'lang_id': lang }
+            for field in fields:
+                row[field] = entry[field].get(lang, None)
+            yield row
+
+def iter_list_rows(rows: typing.Iterable[dict]):
+    for row in rows:
+        yield _to_plain(row)
+
+def iter_keymap_rows(keymap: typing.Mapping[str, dict]):
+    for key, entry in keymap.items():
+        yield { 'key': key, **_to_plain(entry) }
+
+def get_tables(mhdata):
+    """Returns a mapping of table name -> function returning a row generator.
+    Table names are the names in the loaded data, without the _map suffix.
+    """
+    tables = {}
+    for attr_name, value in vars(mhdata).items():
+        name = attr_name[:-len('_map')] if attr_name.endswith('_map') else attr_name
+
+        # default arguments bind the current value for each lambda
+        if isinstance(value, DataMap):
+            tables[name] = lambda v=value: iter_entity_rows(v)
+            tables[name + '_text'] = lambda v=value: iter_translation_rows(v)
+        elif isinstance(value, abc.Mapping):
+            tables[name] = lambda v=value: iter_keymap_rows(v)
+        elif isinstance(value, abc.Iterable):
+            tables[name] = lambda v=value: iter_list_rows(v)
+    return tables
+
+def write_ndjson(rows, location):
+    "Writes rows as newline delimited json. Returns the number of rows written"
+    count = 0
+    with open(location, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    return count
+
+def _columnar_value(value):
+    "Columnar files store nested values as json text"
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+def _arrow_type(pa, types):
+    "Returns the arrow type to use for a column, given the set of python types in it"
+    types = types - {type(None)}
+    if not types:
+        return pa.string()
+    if types == {bool}:
+        return pa.bool_()
+    if types == {int}:
+        return pa.int64()
+    if types <= {int, float}:
+        return pa.float64()
+    return pa.string()
+
+def write_columnar(row_fn, location, file_format):
+    """Writes rows to a parquet or arrow ipc file. Returns the number of rows written.
+    The row generator is consumed twice, once to determine the schema, and once to write.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise Exception(f"The {file_format} format requires the pyarrow package to be installed")
+
+    # Schema pass. Only the set of types per column is kept in memory
+    column_types = {}
+    for row in row_fn():
+        for key, value in row.items():
+            column_types.setdefault(key, set()).add(type(_columnar_value(value)))
+
+    schema = pa.schema([pa.field(key, _arrow_type(pa, types)) for key, types in column_types.items()])
+
+    def iter_batches():
+        batch = []
+        for row in row_fn():
+            batch.append(row)
+            if len(batch) >= BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def to_record_batch(batch):
+        columns = []
+        for field in schema:
+            values = [_columnar_value(row.get(field.name, None)) for row in batch]
+            if pa.types.is_string(field.type):
+                values = [None if v is None else str(v) for v in values]
+            columns.append(pa.array(values, type=field.type))
+        return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+    count = 0
+    if file_format == 'parquet':
+        writer = pyarrow.parquet.ParquetWriter(location, schema)
+    else:
+        writer = pyarrow.ipc.new_file(location, schema)
+
+    try:
+        for batch in iter_batches():
+            record_batch = to_record_batch(batch)
+            if file_format == 'parquet':
+                writer.write_table(pa.Table.from_batches([record_batch]))
+            else:
+                writer.write_batch(record_batch)
+            count += len(batch)
+    finally:
+        writer.close()
+
+    return count
+
+def export_data(mhdata, output_dir, *, file_format='ndjson', max_workers=None):
+    """Exports every table in the loaded data to output_dir.
+    Returns a mapping of table name -> number of rows written.
+    """
+    if file_format not in supported_formats:
+        raise ValueError(f"Unsupported format {file_format}, " +
+            f"supported formats are {', '.join(supported_formats)}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    tables = get_tables(mhdata)
+
+    def export_table(name):
+        location = os.path.join(output_dir, f"{name}.{file_format}")
+        if file_format == 'ndjson':
+            return write_ndjson(tables[name](), location)
+        return write_columnar(tables[name], location, file_format)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        counts = executor.map(export_table, tables.keys())
+        return dict(zip(tables.keys(), counts))
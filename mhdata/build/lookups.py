@@ -0,0 +1,95 @@
+"""
+Post-build stage that materializes denormalized lookup tables.
+
+The app answers questions like "where do I get item X" by unioning several tables.
+This stage precomputes those unions into indexed tables defined in mhdata.sql.mappings,
+using only data that was already written to the database by the build.
+"""
+
+import sqlalchemy.orm
+from sqlalchemy import text
+
+# Rows are inserted in a fixed order, so that builds of the same data number them the same way
+_item_source_queries = [
+    """INSERT INTO item_source (item_id, source_type, source_id, rank, condition_id, stack, percentage)
+        SELECT item_id, 'monster', monster_id, rank, condition_id, stack, percentage
+        FROM monster_reward
+        ORDER BY monster_id, rank, condition_id, item_id, stack, percentage""",
+    """INSERT INTO item_source (item_id, source_type, source_id, rank, condition_id, stack, percentage)
+        SELECT r.item_id, 'quest', r.quest_id, q.rank, NULL, r.stack, r.percentage
+        FROM quest_reward r JOIN quest q ON q.id = r.quest_id
+        ORDER BY r.quest_id, r.item_id, r.stack, r.percentage""",
+    """INSERT INTO item_source (item_id, source_type, source_id, rank, condition_id, stack, percentage)
+        SELECT item_id, 'location', location_id, rank, NULL, stack, percentage
+        FROM location_item
+        ORDER BY location_id, rank, item_id, stack, percentage""",
+    """INSERT INTO item_source (item_id, source_type, source_id, rank, condition_id, stack, percentage)
+        SELECT result_id, 'combination', id, NULL, NULL, quantity, NULL
+        FROM item_combination ORDER BY id""",
+]
+
+_item_usage_queries = [
+    """INSERT INTO item_usage (item_id, usage_type, usage_id, quantity)
+        SELECT r.item_id, 'armor', a.id, r.quantity
+        FROM armor a JOIN recipe_item r ON r.recipe_id = a.recipe_id
+        ORDER BY a.id, r.item_id, r.quantity""",
+    """INSERT INTO item_usage (item_id, usage_type, usage_id, quantity)
+        SELECT r.item_id, 'weapon', w.id, r.quantity
+        FROM weapon w JOIN recipe_item r
+            ON r.recipe_id = w.create_recipe_id OR r.recipe_id = w.upgrade_recipe_id
+        ORDER BY w.id, r.item_id, r.quantity""",
+    """INSERT INTO item_usage (item_id, usage_type, usage_id, quantity)
+        SELECT r.item_id, 'charm', c.id, r.quantity
+        FROM charm c JOIN recipe_item r ON r.recipe_id = c.recipe_id
+        ORDER BY c.id, r.item_id, r.quantity""",
+    """INSERT INTO item_usage (item_id, usage_type, usage_id, quantity)
+        SELECT r.item_id, 'kinsect', k.id, r.quantity
+        FROM kinsect k JOIN recipe_item r ON r.recipe_id = k.recipe_id
+        ORDER BY k.id, r.item_id, r.quantity""",
+    """INSERT INTO item_usage (item_id, usage_type, usage_id, quantity)
+        SELECT first_id, 'combination', id, 1 FROM item_combination WHERE first_id IS NOT NULL ORDER BY id""",
+    """INSERT INTO item_usage (item_id, usage_type, usage_id, quantity)
+        SELECT second_id, 'combination', id, 1 FROM item_combination WHERE second_id IS NOT NULL ORDER BY id""",
+]
+
+_skilltree_equipment_query = """
+    INSERT INTO skilltree_equipment (skilltree_id, equipment_type, equipment_id, level)
+    SELECT skilltree_id, equipment_type, equipment_id, SUM(level) FROM (
+        SELECT skilltree_id, 'armor' AS equipment_type, armor_id AS equipment_id, level FROM armor_skill
+        UNION ALL
+        SELECT skilltree_id, 'weapon', weapon_id, level FROM weapon_skill
+        UNION ALL
+        SELECT skilltree_id, 'charm', charm_id, level FROM charm_skill
+        UNION ALL
+        SELECT skilltree_id, 'decoration', id, skilltree_level FROM decoration
+        UNION ALL
+        SELECT skilltree2_id, 'decoration', id, skilltree2_level FROM decoration
+            WHERE skilltree2_id IS NOT NULL
+    )
+    GROUP BY skilltree_id, equipment_type, equipment_id"""
+
+_monster_quest_query = """
+    INSERT INTO monster_quest (monster_id, quest_id, quantity, is_objective, rank, stars)
+    SELECT m.monster_id, m.quest_id, m.quantity, m.is_objective, q.rank, q.stars
+    FROM quest_monster m JOIN quest q ON q.id = m.quest_id"""
+
+_extra_indexes = [
+    "CREATE INDEX IF NOT EXISTS ix_skilltree_equipment_equipment " +
+        "ON skilltree_equipment (equipment_type, equipment_id)",
+    "CREATE INDEX IF NOT EXISTS ix_monster_quest_quest_id ON monster_quest (quest_id)",
+]
+
+def build_lookup_tables(session : sqlalchemy.orm.Session):
+    """Populates the denormalized lookup tables. 
+    Must run after all other build functions have added their data to the session."""
+    session.flush()
+
+    for query in _item_source_queries + _item_usage_queries:
+        session.execute(text(query))
+    session.execute(text(_skilltree_equipment_query))
+    session.execute(text(_monster_quest_query))
+
+    for query in _extra_indexes:
+        session.execute(text(query))
+
+    print("Built Lookup Tables")
@@ -0,0 +1,142 @@
+"""
+Post-build stage that creates FTS5 full-text search tables over translated text.
+
+Two tables are created, as different scripts need different tokenizers:
+- search_text uses the unicode61 tokenizer, which splits on words and ignores diacritics.
+- search_text_cjk uses the trigram tokenizer for cfg.cjk_languages,
+  which supports substring matches in text that can't be split into words.
+
+Both are contentless to keep the database small. Their rowids point to the search_entity table,
+which stores the entity type, id, language, and name of each indexed row.
+"""
+
+import time
+import sqlalchemy.orm
+from sqlalchemy import text
+
+from mhdata import cfg
+
+SEARCH_TABLE = 'search_text'
+SEARCH_TABLE_CJK = 'search_text_cjk'
+SEARCH_ENTITY_TABLE = 'search_entity'
+
+# Relevance multiplier for name matches compared to description matches
+NAME_WEIGHT = 10.0
+
+# Maps entity type -> (text table, description column or None)
+searchable_tables = {
+    'item': ('item_text', 'description'),
+    'monster': ('monster_text', 'description'),
+    'skilltree': ('skilltree_text', 'description'),
+    'armor': ('armor_text', None),
+    'weapon': ('weapon_text', None),
+    'quest': ('quest_text', 'description'),
+    'decoration': ('decoration_text', None),
+    'charm': ('charm_text', 'description'),
+    'tool': ('tool_text', 'description'),
+    'kinsect': ('kinsect_text', None),
+}
+
+_tokenizers = {
+    SEARCH_TABLE: "unicode61 remove_diacritics 2",
+    SEARCH_TABLE_CJK: "trigram",
+}
+
+def index_statements():
+    "Returns the list of SQL statements that (re)create the search tables"
+    cjk_list = ', '.join(f"'{lang}'" for lang in cfg.cjk_languages)
+
+    statements = [
+        f"DROP TABLE IF EXISTS {SEARCH_ENTITY_TABLE}",
+        f"CREATE TABLE {SEARCH_ENTITY_TABLE} (" +
+            "id INTEGER PRIMARY KEY, entity_type TEXT, entity_id INTEGER, lang_id TEXT, name TEXT)"
+    ]
+
+    for entity_type, (text_table, _) in searchable_tables.items():
+        statements.append(
+            f"INSERT INTO {SEARCH_ENTITY_TABLE} (entity_type, entity_id, lang_id, name) " +
+            f"SELECT '{entity_type}', id, lang_id, name FROM {text_table}")
+
+    for table_name, tokenizer in _tokenizers.items():
+        statements.append(f"DROP TABLE IF EXISTS {table_name}")
+        statements.append(
+            f"CREATE VIRTUAL TABLE {table_name} USING fts5(" +
+            f"name, description, content='', tokenize='{tokenizer}')")
+
+        lang_filter = 'IN' if table_name == SEARCH_TABLE_CJK else 'NOT IN'
+        for entity_type, (text_table, description_column) in searchable_tables.items():
+            description_column = f't.{description_column}' if description_column else 'NULL'
+            statements.append(
+                f"INSERT INTO {table_name} (rowid, name, description) " +
+                f"SELECT e.id, e.name, {description_column} FROM {SEARCH_ENTITY_TABLE} e " +
+                f"JOIN {text_table} t ON t.id = e.entity_id AND t.lang_id = e.lang_id " +
+                f"WHERE e.entity_type = '{entity_type}' AND e.lang_id {lang_filter} ({cjk_list})")
+
+        statements.append(f"INSERT INTO {table_name}({table_name}) VALUES ('optimize')")
+
+    return statements
+
+def build_search_index(session : sqlalchemy.orm.Session):
+    "Builds the full-text search tables. Must be run after all text tables are populated"
+    session.flush()
+    for statement in index_statements():
+        session.execute(text(statement))
+
+    print("Built Search Index")
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+def search(conn, query, lang_id, *, limit=50):
+    """Searches names and descriptions in a language using a sqlite3 connection.
+    Returns a list of (entity_type, entity_id, name) ordered by relevance.
+    """
+    terms = query.split()
+    if not terms:
+        return []
+
+    if lang_id in cfg.cjk_languages:
+        if any(len(t) < 3 for t in terms):
+            # Trigrams can't match anything shorter than 3 characters
+            return _search_like(conn, query, lang_id, limit=limit)
+        table_name = SEARCH_TABLE_CJK
+        match = ' '.join(_fts_phrase(t) for t in terms)
+    else:
+        table_name = SEARCH_TABLE
+        match = ' '.join(_fts_phrase(t) + '*' for t in terms)
+
+    sql = (f"SELECT e.entity_type, e.entity_id, e.name FROM {table_name} f " +
+        f"JOIN {SEARCH_ENTITY_TABLE} e ON e.id = f.rowid " +
+        f"WHERE {table_name} MATCH ? AND e.lang_id = ? " +
+        f"ORDER BY bm25({table_name}, {NAME_WEIGHT}, 1.0) LIMIT ?")
+    return conn.execute(sql, [match, lang_id, limit]).fetchall()
+
+def _search_like(conn, query, lang_id, *, limit=50):
+    """The unindexed LIKE scan that clients use without the search tables.
+    Used for benchmarks, and for CJK queries too short for trigrams."""
+    results = []
+    for entity_type, (text_table, description_column) in searchable_tables.items():
+        description_column = description_column or 'NULL'
+        sql = (f"SELECT '{entity_type}', id, name FROM {text_table} " +
+            f"WHERE lang_id = ? AND (name LIKE ? OR {description_column} LIKE ?)")
+        results.extend(conn.execute(sql, [lang_id, f'%{query}%', f'%{query}%']).fetchall())
+    return results[:limit]
+
+def benchmark_search(conn, queries, *, repeat=20):
+    """Times each (query, lang_id) pair using the search tables and using LIKE scans.
+    Returns a list of (query, lang_id, fts seconds, like seconds, number of fts results)
+    """
+    results = []
+    for query, lang_id in queries:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            found = search(conn, query, lang_id)
+        fts_time = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            _search_like(conn, query, lang_id)
+        like_time = (time.perf_counter() - start) / repeat
+
+        results.append((query, lang_id, fts_time, like_time, len(found)))
+    return results
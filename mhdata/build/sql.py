@@ -4,11 +4,13 @@ import mhdata.sql as db
 
 from mhdata import cfg
 from mhdata.io import DataMap
-from mhdata.util import ensure, ensure_warn, get_duplicates
+from mhdata.util import ensure, ensure_warn, get_duplicates, profiling
 from mhdata.load import datafn
 
 from .objectindex import ObjectIndex
 from .itemtracker import ItemTracker
+from .lookups import build_lookup_tables
+from .search import build_search_index
 
 def get_translated(obj, attr, lang):
     if attr not in obj:
@@ -22,40 +24,65 @@ def calculate_next_recipe_id(session):
         return 1
     return current_max + 1
 
-def build_sql_database(output_filename, mhdata):
-    "Builds a SQLite database and outputs to output_filename"
-    sessionbuilder = db.recreate_database(output_filename)
+def build_sql_database(output_filename, mhdata, *, lookup_tables=True, search_index=True):
+    """Builds a SQLite database and outputs to output_filename.
+    If lookup_tables is set, denormalized lookup tables are populated after the main build.
+    If search_index is set, full-text search tables are created over all translated text."""
+    with profiling.stage('create_schema'):
+        sessionbuilder = db.recreate_database(output_filename)
 
     with db.session_scope(sessionbuilder) as session:
         # Add languages before starting the build
-        for language in cfg.supported_languages:
-            session.add(db.Language(
-                id=language,
-                name=cfg.all_languages[language],
-                is_complete=(language not in cfg.incomplete_languages)
-            ))
+        add_languages(session)
 
         # Create object used for detecting if an item is unmapped
         item_tracker = ItemTracker(mhdata)
 
-        # Build the individual components
-        # These functions are defined lower down in the file
-        build_items(session, mhdata, item_tracker)
-        build_locations(session, mhdata, item_tracker)
-        build_monsters(session, mhdata, item_tracker)
-        build_skills(session, mhdata)
-        build_armor(session, mhdata)
-        build_weapons(session, mhdata)
-        build_kinsects(session, mhdata)
-        build_decorations(session, mhdata)
-        build_charms(session, mhdata)
-        build_tools(session, mhdata)
-        build_quests(session, mhdata, item_tracker)
+        build_steps = create_build_steps(session, mhdata, item_tracker,
+            lookup_tables=lookup_tables, search_index=search_index)
+
+        for build_fn, args in build_steps:
+            with profiling.stage(build_fn.__name__, session=session):
+                build_fn(*args)
 
         item_tracker.print_unmarked()
-        
+
+        with profiling.stage('commit'):
+            session.commit()
+
     print("Finished build")
 
+def add_languages(session : sqlalchemy.orm.Session):
+    for language in cfg.supported_languages:
+        session.add(db.Language(
+            id=language,
+            name=cfg.all_languages[language],
+            is_complete=(language not in cfg.incomplete_languages)
+        ))
+
+def create_build_steps(session : sqlalchemy.orm.Session, mhdata, item_tracker: ItemTracker, *,
+        lookup_tables=True, search_index=True):
+    """Returns the list of (build function, args) tuples that build the database, in the order they must run.
+    These functions are defined lower down in the file"""
+    build_steps = [
+        (build_items, (session, mhdata, item_tracker)),
+        (build_locations, (session, mhdata, item_tracker)),
+        (build_monsters, (session, mhdata, item_tracker)),
+        (build_skills, (session, mhdata)),
+        (build_armor, (session, mhdata)),
+        (build_weapons, (session, mhdata)),
+        (build_kinsects, (session, mhdata)),
+        (build_decorations, (session, mhdata)),
+        (build_charms, (session, mhdata)),
+        (build_tools, (session, mhdata)),
+        (build_quests, (session, mhdata, item_tracker)),
+    ]
+    if lookup_tables:
+        build_steps.append((build_lookup_tables, (session,)))
+    if search_index:
+        build_steps.append((build_search_index, (session,)))
+    return build_steps
+
 
 def build_items(session : sqlalchemy.orm.Session, mhdata, item_tracker: ItemTracker):
     # Save basic item data first
@@ -544,17 +571,10 @@ def build_weapons(session : sqlalchemy.orm.Session, mhdata):
 
         session.add(melody)
 
-    # Prepass to determine which weapons are "final"
-    # All items that are a previous to another are "not final"
-    all_final = set(weapon_map.keys())
-    for entry in weapon_map.values():
-        if not entry.get('previous_en', None):
-            continue
-        try:
-            prev_id = weapon_map.id_of('en', entry['previous_en'], entry['weapon_type'])
-            all_final.remove(prev_id)
-        except KeyError:
-            pass
+    # Weapons that are a previous to another are "not final"
+    weapon_tree = mhdata.weapon_tree
+    missing_names = [previous_name for _, previous_name in weapon_tree.orphans]
+    ensure(not missing_names, f"Previous weapons {', '.join(missing_names)} do not exist")
 
     # Query next recipe id beforehand
     next_recipe_id = calculate_next_recipe_id(session)
@@ -606,13 +626,8 @@ def build_weapons(session : sqlalchemy.orm.Session, mhdata):
         weapon.notes = entry['notes']
 
         weapon.craftable = False # set to true later if it can be crafted
-        weapon.final = weapon_id in all_final
-
-        previous_weapon_name = entry.get('previous_en', None)
-        if previous_weapon_name:
-            previous_weapon_id = weapon_map.id_of("en", previous_weapon_name, weapon_type)
-            ensure(previous_weapon_id, f"Weapon {previous_weapon_name} does not exist")
-            weapon.previous_weapon_id = previous_weapon_id
+        weapon.final = weapon_tree.is_final(weapon_id)
+        weapon.previous_weapon_id = weapon_tree.parent_of(weapon_id)
 
         # Add crafting/upgrade recipes
         for recipe in entry.get('craft', {}):
@@ -726,6 +741,7 @@ def build_decorations(session : sqlalchemy.orm.Session, mhdata):
 
     skill_map = mhdata.skill_map
     decoration_map = mhdata.decoration_map
+    decoration_drops = mhdata.decoration_drops
 
     for decoration_id, entry in decoration_map.items():
         skills = list(datafn.iter_skill_levels(entry, amount=2, pad=True))
@@ -755,6 +771,15 @@ def build_decorations(session : sqlalchemy.orm.Session, mhdata):
                 name=get_translated(entry, 'name', language)
             ))
 
+        for feystone, chance in decoration_drops.chances(decoration_id).items():
+            if not chance:
+                continue
+            decoration.chances.append(db.DecorationChance(
+                feystone=feystone,
+                percent=float(chance * 100),
+                expected_feystones=float(decoration_drops.expected_feystones(decoration_id, feystone))
+            ))
+
         session.add(decoration)
 
     print("Built Decorations")
@@ -0,0 +1,349 @@
+"""
+Keeps the loaded data in memory and updates the built database as source files change.
+
+The first run loads everything and does a full build, while recording
+which files each collection is loaded from, which collections each build step reads,
+and which tables each build step writes to. When a file is saved,
+only the collections loaded from that file are reloaded, all of the loaded data is revalidated,
+and only the build steps that read those collections are run again,
+after clearing the tables those steps write to. The reported update time includes that full validation.
+
+Build steps that write to the same table are run together, unless each step's rows can be
+found through foreign keys, as with recipe_item. Replaced recipes get new ids, so ids may differ from a full build.
+Steps that only read the database (lookup tables and search) run after every update.
+"""
+
+import os
+import time
+
+import sqlalchemy
+
+import mhdata.sql as db
+from mhdata.io import DataReader, create_reader, data_path
+from mhdata.load import process_data, run_validation
+from mhdata.load.validate import print_diagnostics
+from mhdata.load.loaddata import loaders, derived_data, add_derived_data
+from mhdata.load.validation import errors
+
+from . import sql
+from .itemtracker import ItemTracker
+
+# Tables that are added before the build steps, and are never rebuilt
+_base_tables = ('language',)
+
+class _TrackingReader(DataReader):
+    "A DataReader that records every file it reads, relative to the data path"
+
+    def __init__(self, reader: DataReader):
+        super().__init__(languages=reader.languages, data_path=reader.data_path)
+        self.files = set()
+
+    def get_data_path(self, *rel_path):
+        path = super().get_data_path(*rel_path)
+        self.files.add(os.path.relpath(path, self.data_path).replace(os.sep, '/'))
+        return path
+
+
+class _AccessRecorder:
+    "Wraps the loaded data and records which attributes were read"
+
+    def __init__(self, target):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, 'accessed', set())
+
+    def __getattr__(self, name):
+        self.accessed.add(name)
+        return getattr(self._target, name)
+
+
+def _count_rows(session):
+    session.flush()
+    return {
+        table.name: session.execute(sqlalchemy.select(sqlalchemy.func.count()).select_from(table)).scalar()
+        for table in db.Base.metadata.sorted_tables
+    }
+
+def scan_files(source_path):
+    "Returns a mapping of relative file path -> modification time for every data file"
+    results = {}
+    for root, dirnames, filenames in os.walk(source_path):
+        # Hidden folders hold generated files, such as the compiled sources
+        dirnames[:] = [d for d in dirnames if not d.startswith('.')]
+        for filename in filenames:
+            # Skip lock files created by office programs while a file is open
+            if filename.startswith('.~lock') or filename.startswith('~$'):
+                continue
+            path = os.path.join(root, filename)
+            rel_path = os.path.relpath(path, source_path).replace(os.sep, '/')
+            try:
+                results[rel_path] = os.stat(path).st_mtime
+            except FileNotFoundError:
+                pass
+    return results
+
+def changed_between(old_files, new_files):
+    "Returns the files that were added, changed, or deleted between two results of scan_files()"
+    changed = set(filename for filename, mtime in new_files.items() if old_files.get(filename, None) != mtime)
+    changed.update(filename for filename in old_files.keys() if filename not in new_files)
+    return changed
+
+
+class BuildWatcher:
+    """Holds the loaded data, and updates it and the database at output_filename when files change.
+    Call start() for the initial load and build, then update() with the changed files.
+    To keep the data without building, call load() and reload() instead."""
+
+    def __init__(self, output_filename, *, source_path=None, lookup_tables=True, search_index=True):
+        self.output_filename = output_filename
+        self.source_path = source_path or data_path
+        self.lookup_tables = lookup_tables
+        self.search_index = search_index
+
+        self.mhdata = None
+        self.diagnostics = []
+        self.built = False
+
+        # Collections that changed since the database was last built,
+        # including those of updates that failed validation
+        self.pending = set()
+
+        # relative file path -> modification time, when the files were last loaded
+        self.known_files = {}
+
+        # collection name -> set of files it was loaded from
+        self.collection_files = {}
+
+        # build step name -> (collections read, tables written)
+        self.step_reads = {}
+        self.step_tables = {}
+
+    def _load_collection(self, name):
+        reader = _TrackingReader(create_reader(self.source_path))
+        data = loaders[name](reader)
+        self.collection_files[name] = reader.files
+        return data
+
+    def collections_for(self, changed_files):
+        """Returns the collections loaded from any of the changed files.
+        Returns None if a file isn't used by a specific collection, which requires a full reload."""
+        collections = set()
+        for filename in changed_files:
+            owners = [name for name, files in self.collection_files.items() if filename in files]
+            if not owners:
+                return None
+            collections.update(owners)
+        return collections
+
+    def changed_files(self):
+        "Returns the files that changed since they were last loaded, and marks them as loaded"
+        current_files = scan_files(self.source_path)
+        changed = changed_between(self.known_files, current_files)
+        self.known_files = current_files
+        return changed
+
+    def load(self):
+        "Loads and validates all data without building. Returns true if validation succeeded"
+        from types import SimpleNamespace
+
+        self.known_files = scan_files(self.source_path)
+        self.mhdata = SimpleNamespace()
+        for name in loaders.keys():
+            setattr(self.mhdata, name, self._load_collection(name))
+        add_derived_data(self.mhdata)
+        process_data(self.mhdata, self.source_path)
+
+        return self.validate()
+
+    def validate(self):
+        "Validates the loaded data, printing and storing the diagnostics. Returns true if validation succeeded"
+        self.diagnostics = run_validation(self.mhdata)
+        print_diagnostics(self.diagnostics)
+        return not errors(self.diagnostics)
+
+    def start(self):
+        "Loads all data and builds the database. Returns true if validation succeeded"
+        if not self.load():
+            return False
+
+        self.full_build()
+        return True
+
+    def full_build(self):
+        "Builds the database, recording what each build step reads and writes"
+        sessionbuilder = db.recreate_database(self.output_filename)
+        with db.session_scope(sessionbuilder) as session:
+            sql.add_languages(session)
+            recorder = _AccessRecorder(self.mhdata)
+            item_tracker = ItemTracker(self.mhdata)
+            build_steps = sql.create_build_steps(session, recorder, item_tracker,
+                lookup_tables=self.lookup_tables, search_index=self.search_index)
+
+            counts = _count_rows(session)
+            for build_fn, args in build_steps:
+                recorder.accessed.clear()
+                build_fn(*args)
+
+                new_counts = _count_rows(session)
+                name = build_fn.__name__
+                self.step_reads[name] = set(recorder.accessed)
+                self.step_tables[name] = set(
+                    table for table, count in new_counts.items()
+                    if count != counts[table] and table not in _base_tables)
+                counts = new_counts
+
+        self.built = True
+        self.pending = set()
+
+    def _owns_shared_rows(self, step_name, table_name):
+        """Returns true if the step's own tables have foreign keys to a table it shares with other steps.
+        The step's rows in the shared table can then be found and replaced without rebuilding the other steps"""
+        for table in db.Base.metadata.sorted_tables:
+            if table.name not in self.step_tables[step_name] or table.name == table_name:
+                continue
+            if any(fk.column.table.name == table_name for fk in table.foreign_keys):
+                return True
+        return False
+
+    def steps_for(self, collections):
+        "Returns the names of the build steps that need to run again when the collections change"
+        affected = set(name for name, reads in self.step_reads.items() if reads & collections)
+
+        # Steps that write to the same tables are rebuilt together,
+        # unless the rows of each step can be told apart using foreign keys (ex: recipes)
+        changed = True
+        while changed:
+            changed = False
+            for name, tables in self.step_tables.items():
+                if name in affected:
+                    continue
+                for other in affected:
+                    shared = tables & self.step_tables[other]
+                    if any(not self._owns_shared_rows(other, t) for t in shared):
+                        affected.add(name)
+                        changed = True
+                        break
+
+        # Steps that don't read the loaded data are built from other tables, and always run again
+        if affected:
+            affected.update(name for name, reads in self.step_reads.items() if not reads)
+        return affected
+
+    def reload(self, changed_files):
+        """Reloads the collections loaded from the changed files, without validating.
+        Returns the names of the changed collections, including derived data,
+        or None if the files could not be loaded, in which case the previous data is kept."""
+        collections = self.collections_for(changed_files)
+        if collections is None:
+            collections = set(loaders.keys())
+
+        try:
+            reloaded = { name: self._load_collection(name) for name in collections }
+        except Exception as ex:
+            print(f"ERROR: Could not load {', '.join(sorted(changed_files))}: {ex}")
+            return None
+
+        for name, data in reloaded.items():
+            setattr(self.mhdata, name, data)
+        add_derived_data(self.mhdata, collections)
+        process_data(self.mhdata, self.source_path, collections)
+
+        # Derived data is rebuilt along with its source, so steps reading it are affected too
+        collections.update(name for name, (_, source_name) in derived_data.items() if source_name in collections)
+        return collections
+
+    def update(self, changed_files):
+        """Reloads the data from the changed files and updates the database.
+        Returns a dictionary of timings, or None if the update failed."""
+        timings = {}
+
+        start = time.perf_counter()
+        collections = self.reload(changed_files)
+        if collections is None:
+            return None
+        self.pending.update(collections)
+        timings['load'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        valid = self.validate()
+        timings['validate'] = time.perf_counter() - start
+        if not valid:
+            print("Validation failed, the database was not updated")
+            return None
+
+        start = time.perf_counter()
+        steps = self.steps_for(self.pending)
+        self.rebuild_steps(steps)
+        self.pending = set()
+        timings['build'] = time.perf_counter() - start
+        timings['steps'] = [name for name in self.step_reads.keys() if name in steps]
+
+        return timings
+
+    def rebuild_steps(self, step_names):
+        "Clears the tables written by the build steps and runs them again, in a single transaction"
+        if not step_names:
+            return
+
+        tables = set()
+        for name in step_names:
+            tables.update(self.step_tables[name])
+        other_tables = set()
+        for name, step_tables in self.step_tables.items():
+            if name not in step_names:
+                other_tables.update(step_tables)
+
+        sessionbuilder = db.open_database(self.output_filename)
+        with db.session_scope(sessionbuilder) as session:
+            # Rows in tables shared with other steps are only deleted if the rebuilt tables refer to them
+            for table in db.Base.metadata.sorted_tables:
+                if table.name not in tables or table.name in other_tables:
+                    continue
+                for fk in table.foreign_keys:
+                    if fk.column.table.name in tables and fk.column.table.name in other_tables:
+                        session.execute(fk.column.table.delete().where(
+                            fk.column.in_(sqlalchemy.select(fk.parent).where(fk.parent.is_not(None)))))
+
+            # Delete children before their parents
+            for table in reversed(db.Base.metadata.sorted_tables):
+                if table.name in tables and table.name not in other_tables:
+                    session.execute(table.delete())
+
+            item_tracker = ItemTracker(self.mhdata)
+            build_steps = sql.create_build_steps(session, self.mhdata, item_tracker,
+                lookup_tables=self.lookup_tables, search_index=self.search_index)
+            for build_fn, args in build_steps:
+                if build_fn.__name__ in step_names:
+                    build_fn(*args)
+
+    def watch(self, *, interval=0.5):
+        "Polls the source files for changes until interrupted, updating the database on every save"
+        print(f"Watching {os.path.abspath(self.source_path)} for changes. Press Ctrl+C to stop")
+
+        while True:
+            time.sleep(interval)
+            current_files = scan_files(self.source_path)
+            changed = changed_between(self.known_files, current_files)
+            if not changed:
+                continue
+
+            # Wait until the files stop changing, since programs may save in several writes
+            while True:
+                time.sleep(interval)
+                latest_files = scan_files(self.source_path)
+                if latest_files == current_files:
+                    break
+                current_files = latest_files
+
+            self.known_files = current_files
+            saved_time = max((current_files[f] for f in changed if f in current_files), default=time.time())
+
+            print(f"\nChanged: {', '.join(sorted(changed))}")
+            timings = self.update(changed)
+            if timings is None:
+                continue
+
+            latency = time.time() - saved_time
+            print(f"Updated {self.output_filename} {latency:.2f}s after save " +
+                f"(load {timings['load']:.2f}s, validate {timings['validate']:.2f}s, build {timings['build']:.2f}s)")
+            if timings['steps']:
+                print("Rebuilt " + ', '.join(timings['steps']))
@@ -35,6 +35,9 @@ supported_languages = list(all_languages.keys())
 "Languages that are designated as potentially incomplete"
 incomplete_languages = []
 
+"Languages where word based search is unreliable (no spaces or attached particles). These use substring matching"
+cjk_languages = ('ja', 'ko', 'zh')
+
 "List of all possible armor parts"
 armor_parts = ('head', 'chest', 'arms', 'waist', 'legs')
 
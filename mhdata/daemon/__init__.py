@@ -0,0 +1,109 @@
+"""
+A background process that keeps the loaded and validated data in memory,
+so that tools don't need to pay for imports and a full load on every run.
+
+The daemon is started with `python build.py serve`, and serves a JSON API over HTTP on localhost.
+Every command is a POST to /<command> with a JSON object of arguments, which returns
+{"result": ...} or {"error": "..."}. Commands are listed in mhdata.daemon.server.
+
+Requests must have a Content-Type of application/json, no Origin header, and an X-Daemon-Token
+header with the token the daemon writes next to its source folder (see get_token_path()).
+This keeps web pages, which can send requests to localhost but can't read the token, from using the daemon.
+
+This module only contains the client, and only uses the standard library so that it is quick to import.
+Use connect() to get a client for a running daemon, which returns None if there is none.
+"""
+
+import json
+import os
+import urllib.error
+import urllib.request
+
+default_port = int(os.environ.get('MHDATA_DAEMON_PORT', 8947))
+
+# Same as mhdata.io.data_path, which isn't imported as it loads the rest of the library
+default_source_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../source_data')
+
+token_header = 'X-Daemon-Token'
+
+def get_token_path(source_path=None):
+    "Returns the location of the token of a daemon serving a source folder, which is next to the folder"
+    return os.path.realpath(source_path or default_source_path) + '.daemon_token'
+
+class DaemonError(Exception):
+    "Raised when the daemon returns an error for a command"
+    pass
+
+class DaemonClient:
+    "Sends commands to a daemon listening on localhost"
+
+    def __init__(self, port=None, *, host='127.0.0.1', source_path=None):
+        self.url = f'http://{host}:{port or default_port}'
+        self.token_path = get_token_path(source_path)
+
+    def call(self, command, timeout=None, **arguments):
+        "Runs a command on the daemon and returns its result"
+        # Read on every call, as the token changes when the daemon restarts
+        try:
+            with open(self.token_path, encoding='utf-8') as f:
+                token = f.read().strip()
+        except FileNotFoundError:
+            raise DaemonError(f"No daemon token at {self.token_path}, is the daemon running?")
+
+        request = urllib.request.Request(
+            f'{self.url}/{command}',
+            data=json.dumps(arguments).encode('utf-8'),
+            headers={ 'Content-Type': 'application/json', token_header: token })
+
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                body = response.read()
+        except urllib.error.HTTPError as ex:
+            body = ex.read()
+
+        result = json.loads(body.decode('utf-8'))
+        if 'error' in result:
+            raise DaemonError(result['error'])
+        return result['result']
+
+    def status(self, timeout=None):
+        return self.call('status', timeout=timeout)
+
+    def id_of(self, collection, name, lang='en', keys=()):
+        "Returns the id of the entry with a name in a collection, or None"
+        return self.call('id_of', collection=collection, name=name, lang=lang, keys=list(keys))
+
+    def entity(self, collection, *, id=None, name=None, lang='en', keys=()):
+        "Returns an entry of a collection by id or name as a dictionary, or None"
+        return self.call('entity', collection=collection, id=id, name=name, lang=lang, keys=list(keys))
+
+    def validate_row(self, collection, row, stage='build'):
+        """Validates a single edited row of a collection against the loaded data.
+        The row has the same structure as the result of entity(). Returns a list of diagnostic dictionaries"""
+        return self.call('validate_row', collection=collection, row=row, stage=stage)
+
+    def build(self, output, *, lookups=True, search=True):
+        """Builds the database to output, which is relative to the daemon's working directory.
+        The output must be the daemon's own output, or a .db file in one of its output directories"""
+        return self.call('build', output=output, lookups=lookups, search=search)
+
+    def repair(self, name):
+        "Runs a repair command by its repair.py name"
+        return self.call('repair', name=name)
+
+    def shutdown(self):
+        return self.call('shutdown')
+
+
+def connect(port=None, *, source_path=None):
+    """Returns a client for the daemon running on the port, or None if no daemon is running.
+    If source_path is given, None is also returned if the daemon serves a different source folder."""
+    client = DaemonClient(port, source_path=source_path)
+    try:
+        status = client.status(timeout=1)
+    except (OSError, ValueError, DaemonError):
+        return None
+
+    if source_path and os.path.realpath(source_path) != status['source_path']:
+        return None
+    return client
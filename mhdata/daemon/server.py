@@ -0,0 +1,295 @@
+"""
+The daemon process, which holds a BuildWatcher with the loaded data and serves commands over HTTP.
+
+Commands are run one at a time. Before each command, files that changed since the last command
+are reloaded and revalidated, so results always match the source files.
+Builds to the daemon's own output only rebuild the steps affected by changes since the last build.
+
+Commands are only accepted as JSON POST requests with the daemon's token (see mhdata.daemon),
+and builds can only write .db files inside the daemon's output directories.
+
+Commands (arguments in parentheses):
+- status: the source folder, output, collection sizes, and validation result
+- id_of (collection, name, lang, keys): the id of an entry, or None
+- entity (collection, id or name, lang, keys): an entry as a dictionary, or None
+- validate_row (collection, row, stage): the diagnostics of the collection's row rules for an edited row
+- diagnostics: every diagnostic from the last validation
+- build (output, lookups, search): builds the database, returning the output path and rebuilt steps
+- repair (name): runs a repair command, then reloads the files it saved
+- shutdown: stops the server
+"""
+
+import copy
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from mhdata.io import DataMap, DataRow, data_path
+from mhdata.load import run_row_validation
+from mhdata.load.loaddata import loaders
+from mhdata.load.validation import ERROR, WARNING, errors
+from mhdata.build.watch import BuildWatcher
+from mhdata.build.sql import build_sql_database
+
+from . import DaemonError, default_port, get_token_path, token_header
+
+class BuildDaemon:
+    "Holds the loaded data and runs daemon commands. Use create_server() to serve them"
+
+    def __init__(self, output_filename='mhw.db', *, source_path=None, lookup_tables=True, search_index=True,
+            output_dirs=None):
+        self.watcher = BuildWatcher(output_filename, source_path=source_path,
+            lookup_tables=lookup_tables, search_index=search_index)
+
+        # Folders (and their subfolders) that builds may write .db files to.
+        # Defaults to the working directory and the folder of the daemon's own output
+        output_dirs = output_dirs or [os.getcwd(), os.path.dirname(os.path.abspath(output_filename))]
+        self.output_dirs = [os.path.realpath(d) for d in output_dirs]
+        self.server = None
+        self.started = None
+        self.lock = threading.Lock()
+
+        # Collections that changed since the database was last built
+        self.pending = set()
+
+        # Changed files that could not be loaded, which are retried on the next change
+        self.failed_files = set()
+
+        self.commands = {
+            'status': self.status,
+            'id_of': self.id_of,
+            'entity': self.entity,
+            'validate_row': self.validate_row,
+            'diagnostics': self.diagnostics,
+            'build': self.build,
+            'repair': self.repair,
+            'shutdown': self.shutdown
+        }
+
+        # Commands that don't wait for other commands to finish
+        self.unlocked_commands = ('status', 'shutdown')
+
+    def start(self):
+        "Loads and validates all data"
+        self.watcher.load()
+        self.started = time.time()
+
+    def refresh(self):
+        "Reloads and revalidates the files that changed since the last command"
+        changed = self.watcher.changed_files() | self.failed_files
+        if not changed:
+            return
+
+        print(f"Changed: {', '.join(sorted(changed))}")
+        collections = self.watcher.reload(changed)
+        if collections is None:
+            self.failed_files = changed
+            return
+
+        self.failed_files = set()
+        self.pending.update(collections)
+        self.watcher.validate()
+
+    def run(self, command, arguments):
+        "Runs a command by name, returning (http status, response)"
+        fn = self.commands.get(command, None)
+        if fn is None:
+            return 404, { 'error': f"Unknown command {command}" }
+
+        try:
+            if command in self.unlocked_commands:
+                return 200, { 'result': fn(**arguments) }
+            with self.lock:
+                self.refresh()
+                return 200, { 'result': fn(**arguments) }
+        except DaemonError as ex:
+            return 400, { 'error': str(ex) }
+        except TypeError as ex:
+            return 400, { 'error': f"Invalid arguments for {command}: {ex}" }
+        except Exception as ex:
+            return 500, { 'error': f"{type(ex).__name__}: {ex}" }
+
+    def _data_map(self, collection_name):
+        if collection_name not in loaders:
+            raise DaemonError(f"Unknown collection {collection_name}")
+        collection = getattr(self.watcher.mhdata, collection_name)
+        if not isinstance(collection, DataMap):
+            raise DaemonError(f"Collection {collection_name} does not have ids")
+        return collection
+
+    def status(self):
+        mhdata = self.watcher.mhdata
+        diagnostics = self.watcher.diagnostics
+        return {
+            'source_path': os.path.realpath(self.watcher.source_path),
+            'output': os.path.abspath(self.watcher.output_filename),
+            'uptime': time.time() - self.started,
+            'collections': { name: len(getattr(mhdata, name)) for name in loaders.keys() },
+            'errors': sum(1 for d in diagnostics if d.severity == ERROR),
+            'warnings': sum(1 for d in diagnostics if d.severity == WARNING),
+            'failed_files': sorted(self.failed_files)
+        }
+
+    def id_of(self, collection, name, lang='en', keys=()):
+        return self._data_map(collection).id_of(lang, name, *keys)
+
+    def entity(self, collection, id=None, name=None, lang='en', keys=()):
+        data_map = self._data_map(collection)
+        if id is None:
+            id = data_map.id_of(lang, name, *keys)
+        entry = data_map.get(id, None)
+        return entry.to_dict() if entry is not None else None
+
+    def validate_row(self, collection, row, stage='build'):
+        self._data_map(collection)
+        entry = DataRow(None, row.get('id', None), row)
+        diagnostics = run_row_validation(self.watcher.mhdata, collection, entry, stage)
+        return [d.to_dict() for d in diagnostics]
+
+    def diagnostics(self):
+        return [d.to_dict() for d in self.watcher.diagnostics]
+
+    def _check_output(self, output):
+        "Returns the absolute path of a build output, raising a DaemonError if the daemon may not write to it"
+        own_output = os.path.abspath(self.watcher.output_filename)
+        if output is None or os.path.abspath(output) == own_output:
+            return own_output
+
+        real_output = os.path.realpath(output)
+        real_dir = os.path.dirname(real_output)
+        if not real_output.endswith('.db') or not any(
+                os.path.commonpath([real_dir, allowed]) == allowed for allowed in self.output_dirs):
+            raise DaemonError(f"Output {output} must be a .db file in {', '.join(self.output_dirs)}")
+        return os.path.abspath(output)
+
+    def build(self, output=None, lookups=True, search=True):
+        output = self._check_output(output)
+        if self.failed_files:
+            raise DaemonError(f"Could not load {', '.join(sorted(self.failed_files))}")
+        validation_errors = errors(self.watcher.diagnostics)
+        if validation_errors:
+            raise DaemonError("Validation Failed\n" + '\n'.join(str(d) for d in validation_errors))
+
+        start = time.perf_counter()
+        watcher = self.watcher
+        steps = None
+        if (output == os.path.abspath(watcher.output_filename)
+                and lookups == watcher.lookup_tables and search == watcher.search_index):
+            if watcher.built and os.path.exists(output):
+                step_names = watcher.steps_for(self.pending)
+                watcher.rebuild_steps(step_names)
+                steps = [name for name in watcher.step_reads.keys() if name in step_names]
+            else:
+                watcher.full_build()
+            self.pending = set()
+        else:
+            build_sql_database(output, watcher.mhdata, lookup_tables=lookups, search_index=search)
+
+        return { 'output': output, 'steps': steps, 'seconds': time.perf_counter() - start }
+
+    def repair(self, name):
+        from mhdata.repair import repairs
+
+        if name not in repairs:
+            raise DaemonError(f"Unknown repair {name}, valid repairs are {', '.join(repairs.keys())}")
+        if os.path.realpath(self.watcher.source_path) != os.path.realpath(data_path):
+            raise DaemonError("Repairs can only be run by a daemon serving the source_data folder")
+
+        # Repairs modify the data they're given, which is then reloaded from the saved files
+        repairs[name](copy.deepcopy(self.watcher.mhdata))
+        self.refresh()
+        return True
+
+    def shutdown(self):
+        # Shutting down waits for the server loop, which is serving this request
+        threading.Thread(target=self.server.shutdown).start()
+        return True
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    def _respond(self, status, response):
+        body = json.dumps(response, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _check_request(self):
+        """Returns (http status, error) if the request may come from a web page or lacks the token, otherwise None.
+        Browsers send an Origin header with cross-site POST requests, and can only send
+        application/json to another site after a preflight request, which isn't answered"""
+        if 'Origin' in self.headers:
+            return 403, "Requests from web pages are not accepted"
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            return 415, "Content-Type must be application/json"
+        token = self.headers.get(token_header, '')
+        if not hmac.compare_digest(token.encode('utf-8'), self.server.token.encode('utf-8')):
+            return 403, f"Invalid or missing {token_header} header"
+        return None
+
+    def do_GET(self):
+        self._respond(405, { 'error': "Commands must be sent as POST requests" })
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length)
+
+        rejected = self._check_request()
+        if rejected:
+            status, error = rejected
+            self._respond(status, { 'error': error })
+            return
+
+        try:
+            arguments = json.loads(body.decode('utf-8') or '{}')
+        except ValueError:
+            arguments = None
+        if not isinstance(arguments, dict):
+            self._respond(400, { 'error': "Arguments must be a JSON object" })
+            return
+
+        command = self.path.strip('/')
+        self._respond(*self.server.build_daemon.run(command, arguments))
+
+    def log_message(self, format, *args):
+        # Requests are frequent, so they aren't logged
+        pass
+
+
+class _DaemonServer(ThreadingHTTPServer):
+    def server_close(self):
+        "Closes the server and removes its token, unless another daemon has replaced it since"
+        super().server_close()
+        try:
+            with open(self.token_path, encoding='utf-8') as f:
+                if f.read().strip() != self.token:
+                    return
+            os.remove(self.token_path)
+        except FileNotFoundError:
+            pass
+
+
+def write_token(location):
+    "Creates a new random token for a daemon, and writes it to location. Returns the token"
+    token = secrets.token_hex(32)
+    fd = os.open(location, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(token)
+    return token
+
+def create_server(daemon: BuildDaemon, port=None):
+    """Creates a server for the daemon on localhost, and writes its token next to the source folder.
+    Call serve_forever() on the result to start serving, and server_close() to stop and remove the token.
+    Port 0 picks any free port, which is available as server.server_address[1]"""
+    server = _DaemonServer(('127.0.0.1', default_port if port is None else port), _RequestHandler)
+    server.build_daemon = daemon
+    server.token_path = get_token_path(daemon.watcher.source_path)
+    server.token = write_token(server.token_path)
+    daemon.server = server
+    return server
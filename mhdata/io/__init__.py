@@ -21,14 +21,15 @@ from .csv import read_csv
 import os.path
 data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '../../source_data')
 
-def create_reader():
-    "Creates a DataReader with default settings"
+def create_reader(source_path=None):
+    """Creates a DataReader with default settings.
+    Reads from the source_data folder unless another source_path is given"""
     from mhdata import cfg
     import os
 
     return DataReader(
         languages=list(cfg.supported_languages), 
-        data_path=data_path
+        data_path=source_path or data_path
     )
 
 def create_writer():
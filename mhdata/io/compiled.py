@@ -0,0 +1,199 @@
+"""
+A compiled copy of the csv files in the source data, used to load the data without parsing csv text.
+
+The csv files remain the source of truth, and are what gets edited. compile_sources() stores
+the rows of every csv in one SQLite file per subsystem (the first folder of the csv's path),
+inside the .compiled folder of the source data. Each compiled file remembers the modification time,
+size and hash of the csv files it was compiled from. A csv is only read from its compiled copy
+if it is unchanged, so edited files are always read from the csv until they are compiled again.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+
+from .csv import read_csv, validate_csv
+
+compiled_dirname = '.compiled'
+
+def subsystem_of(rel_path):
+    "Returns the name of the compiled file a csv (relative to the source data) is stored in"
+    parts = rel_path.replace(os.sep, '/').split('/')
+    return parts[0] if len(parts) > 1 else '_root'
+
+def hash_file(location):
+    with open(location, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+def find_csv_files(data_path):
+    "Returns the relative path of every csv file in the source data, skipping hidden folders"
+    results = []
+    for root, dirnames, filenames in os.walk(data_path):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+        for filename in sorted(filenames):
+            if filename.endswith('.csv'):
+                path = os.path.join(root, filename)
+                results.append(os.path.relpath(path, data_path).replace(os.sep, '/'))
+    return results
+
+
+class CompiledSources:
+    "Reads csv rows from the compiled files of a source data folder, when they are up to date"
+
+    def __init__(self, data_path):
+        self.data_path = data_path
+        self.compiled_path = os.path.join(data_path, compiled_dirname)
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def get_compiled_location(self, subsystem):
+        return os.path.join(self.compiled_path, subsystem + '.sqlite')
+
+    def _relative(self, location):
+        return os.path.relpath(location, self.data_path).replace(os.sep, '/')
+
+    def _load_sources(self, subsystem):
+        """Returns a mapping of relative path -> source row for a compiled file, or None if there is none.
+        Cached until the compiled file changes"""
+        location = self.get_compiled_location(subsystem)
+        try:
+            mtime = os.stat(location).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._sources.get(subsystem, None)
+            if cached and cached[0] == mtime:
+                return cached[1]
+
+        with sqlite3.connect(f'file:{location}?mode=ro', uri=True) as conn:
+            sources = {}
+            for file, table, fields, mtime_ns, size, hash in conn.execute(
+                    'SELECT file, table_name, fields, mtime_ns, size, hash FROM sources'):
+                sources[file] = {
+                    'table': table, 'fields': json.loads(fields),
+                    'mtime_ns': mtime_ns, 'size': size, 'hash': hash
+                }
+        conn.close()
+
+        with self._lock:
+            self._sources[subsystem] = (mtime, sources)
+        return sources
+
+    def _source_of(self, rel_path):
+        "Returns the compiled source entry of a csv if it is up to date, otherwise None"
+        sources = self._load_sources(subsystem_of(rel_path))
+        source = sources and sources.get(rel_path, None)
+        if not source:
+            return None
+
+        try:
+            stat = os.stat(os.path.join(self.data_path, rel_path))
+        except FileNotFoundError:
+            return None
+        if stat.st_size != source['size']:
+            return None
+        if stat.st_mtime_ns == source['mtime_ns']:
+            return source
+
+        # The file was touched (such as by a checkout), but may be unchanged
+        if hash_file(os.path.join(self.data_path, rel_path)) == source['hash']:
+            return source
+        return None
+
+    def is_fresh(self, rel_path):
+        "Returns true if a csv (relative to the source data) has an up to date compiled copy"
+        return self._source_of(rel_path) is not None
+
+    def stale_files(self):
+        "Returns the csv files that are not compiled, or were changed since they were compiled"
+        return [f for f in find_csv_files(self.data_path) if not self.is_fresh(f)]
+
+    def read(self, location):
+        "Returns the rows of a csv from its compiled copy, or None if it has no up to date copy"
+        if not os.path.isdir(self.compiled_path):
+            return None
+
+        rel_path = self._relative(location)
+        source = self._source_of(rel_path)
+        if not source:
+            return None
+
+        compiled_location = self.get_compiled_location(subsystem_of(rel_path))
+        with sqlite3.connect(f'file:{compiled_location}?mode=ro', uri=True) as conn:
+            rows = conn.execute(f'SELECT * FROM "{source["table"]}" ORDER BY rowid').fetchall()
+        conn.close()
+
+        fields = source['fields']
+        results = [dict(zip(fields, row)) for row in rows]
+        validate_csv(results, location)
+        return results
+
+
+def _compile_subsystem(location, data_path, files):
+    "Writes the rows of the csv files to a new compiled file at location"
+    directory = os.path.dirname(location)
+    fd, temp_location = tempfile.mkstemp(dir=directory, prefix='.tmp-', suffix='.sqlite')
+    os.close(fd)
+    try:
+        conn = sqlite3.connect(temp_location)
+        with conn:
+            conn.execute('CREATE TABLE sources (file TEXT PRIMARY KEY, table_name TEXT, ' +
+                'fields TEXT, mtime_ns INTEGER, size INTEGER, hash TEXT)')
+            for idx, rel_path in enumerate(files):
+                csv_location = os.path.join(data_path, rel_path)
+                stat = os.stat(csv_location)
+                rows = read_csv(csv_location)
+
+                # Fields come from the header, so that empty files keep their columns
+                with open(csv_location, encoding='utf-8') as f:
+                    fields = next(csv.reader(f), [])
+                if any(list(row.keys()) != fields for row in rows):
+                    print(f"Warning: {rel_path} has rows that don't match its header, it will not be compiled")
+                    continue
+
+                table = f'rows_{idx}'
+                columns = ', '.join(f'c{i}' for i in range(len(fields))) or 'empty'
+                conn.execute(f'CREATE TABLE {table} ({columns})')
+                if fields:
+                    placeholders = ', '.join('?' * len(fields))
+                    conn.executemany(f'INSERT INTO {table} VALUES ({placeholders})',
+                        (list(row.values()) for row in rows))
+                conn.execute('INSERT INTO sources VALUES (?, ?, ?, ?, ?, ?)', (
+                    rel_path, table, json.dumps(fields),
+                    stat.st_mtime_ns, stat.st_size, hash_file(csv_location)))
+        conn.close()
+        os.replace(temp_location, location)
+    except:
+        os.remove(temp_location)
+        raise
+
+def compile_sources(data_path, force=False):
+    """Compiles the csv files of every subsystem that has a new, changed, or removed csv file.
+    Returns the names of the subsystems that were compiled"""
+    compiled = CompiledSources(data_path)
+    os.makedirs(compiled.compiled_path, exist_ok=True)
+
+    subsystems = {}
+    for rel_path in find_csv_files(data_path):
+        subsystems.setdefault(subsystem_of(rel_path), []).append(rel_path)
+
+    results = []
+    for subsystem, files in subsystems.items():
+        sources = compiled._load_sources(subsystem) or {}
+        up_to_date = set(sources.keys()) == set(files) and all(compiled.is_fresh(f) for f in files)
+        if up_to_date and not force:
+            continue
+        _compile_subsystem(compiled.get_compiled_location(subsystem), data_path, files)
+        results.append(subsystem)
+
+    # Remove compiled files of subsystems that no longer have csv files
+    for filename in os.listdir(compiled.compiled_path):
+        if filename.endswith('.sqlite') and filename[:-len('.sqlite')] not in subsystems:
+            os.remove(os.path.join(compiled.compiled_path, filename))
+
+    return results
@@ -1,20 +1,34 @@
 import csv
+import io
 
 import contextlib
+from mhdata.io.output import write_atomic
 import mhdata.typecheck as typecheck
 import mhdata.util as util
 
+# Types that are always scalar, checked before falling back to typecheck.is_scalar
+_scalar_types = frozenset((str, int, float, bool, type(None)))
+
 def determine_fields(obj_list):
     """
-    Returns the set of all possible keys in the object list
+    Returns the list of all possible keys in the object list, in the order they first appear.
+    Raises an exception if any value is not a scalar.
     """
-    fields = []
+    fields = {}
+    checked_types = set(_scalar_types)
     for obj in obj_list:
-        for key in obj.keys():
-            if key not in fields:
-                fields.append(key)
+        fields.update(dict.fromkeys(obj))
+        for value in obj.values():
+            value_type = type(value)
+            if value_type in checked_types:
+                continue
+            if not typecheck.is_scalar(value):
+                raise Exception("Cannot save CSV, the data is not completely flat")
+            # Values such as Decimal are scalar, but are checked the slow way only once per type
+            if not typecheck.is_flat_iterable(value):
+                checked_types.add(value_type)
 
-    return fields
+    return list(fields)
 
 def validate_csv(obj_list, filename):
     "Minor validation. Warning for any key/value without whitespace"
@@ -50,23 +64,32 @@ def open_resolved(path_or_file, mode, encoding):
 
     try:
         yield f
-    except:
-        if not is_path:
+    finally:
+        if is_path:
             f.close()
 
-def save_csv(obj_list, location, fields=None):
-    """Saves a dict list as a  CSV, doing some last minute validations. 
+def render_csv(obj_list, fields=None):
+    """Returns a dict list rendered as CSV text, doing some last minute validations.
     Fields are auto-determined"""
+    if fields:
+        determine_fields(obj_list)
+    else:
+        fields = determine_fields(obj_list)
 
-    if not typecheck.is_flat_dict_list(obj_list):
-        raise Exception("Cannot save CSV, the data is not completely flat")
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fields, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(obj_list)
+    return buffer.getvalue()
 
-    if not fields:
-        fields = determine_fields(obj_list)
-    with open_resolved(location, 'w', encoding='utf-8') as f:
-        writer = csv.DictWriter(f, fields, lineterminator='\n')
-        writer.writeheader()
-        writer.writerows(obj_list)
+def save_csv(obj_list, location, fields=None):
+    """Saves a dict list as a  CSV, doing some last minute validations. 
+    Fields are auto-determined. Paths are replaced atomically once the whole file is rendered"""
+    text = render_csv(obj_list, fields)
+    if isinstance(location, str):
+        write_atomic(location, text)
+    else:
+        location.write(text)
 
 
 def read_csv(location, fieldnames=None):
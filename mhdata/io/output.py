@@ -0,0 +1,158 @@
+"""
+Tracks the files written to the source data, so that merges only rewrite files whose content changes.
+
+Writers render a file in memory and compare it to the file on disk. Unchanged files are skipped,
+and changed files are replaced atomically, so an interrupted merge never leaves a partial file.
+While an output session is enabled, every file written is recorded along with a row level summary
+of what changed, and in dry run mode nothing is written at all.
+"""
+
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import threading
+import typing
+
+_active_output = None
+
+class FileChange(typing.NamedTuple):
+    "The changes made to a single file. Counts are rows grouped by their first column, or None if not a csv"
+    location: str
+    created: bool
+    added: typing.Optional[int] = None
+    removed: typing.Optional[int] = None
+    changed: typing.Optional[int] = None
+
+    def describe(self):
+        if self.added is None:
+            return 'created' if self.created else 'rewritten'
+        result = f"{self.added} added, {self.removed} removed, {self.changed} changed"
+        return f"created, {result}" if self.created else result
+
+
+def _group_csv_rows(text):
+    "Groups the rows of a csv by the value of the first column, for entries that span multiple rows"
+    groups = {}
+    reader = csv.reader(io.StringIO(text or ''))
+    next(reader, None)
+    for row in reader:
+        key = row[0] if row else ''
+        groups.setdefault(key, []).append(row)
+    return groups
+
+def diff_csv(location, old_text, new_text):
+    "Compares two renderings of a csv file, returning a FileChange"
+    old_groups = _group_csv_rows(old_text)
+    new_groups = _group_csv_rows(new_text)
+
+    # A header change alters every row, even if the values are the same
+    same_header = (old_text or '').partition('\n')[0] == new_text.partition('\n')[0]
+    changed = sum(1 for key, rows in new_groups.items()
+        if key in old_groups and (old_groups[key] != rows or not same_header))
+
+    return FileChange(
+        location=location,
+        created=old_text is None,
+        added=sum(1 for key in new_groups if key not in old_groups),
+        removed=sum(1 for key in old_groups if key not in new_groups),
+        changed=changed)
+
+def read_existing(location):
+    "Returns the text content of a file, or None if it doesn't exist"
+    if not os.path.exists(location):
+        return None
+    with open(location, encoding='utf-8') as f:
+        return f.read()
+
+def write_atomic(location, text):
+    "Writes text to a temporary file next to location, and then replaces location with it"
+    dirname = os.path.dirname(os.path.abspath(location))
+    os.makedirs(dirname, exist_ok=True)
+    fd, temp_location = tempfile.mkstemp(dir=dirname, prefix='.tmp-', suffix=os.path.basename(location))
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_location, location)
+    except:
+        os.remove(temp_location)
+        raise
+
+
+class MergeOutput:
+    "Records the files written while enabled. In dry run mode, the files are recorded but not written"
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.changes = []
+        self.unchanged = []
+        self._lock = threading.Lock()
+
+    def record(self, location, change: typing.Optional[FileChange]):
+        "Records a file that was written, or that was unchanged if change is None"
+        with self._lock:
+            if change:
+                self.changes.append(change)
+            else:
+                self.unchanged.append(location)
+
+    def print_summary(self):
+        "Prints every changed file with the number of changed rows"
+        if self.dry_run:
+            print("Dry run, no files were written. Changes that would be made:")
+        else:
+            print("Changes made:")
+        for change in sorted(self.changes, key=lambda c: c.location):
+            print(f"    {change.location}: {change.describe()}")
+        if not self.changes:
+            print("    None")
+        print(f"{len(self.changes)} files changed, {len(self.unchanged)} files unchanged")
+
+
+def write_text(location, text, *, display_name=None, is_csv=False):
+    """Writes text to a file if its content changed, recording the change in the active output.
+    Returns whether the file changed"""
+    display_name = display_name or location
+    existing = read_existing(location)
+    if existing == text:
+        if _active_output:
+            _active_output.record(display_name, None)
+        return False
+
+    if _active_output:
+        if is_csv:
+            change = diff_csv(display_name, existing, text)
+        else:
+            change = FileChange(display_name, created=existing is None)
+        _active_output.record(display_name, change)
+        if _active_output.dry_run:
+            return True
+
+    write_atomic(location, text)
+    return True
+
+def enable(output: MergeOutput):
+    "Activates a merge output. Files written afterwards are recorded by it"
+    global _active_output
+    _active_output = output
+
+def disable():
+    "Deactivates the current merge output, returning it"
+    global _active_output
+    output = _active_output
+    _active_output = None
+    return output
+
+@contextlib.contextmanager
+def session(dry_run=False):
+    "Context manager that records files written inside it, yielding the merge output"
+    output = MergeOutput(dry_run)
+    enable(output)
+    try:
+        yield output
+    finally:
+        disable()
+
+def is_dry_run():
+    return _active_output is not None and _active_output.dry_run
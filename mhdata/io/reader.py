@@ -12,6 +12,7 @@ from mhdata.util import group_fields
 from .functions import merge_list, fix_id
 
 from mhdata.io.csv import read_csv
+from .compiled import CompiledSources
 
 def apply_schema_to_map(map, schema):
     "Internal helper to apply a marshmallow schema to the values of a map."
@@ -31,13 +32,24 @@ class DataReader:
     """A class used to deserialize objects from the data files.
     The languages parameters sets the expected languages,
     and the required languages sets the ones that are validated for existance.
+    Csv files are read from their compiled copy when it is up to date, unless use_compiled is False.
     """
 
     def __init__(self, *,
             languages: typing.List,
-            data_path: str):
+            data_path: str,
+            use_compiled=True):
         self.languages = languages
         self.data_path = data_path
+        self.compiled = CompiledSources(str(data_path)) if use_compiled else None
+
+    def _read_csv(self, data_file):
+        "Reads a csv file in the data folder, using its compiled copy if it is up to date"
+        if self.compiled:
+            rows = self.compiled.read(data_file)
+            if rows is not None:
+                return rows
+        return read_csv(data_file)
 
     def get_data_path(self, *rel_path):
         """Returns a file path to a file stored in the data folder using one or more
@@ -64,7 +76,7 @@ class DataReader:
         """Loads a simple csv without processing. 
         Accepts marshmallow schema to transform and validate it"""
         data_file = self.get_data_path(data_file)
-        data = read_csv(data_file)
+        data = self._read_csv(data_file)
 
         if schema:
             # When version 3 is released, this api will change
@@ -120,7 +132,7 @@ class DataReader:
         data_file = self.get_data_path(data_file)
         groups = ['name'] + groups
 
-        rows = [group_fields(row, groups=groups) for row in read_csv(data_file)]
+        rows = [group_fields(row, groups=groups) for row in self._read_csv(data_file)]
 
         basemap = DataMap(languages=languages, keys_ex=keys_ex)
         basemap.extend(rows)
@@ -2,7 +2,7 @@ import json
 import os.path
 import collections.abc
 
-from mhdata.util import joindicts, extract_fields, group_fields
+from mhdata.util import joindicts, extract_fields, group_fields, profiling
 from .datamap import DataMap
 from .reader import DataReader
 from .functions import merge_list, fix_id
@@ -45,13 +45,14 @@ class DataStitcher:
         if not self._base_fname:
             raise Exception("Data Map uninitialized, use base_csv function first")
 
-        self._data_map = self.reader.load_base_csv(
-            self._base_fname,
-            self.languages,
-            groups=self._base_groups,
-            translation_filename=self._base_translate_fname,
-            translation_extra=self._base_translate_groups,
-            keys_ex=self.keys_ex)
+        with profiling.stage(self._base_fname):
+            self._data_map = self.reader.load_base_csv(
+                self._base_fname,
+                self.languages,
+                groups=self._base_groups,
+                translation_filename=self._base_translate_fname,
+                translation_extra=self._base_translate_groups,
+                keys_ex=self.keys_ex)
 
         return self._data_map
 
@@ -126,8 +127,10 @@ class DataStitcher:
             raise ValueError('Key must have a value')
 
         data_file = self._get_filename(data_file)
-        rows = fix_id(self.reader.load_list_csv(data_file))
-        merge_list(self.data_map, rows, key=key, groups=groups, many=True)
+        data_map = self.data_map
+        with profiling.stage(data_file):
+            rows = fix_id(self.reader.load_list_csv(data_file))
+            merge_list(data_map, rows, key=key, groups=groups, many=True)
 
         return self
 
@@ -141,8 +144,10 @@ class DataStitcher:
         """
 
         data_file = self._get_filename(data_file)
-        rows = fix_id(self.reader.load_list_csv(data_file))
-        merge_list(self.data_map, rows, key=key, many=False)
+        data_map = self.data_map
+        with profiling.stage(data_file):
+            rows = fix_id(self.reader.load_list_csv(data_file))
+            merge_list(data_map, rows, key=key, many=False)
 
         return self
     
@@ -151,22 +156,28 @@ class DataStitcher:
         If schema is provided, returns the items run through the marshmallow schema
         """
         if schema:
-            results = DataMap(languages=self.languages, keys_ex=self.keys_ex)
-            for entry in self.data_map.values():
-                data = entry.to_dict()
-                (converted, errors) = schema.load(data, many=False) # converted
+            data_map = self.data_map
+            with profiling.stage(f"schema {type(schema).__name__}"):
+                return self._apply_schema(data_map, schema)
 
-                if errors:
-                    name = entry.name('en')
-                    raise Exception(f"Error loading {name}: {str(errors)}")
+        return self.data_map
 
-                # id may have changed type or value:
-                # get the converted id before the original,
-                # but default to original if missing or falsey
-                entry_id = converted.get('id', None) or entry.id
+    def _apply_schema(self, data_map, schema):
+        "Returns a new map where the entries of data_map have been run through the schema"
+        results = DataMap(languages=self.languages, keys_ex=self.keys_ex)
+        for entry in data_map.values():
+            data = entry.to_dict()
+            (converted, errors) = schema.load(data, many=False) # converted
 
-                results.add_entry(entry_id, converted)
-                
-            return results
+            if errors:
+                name = entry.name('en')
+                raise Exception(f"Error loading {name}: {str(errors)}")
 
-        return self.data_map
+            # id may have changed type or value:
+            # get the converted id before the original,
+            # but default to original if missing or falsey
+            entry_id = converted.get('id', None) or entry.id
+
+            results.add_entry(entry_id, converted)
+
+        return results
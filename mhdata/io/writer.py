@@ -1,36 +1,64 @@
 # The save methods are not part of the build process
 # They are used whenever I am pulling new data from other sources.
 
+import contextlib
 import json
 import collections
 import os
 import os.path
 import copy
+from concurrent.futures import ThreadPoolExecutor
 
 import mhdata.util as util
 from .datamap import DataMap
 from .reader import DataReader
 
 from mhdata.util import ungroup_fields, typecheck, extract_fields
-from mhdata.io.csv import save_csv
+from mhdata.io.csv.functions import render_csv
+from . import output
 
 class DataReaderWriter(DataReader):
-    "A data reader that can also be used to create and update data"
+    """A data reader that can also be used to create and update data.
+    Files are only written if their content changes, see mhdata.io.output"""
+
+    _executor = None
+
+    @contextlib.contextmanager
+    def concurrent_writes(self, max_workers=4):
+        """Context manager where files saved by this writer are written concurrently.
+        Files are still rendered in order, and all are written once the block exits.
+        The first error raised while writing is raised on exit."""
+        futures = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            self._executor = (executor, futures)
+            try:
+                yield self
+            finally:
+                self._executor = None
+        for future in futures:
+            future.result()
+
+    def _write_text(self, location, text, is_csv=False):
+        args = (self.get_data_path(location), text)
+        kwargs = { 'display_name': location, 'is_csv': is_csv }
+        if self._executor:
+            executor, futures = self._executor
+            futures.append(executor.submit(output.write_text, *args, **kwargs))
+        else:
+            output.write_text(*args, **kwargs)
 
     def save_csv(self, location, rows, *, schema=None):
         "Saves a raw csv relative to the source data location"
         if schema:
             rows, errors = schema.dump(rows, many=True)
-        location = self.get_data_path(location)
-        save_csv(rows, location)
+        self._write_text(location, render_csv(rows), is_csv=True)
+
+    def _save_json(self, location, obj):
+        self._write_text(location, json.dumps(obj, indent=4, ensure_ascii=False))
 
     def save_base_map(self, location, base_map):
         "Writes a data map to a location in the data directory"
-        location = self.get_data_path(location)
-        result = base_map.to_list()
-
-        with open(location, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=4, ensure_ascii=False)
+        self._save_json(location, base_map.to_list())
 
     def save_base_map_csv(self, location, base_map: DataMap, *, groups=['name'], schema=None, translation_filename=None, translation_extra=[], key_join='name_en'):
         """
@@ -84,10 +112,8 @@ class DataReaderWriter(DataReader):
 
         At least one of key or fields is required
         """
-        location = self.get_data_path(location)
         result = data_map.extract(key=key, fields=fields, key_join=key_join)
-        with open(location, 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=4, ensure_ascii=False)
+        self._save_json(location, result)
 
     def save_data_csv(self, location, data_map: DataMap, *,
             key_join='name_en',
@@ -6,20 +6,42 @@ validate the data, and do postprocessing.
 Use load_data to load the source data as is, or load_data_processed
 to perform post processing and validation. Use the datafn submodule's
 collection of helper functions to better read this data.
+
+Loading imports marshmallow, so load_data is imported when first used.
 """
 
-from .loaddata import load_data
-from .validate import validate
+from .validate import validate, run_validation, run_row_validation
+
+from mhdata.util import lazy_attributes
+
+__getattr__ = lazy_attributes(__name__, { 'load_data': '.loaddata' })
 
-def load_data_processed():
-    "Loads data from source_data/ folder, and validates and post-processes it"
+def process_data(mhdata, source_path=None, collections=None):
+    """Performs post processing on loaded data.
+    If collections is given, only the processing for those collections is done"""
     from . import process
+    from mhdata.io import data_path
+
+    if collections is None or 'skill_map' in collections:
+        process.copy_skill_descriptions(mhdata.skill_map)
+    if collections is None or 'decoration_map' in collections:
+        mhdata.decoration_drops = process.extend_decoration_chances(mhdata.decoration_map, source_path or data_path)
+
+def load_data_processed(source_path=None, validation_stage='build'):
+    """Loads data from source_data/ folder (or source_path if given),
+    and validates and post-processes it.
+    All validation rules up to validation_stage are run (see the validation module)."""
+    from mhdata.util import profiling
+    from .loaddata import load_data
+
+    with profiling.stage('load_data'):
+        mhdata = load_data(source_path)
 
-    mhdata = load_data()
-    process.copy_skill_descriptions(mhdata.skill_map)
-    process.extend_decoration_chances(mhdata.decoration_map)
+    with profiling.stage('process'):
+        process_data(mhdata, source_path)
 
-    if not validate(mhdata):
-        raise Exception("Validation Failed")
+    with profiling.stage('validate'):
+        if not validate(mhdata, validation_stage):
+            raise Exception("Validation Failed")
 
     return mhdata
\ No newline at end of file
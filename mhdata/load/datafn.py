@@ -58,4 +58,17 @@ def merge_sharpness(weapon):
     s = weapon['sharpness']
     values = (s['red'], s['orange'], s['yellow'],
                 s['green'], s['blue'], s['white'], s['purple'])
-    return ",".join((str(v) for v in values))
\ No newline at end of file
+    return ",".join((str(v) for v in values))
+
+
+def iter_reward_rows(mhdata):
+    """Iterates over every monster and quest reward, returning (file, entity, group, reward) tuples.
+    Rewards whose percentages are added together share the same file, entity, and group.
+    Monster rewards are grouped by (rank, condition), and quest rewards by their reward group."""
+    for monster in mhdata.monster_map.values():
+        for reward in monster.get('rewards', []):
+            yield ('monsters/monster_rewards.csv', monster, (reward['rank'], reward['condition_en']), reward)
+
+    for quest in mhdata.quest_map.values():
+        for reward in quest['rewards']:
+            yield ('quests/quest_rewards.csv', quest, reward['group'], reward)
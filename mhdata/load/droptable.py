@@ -0,0 +1,83 @@
+"""
+Chances of getting decorations from feystones, as exact fractions.
+
+Each feystone lands on a drop table decided by rarity, using the odds in decoration_droprates.csv.
+Once on a drop table, every decoration in that table has an equal chance.
+The chance of every decoration in a table is the same, so chances are computed once per
+feystone and table, and decorations look up the chance of their table.
+
+The droprates file is cached by a hash of its contents, so reloading decorations doesn't parse it again.
+"""
+
+import hashlib
+from collections import Counter
+from decimal import Decimal
+from fractions import Fraction
+
+from mhdata.io import DataMap
+from mhdata.io.csv import read_csv
+
+# Rarities of the decoration drop tables
+drop_tables = range(5, 14)
+
+# Mapping of droprates file hash -> feystone -> table -> chance of landing on the table
+_rates_cache = {}
+
+def read_droprates(location):
+    """Reads the chance of each feystone landing on each drop table, as a fraction of 1.
+    Results are cached by the contents of the file"""
+    with open(location, 'rb') as f:
+        contents_hash = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+
+    if contents_hash not in _rates_cache:
+        rates = {}
+        for row in read_csv(location):
+            rates[row['feystone']] = {
+                table: Fraction(int(row[str(table)] or '0'), 100) for table in drop_tables
+            }
+        _rates_cache[contents_hash] = rates
+
+    return _rates_cache[contents_hash]
+
+
+class DecorationDropTable:
+    """The chance of getting each decoration of a decoration map from each feystone.
+    Decorations are referred to by their id, and feystones by their name in the droprates file."""
+
+    def __init__(self, droprates, decoration_map: DataMap):
+        self.feystones = list(droprates.keys())
+        self.table_counts = Counter(entry['rarity'] for entry in decoration_map.values())
+        self._rarity = { entry.id: entry['rarity'] for entry in decoration_map.values() }
+
+        # feystone -> table -> chance of each decoration in the table
+        self.table_chances = {
+            feystone: {
+                table: rate / self.table_counts[table]
+                for table, rate in rates.items() if self.table_counts[table]
+            }
+            for feystone, rates in droprates.items()
+        }
+
+    def chance(self, decoration_id, feystone) -> Fraction:
+        "Returns the chance of getting the decoration from a single feystone"
+        return self.table_chances[feystone].get(self._rarity[decoration_id], Fraction(0))
+
+    def chances(self, decoration_id):
+        "Returns a mapping of feystone -> chance of getting the decoration"
+        return { feystone: self.chance(decoration_id, feystone) for feystone in self.feystones }
+
+    def percents(self, decoration_id):
+        "Returns a mapping of feystone -> chance of getting the decoration as a Decimal percentage"
+        return {
+            feystone: (Decimal(chance.numerator * 100) / Decimal(chance.denominator)).quantize(Decimal('1.00000'))
+            for feystone, chance in self.chances(decoration_id).items()
+        }
+
+    def expected_feystones(self, decoration_id, feystone):
+        "Returns the average number of feystones needed to get the decoration, or None if it never drops"
+        chance = self.chance(decoration_id, feystone)
+        return 1 / chance if chance else None
+
+    def chance_from(self, decoration_id, feystone, count) -> Fraction:
+        "Returns the chance of getting the decoration at least once from count feystones"
+        return 1 - (1 - self.chance(decoration_id, feystone)) ** count
@@ -3,8 +3,8 @@ Additional import step processes isolated to a separate file.
 """
 
 from mhdata.io import DataMap, data_path
-from mhdata.io.csv import read_csv
-from decimal import *
+
+from .droptable import DecorationDropTable, read_droprates
 
 from os.path import join
 
@@ -33,8 +33,8 @@ def copy_skill_descriptions(skill_map: DataMap):
         for language in cfg.supported_languages:
             tree_entry['description'][language] = level_entry['description'][language]
 
-def extend_decoration_chances(decoration_map: DataMap):
-    """Calculates the drop tables given the decoration map.
+def extend_decoration_chances(decoration_map: DataMap, source_path=data_path):
+    """Calculates the drop tables given the decoration map, and returns them as a DecorationDropTable.
 
     Each decoration is part of a drop table (decided by rarity), and feystones
     will individually land on a drop table. Once on a drop table, each decoration in that drop table
@@ -44,32 +44,11 @@ def extend_decoration_chances(decoration_map: DataMap):
     https://docs.google.com/spreadsheets/d/1ysj6c2boC6GarFvMah34e6VviZeaoKB6QWovWLSGlsY/htmlview?usp=sharing&sle=true#
     """
 
-    jewel_to_table_odds = {}
-    droprates = read_csv(join(data_path, "decorations/decoration_droprates.csv"))
-    for row in droprates:
-        entries = {}
-        for i in range(5, 14):
-            entries[i] = int(row[str(i)] or '0')
-        jewel_to_table_odds[row['feystone']] = entries
-    
-    # Calculate how many entries there are per drop table type
-    table_counts = { table:0 for table in range(5, 14) }
-    for entry in decoration_map.values():
-        table_counts[entry['rarity']] += 1
-
-    # Create an odds map for each drop table level
-    # This maps droptable -> feystone -> probability
-    # This is necessary because all decorations are assigned to a droptable
-    odds_map = { }
-    for table in range(5, 14):
-        odds_map[table] = {}
-        for feystone, feystone_odds in jewel_to_table_odds.items():
-            count = table_counts[table]
-            if count == 0:
-                continue
-            value = Decimal(feystone_odds[table]) / Decimal(count)
-            odds_map[table][feystone] = value.quantize(Decimal('1.00000'))
+    droprates = read_droprates(join(source_path, "decorations/decoration_droprates.csv"))
+    drop_table = DecorationDropTable(droprates, decoration_map)
 
-    # Assign the odds map for the drop table level to the decoration itself
+    # Assign the percentage chance per feystone to the decoration itself
     for entry in decoration_map.values():
-        entry['chances'] = odds_map[entry['rarity']]
+        entry['chances'] = drop_table.percents(entry.id)
+
+    return drop_table
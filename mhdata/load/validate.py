@@ -1,364 +1,406 @@
-import itertools
+"""
+Validation rules for the loaded data.
+
+Rules are registered to the engine in stages (see the validation module).
+Use validate() to run them and print the results,
+or run_validation() to get the diagnostics as a list.
+Use run_row_validation() to check a single edited row against the loaded data.
+"""
+
 from collections import abc
 
 from mhdata import cfg
-from mhdata.io import DataMap
-from mhdata.util import ensure_warn
 
 from . import datafn
+from .validation import ValidationEngine, LOAD, MERGE, BUILD, ERROR, errors
 
-def validate(mhdata):
-    "Perform all validations, print out the errors, and return if it succeeded or not"
-    errors = []
-    errors.extend(validate_items(mhdata))
-    errors.extend(validate_locations(mhdata))
-    errors.extend(validate_monsters(mhdata))
-    errors.extend(validate_monster_rewards(mhdata))
-    errors.extend(validate_skills(mhdata))
-    errors.extend(validate_armor(mhdata))
-    errors.extend(validate_weapons(mhdata))
-    errors.extend(validate_decorations(mhdata))
-    errors.extend(validate_charms(mhdata))
-    errors.extend(validate_quests(mhdata))
-
-    if errors:
-        for error in errors:
-            print("ERROR: " + error)
-        return False
-
-    return True
-
-
-def validate_items(mhdata):
-    errors = []
-
-    # check for existance in item combinations
-    for combo in mhdata.item_combinations:
-        items = (combo['result'], combo['first'], combo['second'])
-        items = filter(None, items)  # removes nulls
-        for item in items:
-            if item not in mhdata.item_map.names('en'):
-                errors.append(f"{item} in combinations doesn't exist")
-
-    return errors
-
-
-def validate_locations(mhdata):
-    errors = []
-
-    for location_entry in mhdata.location_map.values():
-        for item_entry in location_entry['items']:
-            item_lang = item_entry['item_lang']
-            item_name = item_entry['item']
-            if item_name not in mhdata.item_map.names(item_lang):
-                errors.append(f"{item_name} in location items doesn't exist")
-
-    return errors
-
-
-def validate_monsters(mhdata):
-    errors = []
-
-    # Check that all monsters have hitzones
-    for entry in mhdata.monster_map.values():
-        ensure_warn('hitzones' in entry, f"Monster {entry.name('en')} missing hitzones")
-    
-    # Check that large monsters have weakness and normal is included
-    for entry in mhdata.monster_map.values():
-        if entry['size'] == 'small':
-            continue
+engine = ValidationEngine()
+rule = engine.rule
 
-        name = entry.name('en')
+def run_validation(mhdata, stage=BUILD, *, max_workers=None):
+    "Runs all validation rules up to and including stage, and returns the list of diagnostics"
+    return engine.run(mhdata, stage, max_workers=max_workers)
 
-        if 'weaknesses' not in entry:
-            print(f"Warning: Large monster {name} does not contain a weakness entry")
-            continue
+def run_row_validation(mhdata, collection_name, row, stage=BUILD):
+    """Runs the row rules of a collection on a single row, and returns the list of diagnostics.
+    The row doesn't need to be part of the loaded data, so an edited row can be checked before it is saved."""
+    return engine.run_row(mhdata, collection_name, row, stage)
 
-        if 'normal' not in map(lambda w: w['form'], entry['weaknesses']):
-            errors.append(f"Invalid weaknesses in {name}, normal is a required state")
+def print_diagnostics(diagnostics):
+    for diagnostic in diagnostics:
+        prefix = "ERROR: " if diagnostic.severity == ERROR else "WARNING: "
+        print(prefix + str(diagnostic))
 
-    return errors
+def validate(mhdata, stage=BUILD):
+    "Perform all validations for the stage, print out the problems, and return if it succeeded or not"
+    diagnostics = run_validation(mhdata, stage)
+    print_diagnostics(diagnostics)
+    return not errors(diagnostics)
 
 
-def validate_monster_rewards(mhdata):
-    """Validates monster rewards for sane values. 
-    Certain fields (like carve) sum to 100, 
-    Others (like quest rewards) must be at least 100%"""
+@rule(MERGE, file='items/item_combination_list.csv', each='item_combinations')
+def validate_item_combination(mhdata, combo, report):
+    for column in ('result', 'first', 'second'):
+        item = combo[column]
+        if item and not report.exists('item_map', item):
+            report.error(f"{item} in combinations doesn't exist", row=combo['result'], column=column)
 
-    errors = set()
-    
-    for monster_id, entry in mhdata.monster_map.items():
-        if 'rewards' not in entry:
-            continue
-
-        monster_name = entry.name('en') # used for error display
 
-        valid = True
-        for reward in entry['rewards']:
-            condition = reward['condition_en']
-            rank = reward['rank']
+@rule(MERGE, file='locations/location_items.csv', each='location_map')
+def validate_location_items(mhdata, location_entry, report):
+    for item_entry in location_entry['items']:
+        item_lang = item_entry['item_lang']
+        item_name = item_entry['item']
+        if not report.exists('item_map', item_name, item_lang):
+            report.error(f"{item_name} in location items doesn't exist",
+                row=location_entry.name('en'), column='item')
 
-            # ensure condition exists
-            if condition not in mhdata.monster_reward_conditions_map.names('en'):
-                errors.add(f"Invalid condition {condition} in monster {monster_name}")
-                valid = False
 
-            if reward['item_en'] not in mhdata.item_map.names('en'):
-                errors.add(f"Monster reward item {reward['item_en']} doesn't exist")
-                valid = False
+@rule(BUILD, file='monsters/monster_hitzones.csv', each='monster_map')
+def validate_monster_hitzones(mhdata, entry, report):
+    if 'hitzones' not in entry:
+        report.warning(f"Monster {entry.name('en')} missing hitzones", row=entry.name('en'))
 
-            if rank not in cfg.supported_ranks:
-                errors.add(f"Unsupported rank {rank} in {monster_name} rewards")
-                valid = False
 
-        if not valid:
+@rule(BUILD, file='monsters/monster_weaknesses.csv', each='monster_map')
+def validate_monster_has_weaknesses(mhdata, entry, report):
+    if entry['size'] != 'small' and 'weaknesses' not in entry:
+        name = entry.name('en')
+        report.warning(f"Large monster {name} does not contain a weakness entry", row=name)
+
+
+@rule(LOAD, file='monsters/monster_weaknesses.csv', each='monster_map')
+def validate_monster_weaknesses(mhdata, entry, report):
+    # Check that large monsters with weaknesses include the normal state
+    if entry['size'] == 'small' or 'weaknesses' not in entry:
+        return
+
+    name = entry.name('en')
+    if 'normal' not in map(lambda w: w['form'], entry['weaknesses']):
+        report.error(f"Invalid weaknesses in {name}, normal is a required state",
+            row=name, column='form')
+
+
+@rule(MERGE, file='monsters/monster_rewards.csv', each='monster_map')
+def validate_monster_reward_references(mhdata, entry, report):
+    monster_name = entry.name('en') # used for error display
+    for reward in entry.get('rewards', []):
+        condition = reward['condition_en']
+        if not report.exists('monster_reward_conditions_map', condition):
+            report.error(f"Invalid condition {condition} in monster {monster_name}",
+                row=monster_name, column='condition_en')
+
+        if not report.exists('item_map', reward['item_en']):
+            report.error(f"Monster reward item {reward['item_en']} doesn't exist",
+                row=monster_name, column='item_en')
+
+
+@rule(LOAD)
+def validate_reward_percentages(mhdata, report):
+    """Validates monster and quest rewards for sane values.
+    Rewards in a group are either all blank, or have percentages that sum to 100.
+    A group with only a 100% reward is also valid, and otherwise 100% rewards are not counted.
+
+    All rewards are aggregated in a single pass, and then each group is checked."""
+
+    # (file, entity id, group) -> [count, unknown count, 100% count, sum excluding 100s]
+    groups = {}
+    names = {}
+    invalid = set()
+    for file, entity, group, reward in datafn.iter_reward_rows(mhdata):
+        names[(file, entity.id)] = entity.name('en')
+        if file == 'monsters/monster_rewards.csv' and reward['rank'] not in cfg.supported_ranks:
+            report.error(f"Unsupported rank {reward['rank']} in {entity.name('en')} rewards",
+                file=file, row=entity.name('en'), column='rank')
+            invalid.add((file, entity.id))
+
+        stats = groups.get((file, entity.id, group), None)
+        if stats is None:
+            stats = groups[(file, entity.id, group)] = [0, 0, 0, 0]
+
+        stats[0] += 1
+        percentage = reward['percentage']
+        if percentage is None:
+            stats[1] += 1
+        elif int(percentage) == 100:
+            stats[2] += 1
+        else:
+            stats[3] += int(percentage)
+
+    for (file, entity_id, group), (count, unknown, hundreds, percentage_sum) in groups.items():
+        if (file, entity_id) in invalid or unknown == count:
             continue
-        
-        # Ensure percentage is correct (at or greater than 100)
-        rank_reward_key_fn = lambda r: (r['rank'], r['condition_en'])
-        sorted_rewards = sorted(entry['rewards'], key=rank_reward_key_fn)
-        for (rank, condition), items in itertools.groupby(sorted_rewards, rank_reward_key_fn):
-            items = list(items)
-
-            # Check if any item is considered unknown. If any are, all must be unknown.
-            num_unknown_percent = len([i for i in items if i['percentage'] is None])
-            if num_unknown_percent == len(items):
-                continue
-            elif num_unknown_percent > 0:
-                errors.add(f"Error with {monster_name} rewards" +
-                    f" - entries for ({rank}, {condition}) must all be blank or must all have a percentage.")
-                continue
-
-            percentages = [int(r['percentage']) for r in items]
-            if percentages == [100]:
-                percentage_sum = 100 
-            else:
-                percentage_sum = sum((p for p in percentages if p != 100), 0)
-
-            key_str = f"(rank {rank} condition {condition})"
-            error_start = f"Rewards %'s for monster {monster_name} {key_str}"
-            ensure_warn(
-                percentage_sum == 100, 
-                f"{error_start} does not sum to 100")
-
-    return errors
 
-
-def validate_skills(mhdata):
-    errors = []
-
-    all_unlocked = set()
-    for skill in mhdata.skill_map.values():
-        skill_name = skill['name']['en']
-        expected_max = len(skill['levels'])
-        encountered_levels = set()
-        for level in skill['levels']:
-            level_value = level['level']
-            if level_value < 0 or level_value > expected_max:
-                errors.append(f"Skill {skill_name} has out of range effect {level_value}")
-                continue
-            encountered_levels.add(level_value)
-        if len(encountered_levels) != expected_max:
-            errors.append(f"Skill {skill_name} is missing effect levels")
-        
-        unlocked = skill['unlocks']
-        if unlocked:
-            unlocked_skill = mhdata.skill_map.entry_of('en', unlocked)
-            if not unlocked_skill:
-                errors.append(f"Skill {skill_name} unlocks invalid skill {unlocked}")
-            elif not unlocked_skill['secret']:
-                errors.append(f"Skill {skill_name} unlocks skill {unlocked}, but that skill is not a secret skill")
-            else:
-                all_unlocked.add(unlocked)
-
-    # second pass, make sure that all secret skills are unlocked by something
+        name = names[(file, entity_id)]
+        entity_type = 'monster' if file == 'monsters/monster_rewards.csv' else 'quest'
+        key_str = f"(rank {group[0]} condition {group[1]})" if entity_type == 'monster' else f"(group {group})"
+
+        if unknown > 0:
+            report.error(f"Error with {name} rewards" +
+                f" - entries for {key_str} must all be blank or must all have a percentage.",
+                file=file, row=name, column='percentage')
+        elif percentage_sum != 100 and not (count == 1 and hundreds == 1):
+            # A group that is a single 100% reward is valid
+            report.warning(f"Rewards %'s for {entity_type} {name} {key_str} does not sum to 100",
+                file=file, row=name, column='percentage')
+
+
+@rule(LOAD, file='skills/skill_levels.csv', each='skill_map')
+def validate_skill_levels(mhdata, skill, report):
+    skill_name = skill['name']['en']
+    expected_max = len(skill['levels'])
+    encountered_levels = set()
+    for level in skill['levels']:
+        level_value = level['level']
+        if level_value < 0 or level_value > expected_max:
+            report.error(f"Skill {skill_name} has out of range effect {level_value}",
+                row=skill_name, column='level')
+            continue
+        encountered_levels.add(level_value)
+    if len(encountered_levels) != expected_max:
+        report.error(f"Skill {skill_name} is missing effect levels", row=skill_name, column='level')
+
+
+@rule(MERGE, file='skills/skill_base.csv', each='skill_map')
+def validate_skill_unlocks(mhdata, skill, report):
+    skill_name = skill['name']['en']
+    unlocked = skill['unlocks']
+    if not unlocked:
+        return
+
+    unlocked_skill = report.lookup('skill_map', unlocked)
+    if not unlocked_skill:
+        report.error(f"Skill {skill_name} unlocks invalid skill {unlocked}",
+            row=skill_name, column='unlocks')
+    elif not unlocked_skill['secret']:
+        report.error(f"Skill {skill_name} unlocks skill {unlocked}, but that skill is not a secret skill",
+            row=skill_name, column='unlocks')
+
+@rule(BUILD, file='skills/skill_base.csv')
+def validate_secret_skills_unlocked(mhdata, report):
+    # make sure that all secret skills are unlocked by something
+    all_unlocked = set(filter(None, (skill['unlocks'] for skill in mhdata.skill_map.values())))
     for skill in mhdata.skill_map.values():
         skill_name = skill['name']['en']
         if skill['secret'] and skill_name not in all_unlocked:
-            errors.append(f"Skill {skill_name} has locked slots, but has no associated secret skill")
+            report.error(f"Skill {skill_name} has locked slots, but has no associated secret skill",
+                row=skill_name, column='secret')
+
 
-    return errors
+@rule(MERGE, file='armors/armorset_base.csv', each='armorset_map')
+def validate_armorset_references(mhdata, setentry, report):
+    setname = setentry.name('en')
 
+    monster_name = setentry['monster']
+    if monster_name and not report.exists('monster_map', monster_name):
+        report.error(f"Armorset {setname} has invalid monster {monster_name}",
+            row=setname, column='monster')
 
-def validate_armor(mhdata):
-    errors = []
+    for part in cfg.armor_parts:
+        armor_name = setentry[part]
+        if armor_name and not report.exists('armor_map', armor_name):
+            report.error(f"Armorset {setname} has invalid armor {armor_name}", row=setname, column=part)
 
+@rule(MERGE, file='armors/armorset_base.csv')
+def validate_armorset_duplicates(mhdata, report):
     # Checks if any pieces of armor is listed in two different sets
     encountered_armors = set()
-
-    # Validate armorsets
     for setentry in mhdata.armorset_map.values():
-        setname = setentry.name('en')
-
-        monster_name = setentry['monster']
-        if monster_name and not monster_name in mhdata.monster_map.names('en'):
-            errors.append(f"Armorset {setname} has invalid monster {monster_name}")
-        
-        # All armor pieces in the set
-        armor_names = [setentry[part] for part in cfg.armor_parts]
-        armor_names = list(filter(None, armor_names))
-
-        if not armor_names:
-            print(f"Warning: {setname} has no armor entries")
-
-        for armor_name in armor_names:
-            armor_id = mhdata.armor_map.id_of('en', armor_name)
-            
+        for part in cfg.armor_parts:
+            armor_id = mhdata.armor_map.id_of('en', setentry[part]) if setentry[part] else None
             if not armor_id:
-                errors.append(f"Armorset {setname} has invalid armor {armor_name}")
                 continue
             if armor_id in encountered_armors:
-                errors.append(f"Armorset {setname} has duplicated armor {armor_name}")
+                report.error(f"Armorset {setentry.name('en')} has duplicated armor {setentry[part]}",
+                    row=setentry.name('en'), column=part)
                 continue
-
             encountered_armors.add(armor_id)
 
-    # Validate Armor
-    for armor_entry in mhdata.armor_map.values():
-        # Ensure that all armor items were encountered
-        if armor_entry.id not in encountered_armors:
-            errors.append(f"Armor {armor_entry.name('en')} is not in an armor set")
-
-        # Ensure items exist
-        for item_name, _ in datafn.iter_armor_recipe(armor_entry):
-            if item_name not in mhdata.item_map.names('en'):
-                errors.append(f"Item {item_name} in armors does not exist")
-
-        # Ensure skills exist
-        for skill_name, _ in datafn.iter_skill_levels(armor_entry['skills']):
-            if skill_name not in mhdata.skill_map.names('en'):
-                errors.append(f"Skill {skill_name} in armors does not exist")
+@rule(BUILD, file='armors/armorset_base.csv', each='armorset_map')
+def validate_armorset_has_armor(mhdata, setentry, report):
+    if not any(setentry[part] for part in cfg.armor_parts):
+        report.warning(f"{setentry.name('en')} has no armor entries", row=setentry.name('en'))
 
-    # Validate Armorset bonuses
-    for bonus_entry in mhdata.armorset_bonus_map.values():
-        for skill_name, _ in datafn.iter_setbonus_skills(bonus_entry):
-            if skill_name not in mhdata.skill_map.names('en'):
-                errors.append(f"Skill {skill_name} in set bonuses does not exist")
-
-    return errors
+@rule(BUILD, file='armors/armor_base.csv')
+def validate_armor_in_set(mhdata, report):
+    encountered_armors = set()
+    for setentry in mhdata.armorset_map.values():
+        for part in cfg.armor_parts:
+            if setentry[part]:
+                encountered_armors.add(mhdata.armor_map.id_of('en', setentry[part]))
 
-def validate_weapons(mhdata):
-    errors = []
-    for entry in mhdata.weapon_map.values():
-        name = entry.name('en')
-        weapon_type = entry['weapon_type']
-
-        if entry['category'] not in ('Kulve', 'Safi'):
-            if not entry.get('craft', {}):
-                errors.append(f"Weapon {name} does not have any recipes")
-            else:
-                # Check if items in the recipe exist
-                for recipe in entry['craft']:
-                    for item, quantity in datafn.iter_recipe(recipe):
-                        if item not in mhdata.item_map.names('en'):
-                            errors.append(f"Weapon {name} has invalid item {item} in a recipe")
-        
-        if weapon_type in cfg.weapon_types_melee and not entry.get('sharpness', None):
-            errors.append(f"Melee weapon {name} does not have a sharpness value")
-        if weapon_type == cfg.HUNTING_HORN and not entry.get('notes', None):
-            errors.append(f"Hunting horn {name} is missing a notes value")
-        if weapon_type == cfg.BOW and not entry.get('bow', None):
-            errors.append(f"Weapon {name} is missing bow data")
-        if weapon_type in cfg.weapon_types_gun:
-            if not entry.get('ammo_config', None):
-                errors.append(f"Weapon {name} is missing ammo config")
-            elif entry['ammo_config'] not in mhdata.weapon_ammo_map:
-                errors.append(f"Weapon {name} has invalid ammo config")
-        
-        if entry['element1'] and (entry['element1_attack'] or 0) == 0:
-            errors.append(f"Weapon {name} has an element but is missing an attack value")
-
-        # Test that dragon has elderseal and vice versa
-        has_elderseal = entry['elderseal'] is not None
-        is_dragon = entry['element1'] == 'Dragon' or entry['element2'] == 'Dragon' or entry['phial'] == 'dragon'
-        if has_elderseal and not is_dragon:
-            errors.append(f"Weapon {name} has elderseal but no dragon element")
-        if is_dragon and not has_elderseal:
-            errors.append(f"Weapon {name} has a dragon element but no elderseal")
-
-        # Test that the skill exists
-        skill = entry['skill']
-        if skill:
-            skill_exists = skill in mhdata.skill_map.names('en')
-            setbonus_exists = skill in mhdata.armorset_bonus_map.names('en')
-            if not skill_exists and not setbonus_exists:
-                errors.append(f"Weapon {name} refers to invalid skill {skill}")
-            
+    # Ensure that all armor items were encountered
+    for armor_entry in mhdata.armor_map.values():
+        if armor_entry.id not in encountered_armors:
+            report.error(f"Armor {armor_entry.name('en')} is not in an armor set", row=armor_entry.name('en'))
+
+@rule(MERGE, file='armors/armor_base.csv', each='armor_map')
+def validate_armor_references(mhdata, armor_entry, report):
+    armor_name = armor_entry.name('en')
+
+    # Ensure items exist
+    for item_name, _ in datafn.iter_armor_recipe(armor_entry):
+        if not report.exists('item_map', item_name):
+            report.error(f"Item {item_name} in armors does not exist",
+                file='armors/armor_craft_ext.csv', row=armor_name)
+
+    # Ensure skills exist
+    for skill_name, _ in datafn.iter_skill_levels(armor_entry['skills']):
+        if not report.exists('skill_map', skill_name):
+            report.error(f"Skill {skill_name} in armors does not exist",
+                file='armors/armor_skills_ext.csv', row=armor_name)
+
+@rule(MERGE, file='armors/armorset_bonus_base.csv', each='armorset_bonus_map')
+def validate_armorset_bonus_references(mhdata, bonus_entry, report):
+    for skill_name, _ in datafn.iter_setbonus_skills(bonus_entry):
+        if not report.exists('skill_map', skill_name):
+            report.error(f"Skill {skill_name} in set bonuses does not exist", row=bonus_entry.name('en'))
+
+
+@rule(BUILD, file='weapons/weapon_base.csv', each='weapon_map')
+def validate_weapon_complete(mhdata, entry, report):
+    name = entry.name('en')
+    weapon_type = entry['weapon_type']
+
+    if entry['category'] not in ('Kulve', 'Safi') and not entry.get('craft', {}):
+        report.error(f"Weapon {name} does not have any recipes", file='weapons/weapon_craft.csv', row=name)
+
+    if weapon_type in cfg.weapon_types_melee and not entry.get('sharpness', None):
+        report.error(f"Melee weapon {name} does not have a sharpness value",
+            file='weapons/weapon_sharpness.csv', row=name)
+    if weapon_type == cfg.HUNTING_HORN and not entry.get('notes', None):
+        report.error(f"Hunting horn {name} is missing a notes value", row=name, column='notes')
+    if weapon_type == cfg.BOW and not entry.get('bow', None):
+        report.error(f"Weapon {name} is missing bow data", file='weapons/weapon_bow_ext.csv', row=name)
+    if weapon_type in cfg.weapon_types_gun and not entry.get('ammo_config', None):
+        report.error(f"Weapon {name} is missing ammo config", row=name, column='ammo_config')
+
+@rule(LOAD, file='weapons/weapon_base.csv', each='weapon_map')
+def validate_weapon_elements(mhdata, entry, report):
+    name = entry.name('en')
+
+    if entry['element1'] and (entry['element1_attack'] or 0) == 0:
+        report.error(f"Weapon {name} has an element but is missing an attack value",
+            row=name, column='element1_attack')
+
+    # Test that dragon has elderseal and vice versa
+    has_elderseal = entry['elderseal'] is not None
+    is_dragon = entry['element1'] == 'Dragon' or entry['element2'] == 'Dragon' or entry['phial'] == 'dragon'
+    if has_elderseal and not is_dragon:
+        report.error(f"Weapon {name} has elderseal but no dragon element", row=name, column='elderseal')
+    if is_dragon and not has_elderseal:
+        report.error(f"Weapon {name} has a dragon element but no elderseal", row=name, column='elderseal')
+
+@rule(MERGE, file='weapons/weapon_base.csv', each='weapon_map')
+def validate_weapon_references(mhdata, entry, report):
+    name = entry.name('en')
+
+    # Check if items in the recipe exist
+    for recipe in entry.get('craft', None) or []:
+        for item, quantity in datafn.iter_recipe(recipe):
+            if not report.exists('item_map', item):
+                report.error(f"Weapon {name} has invalid item {item} in a recipe",
+                    file='weapons/weapon_craft.csv', row=name)
+
+    ammo_config = entry.get('ammo_config', None)
+    if entry['weapon_type'] in cfg.weapon_types_gun and ammo_config:
+        if not report.exists('weapon_ammo_map', ammo_config):
+            report.error(f"Weapon {name} has invalid ammo config", row=name, column='ammo_config')
+
+    # Test that the skill exists
+    skill = entry['skill']
+    if skill:
+        skill_exists = report.exists('skill_map', skill)
+        setbonus_exists = report.exists('armorset_bonus_map', skill)
+        if not skill_exists and not setbonus_exists:
+            report.error(f"Weapon {name} refers to invalid skill {skill}", row=name, column='skill')
+
+@rule(LOAD, file='weapons/weapon_base.csv')
+def validate_weapon_tree(mhdata, report):
+    weapon_map = mhdata.weapon_map
+    for weapon_id, previous_name in mhdata.weapon_tree.orphans:
+        name = weapon_map[weapon_id].name('en')
+        report.error(f"Weapon {name} has invalid previous weapon {previous_name}", row=name, column='previous_en')
+
+    for cycle in mhdata.weapon_tree.cycles:
+        names = ' -> '.join(weapon_map[weapon_id].name('en') for weapon_id in cycle)
+        report.error(f"Weapons {names} form an upgrade cycle", row=weapon_map[cycle[0]].name('en'), column='previous_en')
+
+@rule(LOAD, file='weapons/weapon_ammo.csv', each='weapon_ammo_map')
+def validate_weapon_ammo(mhdata, ammo_entry, report):
     # Validate weapon ammo settings. Bullet types with clip size zero must have "null state" other attributes.
-    for name, ammo_entry in mhdata.weapon_ammo_map.items():
-        for key, data in ammo_entry.items():
-            if not isinstance(data, abc.Mapping): continue
-            if 'clip' not in data: continue
-
-            if data['clip'] == 0:
-                # This bullet exists, so make sure other parameters make sense
-                if data.get('rapid', False) == True:
-                    errors.append(f"{name} has invalid rapid value for {key}")
-                if data.get('recoil', None):
-                    errors.append(f"{name} has invalid recoil value for {key}")
-                if data.get('reload', None):
-                    errors.append(f"{name} has invalid reload value for {key}") 
-            else:
-                if 'recoil' in data and not data.get('recoil', None):
-                    errors.append(f"{name} is missing recoil value for {key}")
-                if not data.get('reload', None):
-                    errors.append(f"{name} is missing reload value for {key}") 
-
-    return errors
-
-def validate_decorations(mhdata):
-    errors = []
-
-    for entry in mhdata.decoration_map.values():
-        # Ensure skills exist
-        for skill_name, _ in datafn.iter_skill_levels(entry, amount=2):
-            if skill_name not in mhdata.skill_map.names('en'):
-                errors.append(f"Skill {skill_name} in decorations does not exist")
-
-    return errors
-
-def validate_charms(mhdata):
-    errors = []
-
-    names = mhdata.charm_map.names("en")
-    for entry in mhdata.charm_map.values():
-        previous_entry = entry['previous_en']
-        if previous_entry is not None and previous_entry not in names:
-            errors.append(f"Charm {previous_entry} for previous_en does not exist")
-
-        # Ensure skills exist
-        for skill_name, _ in datafn.iter_skill_levels(entry, amount=2):
-            if skill_name not in mhdata.skill_map.names('en'):
-                errors.append(f"Skill {skill_name} in charms does not exist")
-
-        # Currently charms only link to a single recipe, but the schema supports more than one
-        if len(entry.get('craft', [])) > 1:
-            errors.append(f"Charm {entry['name_en']} has more than one recipe, which is not supported")
-
-
-    return errors
-
-def validate_quests(mhdata):
+    name = ammo_entry['key']
+    for key, data in ammo_entry.items():
+        if not isinstance(data, abc.Mapping): continue
+        if 'clip' not in data: continue
+
+        if data['clip'] == 0:
+            # This bullet exists, so make sure other parameters make sense
+            if data.get('rapid', False) == True:
+                report.error(f"{name} has invalid rapid value for {key}", row=name, column=f'{key}_rapid')
+            if data.get('recoil', None):
+                report.error(f"{name} has invalid recoil value for {key}", row=name, column=f'{key}_recoil')
+            if data.get('reload', None):
+                report.error(f"{name} has invalid reload value for {key}", row=name, column=f'{key}_reload')
+        else:
+            if 'recoil' in data and not data.get('recoil', None):
+                report.error(f"{name} is missing recoil value for {key}", row=name, column=f'{key}_recoil')
+            if not data.get('reload', None):
+                report.error(f"{name} is missing reload value for {key}", row=name, column=f'{key}_reload')
+
+
+@rule(MERGE, file='decorations/decoration_base.csv', each='decoration_map')
+def validate_decoration_references(mhdata, entry, report):
+    # Ensure skills exist
+    for skill_name, _ in datafn.iter_skill_levels(entry, amount=2):
+        if not report.exists('skill_map', skill_name):
+            report.error(f"Skill {skill_name} in decorations does not exist", row=entry.name('en'))
+
+
+@rule(MERGE, file='charms/charm_base.csv', each='charm_map')
+def validate_charm_references(mhdata, entry, report):
+    previous_entry = entry['previous_en']
+    if previous_entry is not None and not report.exists('charm_map', previous_entry):
+        report.error(f"Charm {previous_entry} for previous_en does not exist",
+            row=entry.name('en'), column='previous_en')
+
+    # Ensure skills exist
+    for skill_name, _ in datafn.iter_skill_levels(entry, amount=2):
+        if not report.exists('skill_map', skill_name):
+            report.error(f"Skill {skill_name} in charms does not exist", row=entry.name('en'))
+
+@rule(LOAD, file='charms/charm_craft.csv', each='charm_map')
+def validate_charm_recipes(mhdata, entry, report):
+    # Currently charms only link to a single recipe, but the schema supports more than one
+    if len(entry.get('craft', [])) > 1:
+        report.error(f"Charm {entry['name_en']} has more than one recipe, which is not supported",
+            row=entry.name('en'))
+
+
+@rule(BUILD, file='quests/quest_base.csv', each='quest_map')
+def validate_quest_complete(mhdata, entry, report):
     # todo: use an alternative schema validation scheme that allows null checking to be separate from type coerce
-    errors = []
-
-    for entry in mhdata.quest_map.values():
-        name = entry.name('en')
-        if not entry['quest_type']:
-            errors.append(f"Quest {name} needs a quest type")
-        if entry['location_en'] not in mhdata.location_map.names('en'):
-            errors.append(f"Quest {name} has invalid location {entry['location_en']}")
-
-        monsters = set()
-        for monster in entry['monsters']:
-            monsters.add(monster['monster_en'])
-            if monster['monster_en'] not in mhdata.monster_map.names('en'):
-                errors.append(f"Quest {name} has invalid monster {monster['monster_en']}")
-        if len(monsters) < len(entry['monsters']):
-            errors.append(f"Quest {name} has duplicate monsters")
-
-        for reward in entry['rewards']:
-            if reward['item_en'] not in mhdata.item_map.names('en'):
-                errors.append(f"Quest {name} rewards has invalid item {reward['item_en']}")
-
-    return errors
\ No newline at end of file
+    if not entry['quest_type']:
+        report.error(f"Quest {entry.name('en')} needs a quest type", row=entry.name('en'), column='quest_type')
+
+@rule(LOAD, file='quests/quest_monsters.csv', each='quest_map')
+def validate_quest_monsters(mhdata, entry, report):
+    monsters = set(monster['monster_en'] for monster in entry['monsters'])
+    if len(monsters) < len(entry['monsters']):
+        report.error(f"Quest {entry.name('en')} has duplicate monsters", row=entry.name('en'))
+
+@rule(MERGE, file='quests/quest_base.csv', each='quest_map')
+def validate_quest_references(mhdata, entry, report):
+    name = entry.name('en')
+    if not report.exists('location_map', entry['location_en']):
+        report.error(f"Quest {name} has invalid location {entry['location_en']}", row=name, column='location_en')
+
+    for monster in entry['monsters']:
+        if not report.exists('monster_map', monster['monster_en']):
+            report.error(f"Quest {name} has invalid monster {monster['monster_en']}",
+                file='quests/quest_monsters.csv', row=name, column='monster_en')
+
+    for reward in entry['rewards']:
+        if not report.exists('item_map', reward['item_en']):
+            report.error(f"Quest {name} rewards has invalid item {reward['item_en']}",
+                file='quests/quest_rewards.csv', row=name, column='item_en')
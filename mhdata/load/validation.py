@@ -0,0 +1,201 @@
+"""
+A small engine for running validation rules in named stages.
+
+Rules are functions registered to an engine with a stage,
+and report problems as diagnostics instead of printing or raising.
+Stages are cumulative, so running a stage also runs the rules of every stage before it:
+
+- load: checks that only need a single file, such as value ranges
+- merge: checks that references between files are valid
+- build: checks that the data is complete, such as every weapon having a recipe.
+  Merge routines add data in several passes, so these only make sense on a final build.
+
+Rules only read the loaded data, so they are run concurrently and all diagnostics are collected.
+
+Most rules check one row at a time (registered with each=collection name),
+and look up other rows through the report, so that a single edited row can be checked on its own.
+"""
+
+import typing
+from collections import abc
+from concurrent.futures import ThreadPoolExecutor
+
+from mhdata.io import DataMap
+
+LOAD = 'load'
+MERGE = 'merge'
+BUILD = 'build'
+
+stages = (LOAD, MERGE, BUILD)
+
+ERROR = 'error'
+WARNING = 'warning'
+
+class Diagnostic:
+    "A single problem found by a rule. File, row, and column are optional and point to the source data"
+
+    __slots__ = ('severity', 'message', 'file', 'row', 'column', 'rule')
+
+    def __init__(self, severity, message, file=None, row=None, column=None, rule=None):
+        self.severity = severity
+        self.message = message
+        self.file = file
+        self.row = row
+        self.column = column
+        self.rule = rule
+
+    def _key(self):
+        return (self.severity, self.message, self.file, self.row, self.column, self.rule)
+
+    def __eq__(self, other):
+        return isinstance(other, Diagnostic) and self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def location(self):
+        "Returns a description of where the problem is, ex: monsters/monster_rewards.csv (Rathalos, item_en)"
+        parts = [str(p) for p in (self.row, self.column) if p is not None]
+        if not self.file:
+            return ', '.join(parts)
+        if not parts:
+            return self.file
+        return f"{self.file} ({', '.join(parts)})"
+
+    def to_dict(self):
+        return { key: getattr(self, key) for key in self.__slots__ }
+
+    def __str__(self):
+        location = self.location()
+        return f"{location}: {self.message}" if location else self.message
+
+    def __repr__(self):
+        return f"Diagnostic({self.severity}, {str(self)!r})"
+
+
+class DiagnosticReport:
+    """Collects the diagnostics of a single rule. Duplicate diagnostics are only kept once.
+    Rows in other collections should be looked up using lookup() or exists().
+    """
+
+    def __init__(self, rule_name, file=None, mhdata=None):
+        self.rule_name = rule_name
+        self.file = file
+        self.diagnostics = []
+        self._mhdata = mhdata
+        self._seen = set()
+
+    def add(self, severity, message, *, file=None, row=None, column=None):
+        diagnostic = Diagnostic(severity, message, file or self.file, row, column, self.rule_name)
+        if diagnostic not in self._seen:
+            self._seen.add(diagnostic)
+            self.diagnostics.append(diagnostic)
+
+    def error(self, message, **kwargs):
+        self.add(ERROR, message, **kwargs)
+
+    def warning(self, message, **kwargs):
+        self.add(WARNING, message, **kwargs)
+
+    def lookup(self, collection_name, name, lang='en'):
+        "Returns the row in the named collection of the loaded data with the given name, or None"
+        collection = getattr(self._mhdata, collection_name)
+        if isinstance(collection, DataMap):
+            entry_id = collection.id_of(lang, name)
+            return collection[entry_id] if entry_id is not None else None
+        return collection[name] if name in collection else None
+
+    def exists(self, collection_name, name, lang='en'):
+        "Returns true if the named collection of the loaded data has a row with the given name"
+        return self.lookup(collection_name, name, lang) is not None
+
+
+class Rule(typing.NamedTuple):
+    name: str
+    stage: str
+    fn: typing.Callable
+    file: str
+    each: str
+
+def iter_rows(collection):
+    "Yields every row in a DataMap, keyed map, or list"
+    if isinstance(collection, abc.Mapping):
+        yield from collection.values()
+    else:
+        yield from collection
+
+
+class ValidationEngine:
+    """A registry of validation rules.
+
+    Rules are registered using the rule decorator. Row rules are given each=collection name,
+    and are called with the loaded data, a row, and a DiagnosticReport.
+    Other rules are called with the loaded data and a DiagnosticReport.
+    """
+
+    def __init__(self):
+        self.rules = []
+
+    def rule(self, stage=LOAD, *, name=None, file=None, each=None):
+        """Decorator that registers a rule function for a stage.
+        File is the default source file for diagnostics that don't specify one.
+        """
+        if stage not in stages:
+            raise ValueError(f"Invalid stage {stage}, valid stages are {', '.join(stages)}")
+
+        def decorator(fn):
+            rule_name = name or fn.__name__
+            if any(r.name == rule_name for r in self.rules):
+                raise Exception(f"Validation rule {rule_name} is already registered")
+            self.rules.append(Rule(rule_name, stage, fn, file, each))
+            return fn
+        return decorator
+
+    def rules_for(self, stage):
+        "Returns the rules that are run for a stage, which includes the rules of earlier stages"
+        if stage not in stages:
+            raise ValueError(f"Invalid stage {stage}, valid stages are {', '.join(stages)}")
+        included = stages[:stages.index(stage) + 1]
+        return [r for r in self.rules if r.stage in included]
+
+    def _call_rule(self, rule, report, *args):
+        try:
+            rule.fn(*args, report)
+        except Exception as ex:
+            # A broken rule shouldn't hide the results of the others
+            report.error(f"Validation rule {rule.name} failed with {type(ex).__name__}: {ex}")
+
+    def _run_rule(self, rule, mhdata):
+        report = DiagnosticReport(rule.name, rule.file, mhdata)
+        if rule.each:
+            for row in iter_rows(getattr(mhdata, rule.each)):
+                self._call_rule(rule, report, mhdata, row)
+        else:
+            self._call_rule(rule, report, mhdata)
+        return report.diagnostics
+
+    def run(self, mhdata, stage=BUILD, *, max_workers=None) -> typing.List[Diagnostic]:
+        """Runs all rules for the stage concurrently, and returns every diagnostic.
+        Diagnostics are returned in rule registration order, so the results are consistent between runs.
+        """
+        rules = self.rules_for(stage)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda r: self._run_rule(r, mhdata), rules)
+            return [diagnostic for diagnostics in results for diagnostic in diagnostics]
+
+    def run_row(self, mhdata, collection_name, row, stage=BUILD) -> typing.List[Diagnostic]:
+        """Runs the row rules registered for a collection on a single row, and returns every diagnostic.
+        Rules that check a whole collection are not run."""
+        diagnostics = []
+        for rule in self.rules_for(stage):
+            if rule.each != collection_name:
+                continue
+            report = DiagnosticReport(rule.name, rule.file, mhdata)
+            self._call_rule(rule, report, mhdata, row)
+            diagnostics.extend(report.diagnostics)
+        return diagnostics
+
+
+def errors(diagnostics: typing.Iterable[Diagnostic]):
+    "Returns only the diagnostics that are errors"
+    return [d for d in diagnostics if d.severity == ERROR]
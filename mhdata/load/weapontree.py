@@ -0,0 +1,120 @@
+"""
+An index over the weapon upgrade trees formed by the previous_en column of weapon_base.csv.
+
+The index is built once in linear time, and stores the parent, children, and depth
+of every weapon, as well as the roots and a parent-first ordering per weapon type.
+Missing parents (orphans) and cycles are recorded instead of raising,
+so that validation can report them.
+"""
+
+from mhdata.io import DataMap
+
+class WeaponTree:
+    """Weapon upgrade trees for a weapon map.
+    Weapons are referred to by their id. Parents are resolved within the same weapon type.
+    """
+
+    def __init__(self, weapon_map: DataMap):
+        self.ids = list(weapon_map.keys())
+        self._index = { weapon_id: idx for idx, weapon_id in enumerate(self.ids) }
+        self._weapon_types = []
+
+        count = len(self.ids)
+        self.parent = [-1] * count
+        self.children = [[] for _ in range(count)]
+        self.depth = [-1] * count
+
+        # List of (weapon id, previous_en) for parents that don't exist
+        self.orphans = []
+
+        # List of weapon id lists. Each list is a cycle, in parent order
+        self.cycles = []
+
+        for idx, entry in enumerate(weapon_map.values()):
+            weapon_type = entry['weapon_type']
+            self._weapon_types.append(weapon_type)
+
+            previous_name = entry.get('previous_en', None)
+            if not previous_name:
+                continue
+
+            parent_id = weapon_map.id_of('en', previous_name, weapon_type)
+            if parent_id is None:
+                self.orphans.append((entry.id, previous_name))
+                continue
+
+            parent_idx = self._index[parent_id]
+            self.parent[idx] = parent_idx
+            self.children[parent_idx].append(idx)
+
+        self._roots = {}
+        self._order = {}
+        for idx in range(count):
+            if self.parent[idx] == -1:
+                self._roots.setdefault(self._weapon_types[idx], []).append(idx)
+                self._traverse(idx)
+
+        self._find_cycles()
+
+    def _traverse(self, root_idx):
+        "Assigns depths and the parent-first order for the tree starting at root_idx"
+        order = self._order.setdefault(self._weapon_types[root_idx], [])
+        self.depth[root_idx] = 0
+        stack = [root_idx]
+        while stack:
+            idx = stack.pop()
+            order.append(idx)
+            for child_idx in reversed(self.children[idx]):
+                self.depth[child_idx] = self.depth[idx] + 1
+                stack.append(child_idx)
+
+    def _find_cycles(self):
+        """Weapons unreachable from a root are in a cycle or descend from one.
+        Each is visited once, following parents until a visited weapon is found."""
+        state = [0 if depth == -1 else 2 for depth in self.depth] # 0 = unvisited, 1 = in path, 2 = done
+        for start_idx in range(len(self.ids)):
+            path = []
+            idx = start_idx
+            while state[idx] == 0:
+                state[idx] = 1
+                path.append(idx)
+                idx = self.parent[idx]
+
+            if state[idx] == 1:
+                cycle = path[path.index(idx):]
+                self.cycles.append([self.ids[i] for i in reversed(cycle)])
+            for path_idx in path:
+                state[path_idx] = 2
+
+    def parent_of(self, weapon_id):
+        "Returns the id of the weapon this one is upgraded from, or None"
+        parent_idx = self.parent[self._index[weapon_id]]
+        return self.ids[parent_idx] if parent_idx != -1 else None
+
+    def children_of(self, weapon_id):
+        "Returns the ids of the weapons this one upgrades into"
+        return [self.ids[idx] for idx in self.children[self._index[weapon_id]]]
+
+    def depth_of(self, weapon_id):
+        "Returns the number of upgrades from the root of the tree, or None if the weapon is part of a cycle"
+        depth = self.depth[self._index[weapon_id]]
+        return depth if depth != -1 else None
+
+    def is_final(self, weapon_id):
+        "Returns true if the weapon cannot be upgraded further"
+        return not self.children[self._index[weapon_id]]
+
+    def weapon_types(self):
+        return list(self._roots.keys())
+
+    def roots(self, weapon_type):
+        "Returns the ids of the weapons of a type that have no parent"
+        return [self.ids[idx] for idx in self._roots.get(weapon_type, [])]
+
+    def ordered(self, weapon_type=None):
+        """Returns weapon ids in tree order, where every weapon comes after its parent.
+        If weapon_type is not given, weapons of every type are returned.
+        Weapons that are part of a cycle are not included."""
+        if weapon_type is not None:
+            return [self.ids[idx] for idx in self._order.get(weapon_type, [])]
+        return [self.ids[idx] for order in self._order.values() for idx in order]
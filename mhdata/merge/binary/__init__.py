@@ -1,8 +1,52 @@
-def update_all():
-    "Updates all supported entity types using merged chunk data from ingame binaries."
+def update_all(dry_run=False, changed_only=False, manifest_path=None, stage_output=None):
+    """Updates all supported entity types using merged chunk data from ingame binaries.
+    Only files whose content changes are written. In a dry run, the changes are printed but not written.
+    If stage_output (a scheduler.StageOutput) is given, text each stage writes to it is kept together.
+
+    The chunk files read by each stage are saved to a manifest after every merge.
+    If changed_only is set, only the stages that read files changed since the last merge are run."""
+    import os
+    from mhdata.binary.load import registry
+    from mhdata.binary.load.manifest import Manifest, get_default_manifest_path
+    from mhdata.io import output
+
+    manifest_path = manifest_path or get_default_manifest_path()
+    previous = Manifest.load(manifest_path) if os.path.exists(manifest_path) else None
+
+    stages = None
+    if changed_only and not previous:
+        print(f"Warning: No manifest found at {manifest_path}, updating everything")
+    elif changed_only:
+        diff = previous.compare(previous.snapshot())
+        stages = previous.affected_stages(diff)
+        for rel_path in diff.all():
+            print(f"Changed game file: {rel_path}")
+        if stages is None:
+            print("Shared game files changed, updating everything")
+        elif not stages:
+            print("No game files changed since the last merge")
+            return
+        else:
+            print("Updating " + ", ".join(sorted(stages)))
+
+    # Updaters read many of the same game files, so each is only parsed once
+    with registry.session() as resources, output.session(dry_run) as changes:
+        _update_all(stages, stage_output)
+    resources.print_report()
+    changes.print_summary()
+
+    if not dry_run:
+        manifest = Manifest.from_registry(resources, previous=previous)
+        if stages is not None:
+            manifest = previous.update(manifest)
+        manifest.save(manifest_path)
+        print(f"Saved the manifest of read game files to {manifest_path}")
+
+def _update_all(stages=None, stage_output=None):
+    "Runs the merge stages, or only the given stages and those they need if stages is given"
     from mhdata.binary import metadata
     from mhdata.binary import ItemCollection, ArmorCollection, MonsterCollection
-    from mhdata.load import load_data
+    from mhdata.load import load_data, validate
     
     from .armor import update_armor, update_charms
     from .weapons import update_weapons, update_weapon_songs, update_kinsects
@@ -10,11 +54,17 @@ def update_all():
     from .quests import update_quests
     from .items import update_items, update_decorations, register_combinations, ItemUpdater
     from .tools import update_tools
+    from .scheduler import StageScheduler
+    from mhdata.binary.load import registry
     from . import simple_translate
 
     mhdata = load_data()
     print("Existing Data loaded. Using it as a base to merge new data")
 
+    # Completeness checks are skipped, as merging is what fills in missing data
+    if not validate(mhdata, 'merge'):
+        print("Warning: Existing data has validation errors, merged data may be incomplete")
+
     area_map = metadata.load_area_map()
     print("Area Map Loaded")
 
@@ -32,35 +82,70 @@ def update_all():
 
     print() # newline
 
-    simple_translate.translate_skills(mhdata)
+    # Stages declare what they read and write, so that independent stages run concurrently.
+    # Map names stand for the loaded data, and csv paths for the files written to source_data.
+    # Stages that track encountered items get their own ItemUpdater, and are merged in stage order.
+    scheduler = StageScheduler(stage_context=registry.stage, output=stage_output)
+    trackers = {}
+    def tracker(name):
+        trackers[name] = item_updater.fork()
+        return trackers[name]
 
-    update_monsters(mhdata, item_data, monster_data)
-    update_armor(mhdata, item_updater, armor_data)
-    update_charms(mhdata, item_updater, armor_data)
-    update_weapons(mhdata, item_updater)
-    update_decorations(mhdata, item_data)
-    update_tools(mhdata)
-    update_weapon_songs(mhdata)
+    def merge_trackers():
+        for tracked in trackers.values():
+            item_updater.merge(tracked)
+
+    scheduler.add('translate_skills', simple_translate.translate_skills, mhdata,
+        inputs=['skill_map'],
+        outputs=['skill_map', 'skills/skill_base.csv', 'skills/skill_levels.csv'])
+    scheduler.add('update_monsters', update_monsters, mhdata, item_data, monster_data,
+        inputs=['monster_map', 'item_data'],
+        outputs=['monster_data', 'monsters/monster_base.csv'])
+    scheduler.add('update_armor', update_armor, mhdata, tracker('update_armor'), armor_data,
+        inputs=['armor_map', 'armorset_map', 'armorset_bonus_map', 'item_data', 'armor_data'],
+        outputs=['item_ids/update_armor', 'armors/armorset_base.csv', 'armors/armor_base.csv',
+            'armors/armor_skills_ext.csv', 'armors/armor_craft_ext.csv', 'armors/armorset_bonus_base.csv'])
+    scheduler.add('update_charms', update_charms, mhdata, tracker('update_charms'), armor_data,
+        inputs=['charm_map', 'item_data', 'armor_data'],
+        outputs=['item_ids/update_charms', 'charms/charm_base.csv', 'charms/charm_craft.csv'])
+    scheduler.add('update_weapons', update_weapons, mhdata, tracker('update_weapons'),
+        inputs=['weapon_map', 'item_data'],
+        outputs=['item_ids/update_weapons', 'weapons/weapon_base.csv', 'weapons/weapon_sharpness.csv',
+            'weapons/weapon_bow_ext.csv', 'weapons/weapon_craft.csv', 'weapons/weapon_ammo.csv'])
+    scheduler.add('update_decorations', update_decorations, mhdata, item_data,
+        inputs=['decoration_map', 'item_data'],
+        outputs=['decorations/decoration_base.csv'])
+    scheduler.add('update_tools', update_tools, mhdata,
+        inputs=['tool_map'],
+        outputs=['tools/tool_base.csv'])
+    scheduler.add('update_weapon_songs', update_weapon_songs, mhdata,
+        inputs=['weapon_melodies'],
+        outputs=['weapons/weapon_melody_base.csv', 'weapons/weapon_melody_notes.csv'])
     #update_kinsects(mhdata, item_updater)
-    update_quests(mhdata, item_updater, monster_data, area_map)
-    
-    # Now finalize the item updates from parsing the rest of the data
-    register_combinations(mhdata, item_updater)
-    update_items(item_updater)
+    scheduler.add('update_quests', update_quests, mhdata, tracker('update_quests'), monster_data, area_map,
+        inputs=['quest_map', 'item_data', 'monster_data'],
+        outputs=['item_ids/update_quests', 'quests/quest_base.csv',
+            'quests/quest_monsters.csv', 'quests/quest_rewards.csv'])
 
+    # Now finalize the item updates from parsing the rest of the data
+    scheduler.add('merge_item_ids', merge_trackers,
+        inputs=[f'item_ids/{name}' for name in trackers.keys()],
+        outputs=['item_ids'])
+    scheduler.add('register_combinations', register_combinations, mhdata, item_updater,
+        inputs=['item_combinations', 'item_data'],
+        outputs=['item_ids'])
 
-def dump_file(filename):
-    from . import dump as d
-    import os
-    
-    filetypes = {
-        '.gmd': d.dump_gmd
-    }
+    # update_items loads the source data again, so it runs after every file is written
+    scheduler.add('update_items', update_items, item_updater,
+        inputs=['item_ids', *scheduler.outputs()],
+        outputs=['items/item_base.csv'])
 
-    _, extension = os.path.splitext(filename)
-    extension = extension.lower()
-    if extension not in filetypes:
-        supported = ", ".join(filetypes.keys())
-        raise Exception(f"Invalid extension {extension}, supported extensions are {supported}")
+    # Item ids come from every stage, so items are always updated
+    scheduler.run(only=None if stages is None else { *stages, 'update_items' })
 
-    return filetypes[extension](filename)
+def dump_file(filename, outfile, file_type=None):
+    """Writes the records of a binary file to outfile as NDJSON.
+    The type is detected from the file unless a type name is given"""
+    from . import dump as d
+    dump_type = d.get_dump_type(file_type) if file_type else None
+    return d.dump_file(filename, outfile, dump_type)
@@ -141,37 +141,37 @@ def update_armor(mhdata, item_updater: ItemUpdater, armor_collection: ArmorColle
 
     # Write new data
     writer = create_writer()
-
-    writer.save_base_map_csv(
-        "armors/armorset_base.csv", 
-        new_armorset_map, 
-        schema=schema.ArmorSetSchema(),
-        translation_filename="armors/armorset_base_translations.csv")
-
-    writer.save_base_map_csv(
-        "armors/armor_base.csv", 
-        new_armor_map, 
-        schema=schema.ArmorBaseSchema(),
-        translation_filename="armors/armor_base_translations.csv")
-
-    writer.save_data_csv(
-        "armors/armor_skills_ext.csv",
-        new_armor_map,
-        key="skills"
-    )
-
-    writer.save_data_csv(
-        "armors/armor_craft_ext.csv",
-        new_armor_map,
-        key="craft"
-    )
-
-    writer.save_base_map_csv(
-        "armors/armorset_bonus_base.csv",
-        new_armorset_bonus_map,
-        schema=schema.ArmorSetBonus(),
-        translation_filename="armors/armorset_bonus_base_translations.csv"
-    )
+    with writer.concurrent_writes():
+        writer.save_base_map_csv(
+            "armors/armorset_base.csv", 
+            new_armorset_map, 
+            schema=schema.ArmorSetSchema(),
+            translation_filename="armors/armorset_base_translations.csv")
+
+        writer.save_base_map_csv(
+            "armors/armor_base.csv", 
+            new_armor_map, 
+            schema=schema.ArmorBaseSchema(),
+            translation_filename="armors/armor_base_translations.csv")
+
+        writer.save_data_csv(
+            "armors/armor_skills_ext.csv",
+            new_armor_map,
+            key="skills"
+        )
+
+        writer.save_data_csv(
+            "armors/armor_craft_ext.csv",
+            new_armor_map,
+            key="craft"
+        )
+
+        writer.save_base_map_csv(
+            "armors/armorset_bonus_base.csv",
+            new_armorset_bonus_map,
+            schema=schema.ArmorSetBonus(),
+            translation_filename="armors/armorset_bonus_base_translations.csv"
+        )
 
     print("Armor files updated\n")
 
@@ -228,18 +228,18 @@ def update_charms(mhdata, item_updater: ItemUpdater, armor_collection: ArmorColl
 
     # Write new data
     writer = create_writer()
-
-    writer.save_base_map_csv(
-        'charms/charm_base.csv', 
-        new_charm_map, 
-        translation_filename="charms/charm_base_translations.csv", 
-        schema=schema.CharmBaseSchema()
-    )
-
-    writer.save_data_csv(
-        "charms/charm_craft.csv",
-        new_charm_map,
-        key="craft"
-    )
+    with writer.concurrent_writes():
+        writer.save_base_map_csv(
+            'charms/charm_base.csv', 
+            new_charm_map, 
+            translation_filename="charms/charm_base_translations.csv", 
+            schema=schema.CharmBaseSchema()
+        )
+
+        writer.save_data_csv(
+            "charms/charm_craft.csv",
+            new_charm_map,
+            key="craft"
+        )
 
     print("Charm files updated\n")
\ No newline at end of file
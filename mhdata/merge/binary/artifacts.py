@@ -4,13 +4,17 @@ from os import path
 import typing
 
 from mhdata import typecheck
-from mhdata.io import DataReaderWriter
+from mhdata.io import DataReaderWriter, output
 from mhdata.io.csv import save_csv
 
 def write_artifact(filename, *raw_data):
     """Writes an artifact file, 
-    which is a temporary fakefile used to gauge game data
+    which is a temporary fakefile used to gauge game data.
+    Nothing is written during a dry run
     """
+    if output.is_dry_run():
+        return
+
     basepath = path.join(path.dirname(__file__), '../../../artifacts/')
     filepath = path.join(basepath, filename)
 
@@ -44,6 +48,9 @@ def write_dicts_artifact(filename, lines: typing.Iterable[dict], autoflatten=Tru
                     new_line[key] = value
             lines.append(new_line)
 
+    if output.is_dry_run():
+        return
+
     basepath = path.join(path.dirname(__file__), '../../../artifacts/')
     filepath = path.join(basepath, filename)
     os.makedirs(path.dirname(filepath), exist_ok=True)
@@ -1,23 +1,195 @@
-from io import StringIO
-from mhdata.binary.load import load_text
-from mhdata.io.csv import save_csv
-
-def dump_gmd(filename: str):
-    base_name = filename
-    if base_name.lower().endswith('.gmd'):
-        base_name = base_name[:-8]
-
-    gmd_data = load_text(base_name)
-
-    rows = []
-    for idx, (key, entries) in enumerate(gmd_data.keyed_entries.items()):
-        rows.append({
-            'index': idx,
-            'key': key,
-            **entries
-        })
-
-    output = StringIO()
-    save_csv(rows, output)
-    return output.getvalue()
-    
\ No newline at end of file
+"""
+Dumps game binary files as NDJSON, one json object per record.
+
+Files with a list of entries (such as an item data or item lot file) have one record per entry,
+and other files (such as a quest or hitzone file) are a single record.
+The type of a file is detected from its extension, and otherwise from the magic bytes
+of its header. Encrypted files can only be detected from their extension.
+"""
+
+import importlib
+import json
+import os
+import struct
+import tempfile
+import typing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from mhdata import typecheck
+
+class DumpType(typing.NamedTuple):
+    name: str
+    extensions: typing.Tuple[str, ...]
+    load: typing.Callable
+    struct_file: typing.Any = None
+
+
+def _load_struct_file(struct_file):
+    def load(filename):
+        with open(filename, 'rb') as f:
+            return struct_file.load(f)
+    return load
+
+def _load_readable(module_name, readable_name):
+    def load(filename):
+        from mhdata.binary.parsers import read_struct_from_file
+        module = importlib.import_module(f'mhdata.binary.parsers.{module_name}')
+        return read_struct_from_file(filename, getattr(module, readable_name))
+    return load
+
+def _load_parser(module_name, fn_name):
+    def load(filename):
+        module = importlib.import_module(f'mhdata.binary.parsers.{module_name}')
+        return getattr(module, fn_name)(filename)
+    return load
+
+def _load_gmd(filename):
+    from mhw_armor_edit.ftypes import gmd
+    with open(filename, 'rb') as f:
+        data = gmd.Gmd.load(f)
+    return [{ 'index': idx, 'key': item.key, 'value': item.value } for idx, item in enumerate(data.items)]
+
+def _create_dump_types():
+    from mhw_armor_edit.ftypes import (am_dat, amrs, arm_up, bbtbl, eq_crt, eq_cus, itm, kire,
+        lbm_base, lbm_skill, mkex, mkit, oam_dat, sgpa, sh_tbl, skl_dat, skl_pt_dat,
+        wep_glan, wep_wsl, wp_dat, wp_dat_g)
+    from mhw_armor_edit.ftypes.ext import rod_inse
+
+    struct_files = {
+        '.am_dat': am_dat.AmDat, '.amrs': amrs.Amrs, '.arm_up': arm_up.ArmUp,
+        '.bbtbl': bbtbl.Bbtbl, '.eq_crt': eq_crt.EqCrt, '.eq_cus': eq_cus.EqCus,
+        '.itm': itm.Itm, '.kire': kire.Kire, '.lbm_base': lbm_base.LbmBase,
+        '.lbm_skill': lbm_skill.LbmSkill, '.mkex': mkex.Mkex, '.mkit': mkit.Mkit,
+        '.oam_dat': oam_dat.OAmDat, '.sgpa': sgpa.Sgpa, '.shl_tbl': sh_tbl.ShlTbl,
+        '.skl_dat': skl_dat.SklDat, '.skl_pt_dat': skl_pt_dat.SklPtDat,
+        '.wep_glan': wep_glan.WepGlan, '.wep_wsl': wep_wsl.WepWsl, '.wp_dat': wp_dat.WpDat,
+        '.wp_dat_g': wp_dat_g.WpDatG, '.rod_inse': rod_inse.RodInse
+    }
+
+    return [
+        DumpType('gmd', ('.gmd',), _load_gmd),
+        DumpType('mib', ('.mib',), _load_parser('mib', 'load_quest')),
+        DumpType('rem', ('.rem',), _load_readable('mib', 'RemFile')),
+        DumpType('itlot', ('.itlot',), _load_parser('itlot', 'load_itlot')),
+        DumpType('dtt_epg', ('.dtt_epg',), _load_parser('epg', 'load_epg')),
+        DumpType('dtt_eda', ('.dtt_eda',), _load_parser('eda', 'load_eda')),
+        DumpType('lbr', ('.lbr', '.em104lbr'), _load_readable('lbr', 'SafiLbr')),
+        DumpType('ask', ('.ask',), _load_readable('ask', 'Ask')),
+        DumpType('msk', ('.msk',), _load_parser('msk', 'load_msk')),
+        DumpType('mske', ('.mske',), _load_parser('msk', 'load_mske')),
+        *(DumpType(ext[1:], (ext,), _load_struct_file(cls), cls) for ext, cls in struct_files.items())
+    ]
+
+_dump_types = None
+
+def get_dump_types() -> typing.List[DumpType]:
+    "Returns every supported file type. Created on first use, as this imports every parser"
+    global _dump_types
+    if _dump_types is None:
+        _dump_types = _create_dump_types()
+    return _dump_types
+
+def get_dump_type(name):
+    "Returns the file type with the given name, raising an exception if it isn't supported"
+    for dump_type in get_dump_types():
+        if dump_type.name == name:
+            return dump_type
+    supported = ", ".join(t.name for t in get_dump_types())
+    raise Exception(f"Invalid file type {name}, supported types are {supported}")
+
+def detect_type(filename) -> typing.Optional[DumpType]:
+    "Returns the type of a binary file from its extension or magic bytes, or None if it is unknown"
+    _, extension = os.path.splitext(filename)
+    extension = extension.lower()
+    for dump_type in get_dump_types():
+        if extension in dump_type.extensions:
+            return dump_type
+
+    # Only the header is read, as chunk folders contain many large files of other types
+    with open(filename, 'rb') as f:
+        header = f.read(16)
+    size = os.path.getsize(filename)
+    if len(header) >= 4 and struct.unpack_from('<I', header, 0)[0] == 0x00444d47:
+        return get_dump_type('gmd')
+
+    # Some struct files share the same magic, so the file size must also match the entry count
+    matches = []
+    for dump_type in get_dump_types():
+        struct_file = dump_type.struct_file
+        if struct_file is None or len(header) < struct_file.ENTRY_OFFSET:
+            continue
+        magic = struct.unpack_from('<H', header, struct_file.MAGIC_OFFSET)[0]
+        num_entries = struct.unpack_from('<I', header, struct_file.NUM_ENTRY_OFFSET)[0]
+        entries_size = size - struct_file.ENTRY_OFFSET
+        if magic == struct_file.MAGIC and entries_size == num_entries * struct_file.EntryFactory.STRUCT_SIZE:
+            matches.append(dump_type)
+    return matches[0] if len(matches) == 1 else None
+
+
+def iter_records(filename, dump_type: DumpType=None):
+    "Parses a binary file, and yields its records as json compatible dictionaries"
+    from mhdata.binary.parsers import struct_to_json
+
+    dump_type = dump_type or detect_type(filename)
+    if dump_type is None:
+        raise Exception(f"Could not detect the type of {filename}")
+
+    result = dump_type.load(filename)
+    entries = result if isinstance(result, list) else getattr(result, 'entries', None)
+    if entries is None or not typecheck.is_flat_iterable(entries):
+        yield struct_to_json(result)
+        return
+
+    for idx, entry in enumerate(entries):
+        record = struct_to_json(entry)
+        yield { 'index': idx, **record } if 'index' not in record else record
+
+def dump_file(filename, outfile, dump_type: DumpType=None):
+    "Writes the records of a binary file to outfile as NDJSON, one record at a time. Returns the record count"
+    count = 0
+    for record in iter_records(filename, dump_type):
+        outfile.write(json.dumps(record, ensure_ascii=False, default=str))
+        outfile.write('\n')
+        count += 1
+    return count
+
+
+def _dump_to_path(filename, output_path):
+    "Dumps one file of a tree to a temporary file, which replaces output_path once done. Runs in a worker process"
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(output_path), prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            count = dump_file(filename, f)
+        os.replace(temp_path, output_path)
+        return count
+    except:
+        os.remove(temp_path)
+        raise
+
+def dump_tree(root, output_dir, *, max_workers=None):
+    """Dumps every binary file of a known type under root to output_dir, using one process per worker.
+    Each file is written to the same relative path, with .ndjson added.
+    Returns a mapping of relative path -> record count, or the error raised while dumping it."""
+    jobs = {}
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            try:
+                dump_type = detect_type(path)
+            except OSError:
+                continue
+            if dump_type:
+                rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+                jobs[rel_path] = (path, os.path.join(output_dir, rel_path + '.ndjson'))
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = { executor.submit(_dump_to_path, *job): rel_path for rel_path, job in jobs.items() }
+        for future in as_completed(futures):
+            rel_path = futures[future]
+            try:
+                results[rel_path] = future.result()
+            except Exception as ex:
+                results[rel_path] = ex
+    return { rel_path: results[rel_path] for rel_path in jobs }
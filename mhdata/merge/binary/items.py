@@ -17,10 +17,26 @@ class ItemUpdater:
         self.data = collection
         self.encountered_item_ids = set()
 
+    def fork(self):
+        "Returns an ItemUpdater over the same items, which tracks encountered items separately"
+        return ItemUpdater(self.data)
+
+    def merge(self, other: 'ItemUpdater'):
+        "Adds the items encountered by another ItemUpdater, such as one created by fork()"
+        self.encountered_item_ids.update(other.encountered_item_ids)
+
     def _check_invalid(self, item):
         if item.name['en'] in ['HARDUMMY']:
             raise DummyItemError(f"INVALID ITEM {item.name['en']}")
         
+    def is_valid(self, binary_item_id):
+        "Returns false if the item is a dummy item, which name_for() would raise an error for"
+        try:
+            self._check_invalid(self.data.by_id(binary_item_id))
+            return True
+        except DummyItemError:
+            return False
+
     def add_missing_items(self, encountered_item_ids: Iterable[int]):
         # Check valid (name_for does that automatically)
         [self.name_for(item_id) for item_id in encountered_item_ids]
@@ -6,7 +6,7 @@ from mhdata.io import create_writer, DataMap
 from mhdata.load import schema
 
 from mhdata.binary import MonsterCollection, MonsterData, ItemCollection
-from mhdata.binary.load import get_chunk_root
+from mhdata.binary.load import get_chunk_root, registry
 from mhdata.binary.parsers import struct_to_json, load_itlot, load_eda
 from .items import ItemUpdater
 from . import artifacts
@@ -150,7 +150,7 @@ def read_status(monsters: MonsterCollection):
     root = Path(get_chunk_root())
 
     results = {}
-    for filename in root.joinpath('em/').rglob('*.dtt_eda'):
+    for filename in registry.rglob(root.joinpath('em/'), '*.dtt_eda'):
         eda_binary = load_eda(filename)
         json_data = struct_to_json(eda_binary)
 
@@ -181,6 +181,7 @@ def read_drops(monsters: MonsterCollection, items: ItemCollection):
         itlot_key = (key_description or key_name).lower()
         if itlot_key:
             itlot_path = root.joinpath(f"common/item/{itlot_key}.itlot")
+            registry.record_files([itlot_path])
             drops = load_itlot(itlot_path)
 
             monster_drops = []
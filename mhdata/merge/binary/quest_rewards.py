@@ -0,0 +1,57 @@
+"""
+Builds the rewards of quests from their reward (rem) files.
+"""
+
+from string import ascii_uppercase
+
+from .items import ItemUpdater
+
+def get_quest_rewards(quest, item_updater: ItemUpdater):
+    """Returns the reward rows of a quest, marking items used in the item updater.
+    Each group gets a guaranteed entry for its first item if the rem file doesn't use a drop mechanic,
+    followed by its items with guaranteed drops first and then the most likely first.
+    Raises a DummyItemError if the quest rewards an invalid item."""
+    rewards = []
+    for idx, rem in enumerate(quest.reward_data_list):
+        group = ascii_uppercase[idx]
+        group_items = []
+
+        first = True
+        for (item_id, qty, chance) in rem.iter_items():
+            item_name, _ = item_updater.name_and_description_for(item_id)
+            if first and not rem.drop_mechanic:
+                rewards.append({
+                    'group': group,
+                    'item_en': item_name['en'],
+                    'stack': qty,
+                    'percentage': 100
+                })
+
+            first = False
+
+            group_items.append({
+                'item_en': item_name['en'],
+                'stack': qty,
+                'percentage': chance
+            })
+
+        def rank_drop(drop):
+            percentage = drop['percentage']
+            if percentage == 100:
+                return 0
+            return 100 - percentage
+        group_items.sort(key=rank_drop)
+        rewards.extend({ 'group': group, **i } for i in group_items)
+    return rewards
+
+def get_quests_by_item(quests):
+    """Returns a mapping of item id -> ids of the quests that reward it, in order of first appearance.
+    Each quest id is listed once, even if several quests share it."""
+    results = {}
+    for quest in quests:
+        item_ids = { item_id for rem in quest.reward_data_list for (item_id, _, _) in rem.iter_items() }
+        for item_id in sorted(item_ids):
+            quest_ids = results.setdefault(item_id, [])
+            if quest.id not in quest_ids:
+                quest_ids.append(quest.id)
+    return results
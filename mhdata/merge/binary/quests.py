@@ -1,5 +1,4 @@
 import collections
-from string import ascii_uppercase
 
 from mhdata import cfg, typecheck
 from mhdata.io import create_writer, DataMap
@@ -12,6 +11,7 @@ from mhdata.binary.parsers import struct_to_json
 
 from .artifacts import write_dicts_artifact, create_artifact_writer
 from .items import ItemUpdater, DummyItemError
+from .quest_rewards import get_quest_rewards, get_quests_by_item
 
 def update_quests(mhdata, item_updater: ItemUpdater, monster_data: MonsterCollection, area_map):
     print('Beginning load of quest binary data')
@@ -32,6 +32,11 @@ def update_quests(mhdata, item_updater: ItemUpdater, monster_data: MonsterCollec
             print(f'Warning: Quest {quest_name} has exact duplicates.')
 
     write_quest_raw_data(quests, item_updater.data, monster_data)
+    write_dicts_artifact('quest_rewards_by_item.csv', [
+        { 'item_en': item_updater.data.by_id(item_id).name['en'], 'quest_count': len(quest_ids), 'quest_ids': ' '.join(map(str, quest_ids)) }
+        for item_id, quest_ids in sorted(get_quests_by_item(quests).items())
+        if item_updater.is_valid(item_id)
+    ])
     print('Quest artifacts written. Copy ids and names to quest_base.csv to add to build')
 
     # Merge the quest data
@@ -56,29 +61,29 @@ def update_quests(mhdata, item_updater: ItemUpdater, monster_data: MonsterCollec
     print('Quest artifact quest_new.csv added. Add any new entries to quest_base.csv')
 
     writer = create_writer()
-
-    writer.save_base_map_csv(
-        "quests/quest_base.csv",
-        mhdata.quest_map,
-        translation_filename="quests/quest_base_translations.csv",
-        translation_extra=['objective', 'description'],
-        schema=schema.QuestBaseSchema(),
-        key_join='id'
-    )
-
-    writer.save_data_csv(
-        'quests/quest_monsters.csv',
-        mhdata.quest_map,
-        key='monsters',
-        key_join='id'
-    )
-
-    writer.save_data_csv(
-        'quests/quest_rewards.csv',
-        mhdata.quest_map,
-        key='rewards',
-        key_join='id'
-    )
+    with writer.concurrent_writes():
+        writer.save_base_map_csv(
+            "quests/quest_base.csv",
+            mhdata.quest_map,
+            translation_filename="quests/quest_base_translations.csv",
+            translation_extra=['objective', 'description'],
+            schema=schema.QuestBaseSchema(),
+            key_join='id'
+        )
+
+        writer.save_data_csv(
+            'quests/quest_monsters.csv',
+            mhdata.quest_map,
+            key='monsters',
+            key_join='id'
+        )
+
+        writer.save_data_csv(
+            'quests/quest_rewards.csv',
+            mhdata.quest_map,
+            key='rewards',
+            key_join='id'
+        )
 
     print('Quest files updated\n')
 
@@ -201,38 +206,7 @@ def get_quest_data(quest, item_updater: ItemUpdater, monster_data: MonsterCollec
 
     # quest rewards
     try:
-        rewards = []
-        for idx, rem in enumerate(quest.reward_data_list):
-            group = ascii_uppercase[idx]
-            group_items = []
-
-            first = True
-            for (item_id, qty, chance) in rem.iter_items():
-                item_name, _ = item_updater.name_and_description_for(item_id)
-                if first and not rem.drop_mechanic:
-                    rewards.append({
-                        'group': group,
-                        'item_en': item_name['en'],
-                        'stack': qty,
-                        'percentage': 100
-                    })
-
-                first = False
-
-                group_items.append({
-                    'item_en': item_name['en'],
-                    'stack': qty,
-                    'percentage': chance
-                })
-
-            def rank_drop(drop):
-                percentage = drop['percentage']
-                if percentage == 100:
-                    return 0
-                return 100 - percentage
-            group_items.sort(key=rank_drop)
-            rewards.extend({ 'group': group, **i } for i in group_items)
-        result['rewards'] = rewards
+        result['rewards'] = get_quest_rewards(quest, item_updater)
     except DummyItemError:
         print(f"ERROR: Quest {quest.id}:{quest.name['en']} has invalid items, skipping rewards")
 
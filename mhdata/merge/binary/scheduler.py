@@ -0,0 +1,164 @@
+"""
+Runs the stages of a merge concurrently, in an order that respects what each stage reads and writes.
+
+Each stage declares the names of what it reads (inputs) and writes (outputs),
+such as mhdata maps, binary collections, and source_data files.
+A stage runs after every earlier stage that writes something it reads or writes,
+or that reads something it writes. The results are therefore the same as running
+the stages one after another in the order they were added.
+
+If the scheduler is given a StageOutput, text a stage writes to it is buffered,
+and written in the order the stages were added. The scheduler doesn't redirect stdout itself,
+so the caller decides whether print() goes to the StageOutput (see binary.py update).
+
+Names containing a / (such as csv paths) are results of a single stage, while other names
+(such as maps and collections) are shared data. When only some stages are run, earlier stages
+that write shared data read by those stages are run as well.
+"""
+
+import contextlib
+import io
+import threading
+import typing
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+class Stage(typing.NamedTuple):
+    name: str
+    fn: typing.Callable
+    args: tuple
+    inputs: frozenset
+    outputs: frozenset
+
+
+class StageOutput(io.TextIOBase):
+    """A text stream that sends text written by a thread running a stage to the stage's buffer,
+    and other text to the wrapped stream. Threads started by a stage (such as a thread pool)
+    are not running the stage, so their text isn't buffered."""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.buffers = {}
+
+    def write(self, text):
+        buffer = self.buffers.get(threading.get_ident(), None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+class StageScheduler:
+    "A list of stages, which are run by run() as soon as the stages they depend on are done"
+
+    def __init__(self, max_workers=None, stage_context=None, output: StageOutput=None):
+        """stage_context is an optional function that returns a context manager for a stage name, entered around that stage.
+        If output is given, text written to it by each stage is written to its stream in stage order"""
+        self.stages = []
+        self.max_workers = max_workers
+        self.stage_context = stage_context or (lambda name: contextlib.nullcontext())
+        self.output = output
+
+    def add(self, name, fn, *args, inputs=(), outputs=()):
+        "Adds a stage that calls fn(*args), and returns it"
+        if any(stage.name == name for stage in self.stages):
+            raise Exception(f"Stage {name} was already added")
+        stage = Stage(name, fn, args, frozenset(inputs), frozenset(outputs))
+        self.stages.append(stage)
+        return stage
+
+    def outputs(self):
+        "Returns everything written by the stages added so far"
+        return set(output for stage in self.stages for output in stage.outputs)
+
+    def dependencies(self, stages=None):
+        "Returns a mapping of stage name -> names of the earlier stages it runs after"
+        stages = self.stages if stages is None else stages
+        results = {}
+        for idx, stage in enumerate(stages):
+            results[stage.name] = [
+                earlier.name for earlier in stages[:idx]
+                if earlier.outputs & (stage.inputs | stage.outputs) or earlier.inputs & stage.outputs
+            ]
+        return results
+
+    def required(self, names):
+        "Returns the names of the given stages, and of the earlier stages that write shared data they read"
+        required = set(names)
+        for idx in reversed(range(len(self.stages))):
+            stage = self.stages[idx]
+            if stage.name not in required:
+                continue
+            shared_inputs = set(name for name in stage.inputs if '/' not in name)
+            for earlier in self.stages[:idx]:
+                if earlier.outputs & shared_inputs:
+                    required.add(earlier.name)
+        return required
+
+    def run(self, only=None):
+        """Runs every stage, or the stages required to run the stage names in only,
+        starting each one once the stages it depends on are done.
+        If a stage raises, no more stages are started, and the first error is raised once running stages finish."""
+        if only is not None:
+            required = self.required(only)
+            stages = [stage for stage in self.stages if stage.name in required]
+        else:
+            stages = self.stages
+        dependencies = self.dependencies(stages)
+        output = self.output
+        printed = {}
+        done = set()
+        errors = {}
+
+        def run_stage(stage):
+            if output is None:
+                with self.stage_context(stage.name):
+                    stage.fn(*stage.args)
+                return
+
+            buffer = io.StringIO()
+            output.buffers[threading.get_ident()] = buffer
+            try:
+                with self.stage_context(stage.name):
+                    stage.fn(*stage.args)
+            finally:
+                del output.buffers[threading.get_ident()]
+                printed[stage.name] = buffer.getvalue()
+
+        next_printed = 0
+        def print_finished():
+            # Output is printed in stage order, so a stage waits for the stages added before it
+            nonlocal next_printed
+            while next_printed < len(stages) and stages[next_printed].name in printed:
+                output.stream.write(printed[stages[next_printed].name])
+                next_printed += 1
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+            started = set()
+            while True:
+                if not errors:
+                    for stage in stages:
+                        if stage.name not in started and all(d in done for d in dependencies[stage.name]):
+                            started.add(stage.name)
+                            running[executor.submit(run_stage, stage)] = stage
+                if not running:
+                    break
+
+                finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage = running.pop(future)
+                    if future.exception() is not None:
+                        errors[stage.name] = future.exception()
+                    else:
+                        done.add(stage.name)
+                if output is not None:
+                    print_finished()
+
+        # Stages after a failed stage may not have run, so the output of the rest is written as is
+        for stage in stages[next_printed:]:
+            if stage.name in printed:
+                output.stream.write(printed[stage.name])
+
+        for stage in stages:
+            if stage.name in errors:
+                raise errors[stage.name]
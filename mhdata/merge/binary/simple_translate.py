@@ -25,20 +25,20 @@ def translate_skills(mhdata):
                 print(f"Failed to find description translations for skill {skill_name} level {level['level']}")
 
     writer = create_writer()
+    with writer.concurrent_writes():
+        writer.save_base_map_csv(
+            "skills/skill_base.csv",
+            mhdata.skill_map,
+            schema=schema.SkillBaseSchema(),
+            translation_filename="skills/skill_base_translations.csv",
+            translation_extra=['description']
+        )
 
-    writer.save_base_map_csv(
-        "skills/skill_base.csv",
-        mhdata.skill_map,
-        schema=schema.SkillBaseSchema(),
-        translation_filename="skills/skill_base_translations.csv",
-        translation_extra=['description']
-    )
-
-    writer.save_data_csv(
-        "skills/skill_levels.csv",
-        mhdata.skill_map,
-        key='levels',
-        schema=schema.SkillLevelSchema()
-    )
+        writer.save_data_csv(
+            "skills/skill_levels.csv",
+            mhdata.skill_map,
+            key='levels',
+            schema=schema.SkillLevelSchema()
+        )
 
     print("Skill files updated\n")
@@ -2,6 +2,7 @@ from decimal import Decimal, ROUND_HALF_UP
 
 from mhdata.io import create_writer, DataMap
 from mhdata.load import schema, datafn
+from mhdata.load.weapontree import WeaponTree
 
 from mhw_armor_edit.ftypes import wp_dat, wp_dat_g, wep_wsl, sh_tbl, bbtbl
 from mhdata.binary.parsers.msk import note_colors
@@ -370,42 +371,49 @@ def update_weapons(mhdata, item_updater: ItemUpdater):
 
         new_weapon_map.insert(new_entry)
 
+    # Check that the merged upgrade trees are still valid
+    weapon_tree = WeaponTree(new_weapon_map)
+    for weapon_id, previous_name in weapon_tree.orphans:
+        print(f"Warning: Weapon {new_weapon_map[weapon_id].name('en')} has invalid previous weapon {previous_name}")
+    for cycle in weapon_tree.cycles:
+        print("Warning: Weapon upgrade cycle " + ' -> '.join(new_weapon_map[i].name('en') for i in cycle))
+
     # Write new data
     writer = create_writer()
-
-    writer.save_base_map_csv(
-        "weapons/weapon_base.csv",
-        new_weapon_map,
-        schema=schema.WeaponBaseSchema(),
-        translation_filename="weapons/weapon_base_translations.csv"
-    )
-
-    writer.save_data_csv(
-        "weapons/weapon_sharpness.csv",
-        new_weapon_map, 
-        key="sharpness",
-        schema=schema.WeaponSharpnessSchema()
-    )
-
-    writer.save_data_csv(
-        "weapons/weapon_bow_ext.csv",
-        new_weapon_map,
-        key="bow",
-        schema=schema.WeaponBowSchema()
-    )
-
-    writer.save_data_csv(
-        "weapons/weapon_craft.csv",
-        new_weapon_map, 
-        key="craft",
-        schema=schema.WeaponRecipeSchema()
-    )
-
-    writer.save_keymap_csv(
-        "weapons/weapon_ammo.csv",
-        ammo_reader.data,
-        schema=schema.WeaponAmmoSchema()
-    )
+    with writer.concurrent_writes():
+        writer.save_base_map_csv(
+            "weapons/weapon_base.csv",
+            new_weapon_map,
+            schema=schema.WeaponBaseSchema(),
+            translation_filename="weapons/weapon_base_translations.csv"
+        )
+
+        writer.save_data_csv(
+            "weapons/weapon_sharpness.csv",
+            new_weapon_map, 
+            key="sharpness",
+            schema=schema.WeaponSharpnessSchema()
+        )
+
+        writer.save_data_csv(
+            "weapons/weapon_bow_ext.csv",
+            new_weapon_map,
+            key="bow",
+            schema=schema.WeaponBowSchema()
+        )
+
+        writer.save_data_csv(
+            "weapons/weapon_craft.csv",
+            new_weapon_map, 
+            key="craft",
+            schema=schema.WeaponRecipeSchema()
+        )
+
+        writer.save_keymap_csv(
+            "weapons/weapon_ammo.csv",
+            ammo_reader.data,
+            schema=schema.WeaponAmmoSchema()
+        )
 
     print("Weapon files updated\n")
 
@@ -443,20 +451,20 @@ def update_kinsects(mhdata, item_updater: ItemUpdater):
 
     # Write new data
     writer = create_writer()
-
-    writer.save_base_map_csv(
-        "weapons/kinsect_base.csv",
-        kinsect_map,
-        schema=schema.KinsectBaseSchema(),
-        translation_filename="weapons/kinsect_base_translations.csv"
-    )
-
-    writer.save_data_csv(
-        "weapons/kinsect_craft_ext.csv",
-        kinsect_map, 
-        key="craft",
-        schema=schema.RecipeSchema()
-    )
+    with writer.concurrent_writes():
+        writer.save_base_map_csv(
+            "weapons/kinsect_base.csv",
+            kinsect_map,
+            schema=schema.KinsectBaseSchema(),
+            translation_filename="weapons/kinsect_base_translations.csv"
+        )
+
+        writer.save_data_csv(
+            "weapons/kinsect_craft_ext.csv",
+            kinsect_map, 
+            key="craft",
+            schema=schema.RecipeSchema()
+        )
     
     print("Kinsect files updated\n")
 
@@ -505,19 +513,19 @@ def update_weapon_songs(mhdata):
         
     # Write new data
     writer = create_writer()
-
-    writer.save_base_map_csv(
-        "weapons/weapon_melody_base.csv",
-        mhdata.weapon_melodies,
-        translation_filename="weapons/weapon_melody_base_translations.csv",
-        translation_extra=['effect1', 'effect2'],
-        schema=schema.WeaponMelodyBaseSchema()
-    )
-
-    writer.save_data_csv(
-        "weapons/weapon_melody_notes.csv",
-        mhdata.weapon_melodies,
-        key='notes'
-    )
+    with writer.concurrent_writes():
+        writer.save_base_map_csv(
+            "weapons/weapon_melody_base.csv",
+            mhdata.weapon_melodies,
+            translation_filename="weapons/weapon_melody_base_translations.csv",
+            translation_extra=['effect1', 'effect2'],
+            schema=schema.WeaponMelodyBaseSchema()
+        )
+
+        writer.save_data_csv(
+            "weapons/weapon_melody_notes.csv",
+            mhdata.weapon_melodies,
+            key='notes'
+        )
 
     print("Weapon Melody files updated\n")
\ No newline at end of file
@@ -130,5 +130,6 @@ def merge_weapons():
     print_all(mismatches_other)
 
     weapon_base_schema = schema.WeaponBaseSchema()
-    writer.save_base_map_csv('weapons/weapon_base_NEW.csv', data, schema=weapon_base_schema)
-    writer.save_data_csv('weapons/weapon_sharpness_NEW.csv', data, key='sharpness')
+    with writer.concurrent_writes():
+        writer.save_base_map_csv('weapons/weapon_base_NEW.csv', data, schema=weapon_base_schema)
+        writer.save_data_csv('weapons/weapon_sharpness_NEW.csv', data, key='sharpness')
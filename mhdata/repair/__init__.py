@@ -9,8 +9,8 @@ from mhdata.load import load_data, schema
 
 writer = create_writer()
 
-def repair_rewards():
-    data = load_data()
+def repair_rewards(data=None):
+    data = data or load_data()
 
     for monster_id, monster_entry in data.monster_map.items():
         # If there are no rewards, skip
@@ -58,9 +58,9 @@ def repair_rewards():
         schema=schema.MonsterReward())
     print("Repair complete")
 
-def repair_skill_data():
+def repair_skill_data(data=None):
     "Reorganizes skill data ordering to match base map"
-    data = load_data()
+    data = data or load_data()
 
     writer.save_data_csv(
         "skills/skill_levels.csv", 
@@ -68,8 +68,8 @@ def repair_skill_data():
         key="levels", 
         groups=['description'])
 
-def repair_armor_data():
-    data = load_data()
+def repair_armor_data(data=None):
+    data = data or load_data()
 
     armor_map = data.armor_map
     armorset_map = data.armorset_map
@@ -98,8 +98,8 @@ def repair_armor_data():
     result, errors = armor_schema.dump(result_list, many=True)
     writer.save_csv("armors/armor_base.csv", result)
 
-def repair_decoration_colors():
-    data = load_data()
+def repair_decoration_colors(data=None):
+    data = data or load_data()
 
     for entry in data.decoration_map.values():
         skill_en = entry['skill_en']
@@ -109,3 +109,11 @@ def repair_decoration_colors():
     decoration_schema = schema.DecorationBaseSchema()
     result, errors = decoration_schema.dump(data.decoration_map.to_list(), many=True)
     writer.save_csv("decorations/decoration_base.csv", result)
+
+# Repair functions by the name of their repair.py subcommand
+repairs = {
+    'rewards': repair_rewards,
+    'skills': repair_skill_data,
+    'armor': repair_armor_data,
+    'decorations': repair_decoration_colors
+}
@@ -17,6 +17,14 @@ def recreate_database(output_filename):
 
     return sqlalchemy.orm.sessionmaker(bind=engine)
 
+def open_database(filename):
+    "Opens an existing database file, returning a session manager"
+    if not os.path.exists(filename):
+        raise FileNotFoundError(f"Database {filename} does not exist")
+
+    engine = sqlalchemy.create_engine(f'sqlite:///{filename}', echo=False)
+    return sqlalchemy.orm.sessionmaker(bind=engine)
+
 # adapted from sqlalchemy docs
 @contextmanager
 def session_scope(sessionmaker):
@@ -633,6 +633,7 @@ class Decoration(Base):
     sealed_feystone_percent = Column(Float)
 
     translations = relationship("DecorationText")
+    chances = relationship("DecorationChance")
     
 class DecorationText(Base):
     __tablename__ = 'decoration_text'
@@ -640,6 +641,14 @@ class DecorationText(Base):
     lang_id = Column(Text, ForeignKey('language.id'), primary_key=True)
     name = Column(Text)
 
+class DecorationChance(Base):
+    "The chance of getting a decoration from a feystone, and the average number of feystones needed to get it"
+    __tablename__ = 'decoration_chance'
+    decoration_id = Column(Integer, ForeignKey('decoration.id'), primary_key=True)
+    feystone = Column(Text, primary_key=True)
+    percent = Column(Float)
+    expected_feystones = Column(Float, nullable=True)
+
 class Charm(Base):
     __tablename__ = 'charm'
 
@@ -765,4 +774,55 @@ class ToolText(Base):
     lang_id = Column(Text, ForeignKey('language.id'), primary_key=True)
     name = Column(Text)
     name_base = Column(Text)
-    description = Column(Text)
\ No newline at end of file
+    description = Column(Text)
+
+# Denormalized lookup tables.
+# These duplicate data from the tables above so that common app queries
+# become a single indexed lookup. They are populated by mhdata.build.lookups
+
+class ItemSource(Base):
+    "Every place an item can be obtained from"
+    __tablename__ = 'item_source'
+
+    # An item can come from the same source several times (ex: from multiple quest reward groups).
+    # Therefore this table has no "real id" and uses a surrogate instead
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    item_id = Column(Integer, ForeignKey('item.id'), index=True)
+    source_type = Column(Text) # monster, quest, location, or combination
+    source_id = Column(Integer)
+    rank = Column(Text)
+    condition_id = Column(Integer)
+    stack = Column(Integer)
+    percentage = Column(Integer)
+
+class ItemUsage(Base):
+    "Every recipe or combination that consumes an item"
+    __tablename__ = 'item_usage'
+
+    # An item can be used by the same equipment several times (ex: in both its create and upgrade recipes).
+    # Therefore this table has no "real id" and uses a surrogate instead
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    item_id = Column(Integer, ForeignKey('item.id'), index=True)
+    usage_type = Column(Text) # armor, weapon, charm, kinsect, or combination
+    usage_id = Column(Integer)
+    quantity = Column(Integer)
+
+class SkillTreeEquipment(Base):
+    "Every piece of equipment that grants a skill, with the levels summed per equipment"
+    __tablename__ = 'skilltree_equipment'
+    skilltree_id = Column(Integer, ForeignKey('skilltree.id'), primary_key=True)
+    equipment_type = Column(Text, primary_key=True) # armor, weapon, charm, or decoration
+    equipment_id = Column(Integer, primary_key=True)
+    level = Column(Integer)
+
+class MonsterQuest(Base):
+    "Quests a monster appears in, keyed by monster"
+    __tablename__ = 'monster_quest'
+    monster_id = Column(Integer, ForeignKey('monster.id'), primary_key=True)
+    quest_id = Column(Integer, ForeignKey('quest.id'), primary_key=True)
+    quantity = Column(Integer)
+    is_objective = Column(Boolean)
+    rank = Column(Text)
+    stars = Column(Integer)
@@ -1,3 +1,5 @@
+import importlib
+import sys
 from collections.abc import Mapping
 from mhdata import typecheck
 
@@ -6,6 +8,19 @@ from .orderedset import OrderedSet
 from .sharpness import Sharpness
 
 
+def lazy_attributes(module_name, attributes):
+    """Returns a module level __getattr__ function that imports attributes from submodules when first used.
+    Attributes is a mapping of attribute name -> submodule name, relative to module_name.
+    Used by packages whose submodules import heavy libraries, so that importing the package is fast."""
+    def __getattr__(name):
+        if name not in attributes:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(attributes[name], module_name), name)
+        setattr(sys.modules[module_name], name, value)
+        return value
+    return __getattr__
+
+
 def ensure(field, error_message):
     "Tests that the field is truthy, throwing an Exception if its not"
     if not field:
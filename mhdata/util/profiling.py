@@ -0,0 +1,127 @@
+"""
+Optional instrumentation for the load and build pipeline.
+
+Code marks regions of work using the stage() context manager.
+Stages do nothing unless a BuildProfiler has been enabled, which
+records wall time, cpu time, peak memory, and rows inserted per stage.
+
+Stages given a session flush it before they end, so the inserts of a build step are timed as part
+of the step. A normal build flushes less often, so profiled builds do some extra work:
+the flush is included in the step times, while counting the inserted rows is not.
+"""
+
+import contextlib
+import json
+import time
+import tracemalloc
+
+_active_profiler = None
+
+class BuildProfiler:
+    """Records measurements for nested stages.
+    Stage names are joined with a / to show nesting, ex: load_data/items/item_base.csv
+    """
+
+    def __init__(self, *, trace_memory=True):
+        self.trace_memory = trace_memory
+        self.stages = []
+        self._stack = []
+        self._row_counts = {}
+
+    def _current_peak(self):
+        if not self.trace_memory:
+            return None
+        return tracemalloc.get_traced_memory()[1]
+
+    def _reset_peak(self):
+        # reset_peak was added in python 3.9. Earlier versions report the peak since start
+        if self.trace_memory and hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+
+    def _count_inserted_rows(self, session):
+        "Returns the number of rows added to each table since the last count. The session must be flushed"
+        import sqlalchemy
+        from mhdata.sql import Base
+
+        inserted = {}
+        for table in Base.metadata.sorted_tables:
+            count = session.execute(sqlalchemy.select(sqlalchemy.func.count()).select_from(table)).scalar()
+            previous = self._row_counts.get(table.name, 0)
+            if count != previous:
+                inserted[table.name] = count - previous
+            self._row_counts[table.name] = count
+        return inserted
+
+    @contextlib.contextmanager
+    def stage(self, name, session=None):
+        # The peak memory for the parent stage is saved before the child resets it
+        if self._stack:
+            parent = self._stack[-1]
+            parent['peak_memory'] = max(parent['peak_memory'] or 0, self._current_peak() or 0)
+        self._reset_peak()
+
+        frame = { 'name': name, 'peak_memory': None }
+        self._stack.append(frame)
+        full_name = '/'.join(f['name'] for f in self._stack)
+
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        completed = False
+        try:
+            yield
+            if session is not None:
+                session.flush()
+            completed = True
+        finally:
+            wall_time = time.perf_counter() - start_wall
+            cpu_time = time.process_time() - start_cpu
+
+            rows = self._count_inserted_rows(session) if session is not None and completed else {}
+
+            self._stack.pop()
+            peak = max(frame['peak_memory'] or 0, self._current_peak() or 0)
+            if self._stack:
+                parent = self._stack[-1]
+                parent['peak_memory'] = max(parent['peak_memory'] or 0, peak)
+            self._reset_peak()
+
+            self.stages.append({
+                'name': full_name,
+                'wall_time': round(wall_time, 6),
+                'cpu_time': round(cpu_time, 6),
+                'peak_memory': peak if self.trace_memory else None,
+                'rows_inserted': rows
+            })
+
+    def report(self):
+        "Returns the recorded measurements as a json-serializable dictionary"
+        return { 'stages': self.stages }
+
+    def save_report(self, location):
+        with open(location, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=4)
+
+
+def enable(profiler: BuildProfiler):
+    "Activates a profiler. All stages run afterwards are recorded by it"
+    global _active_profiler
+    _active_profiler = profiler
+    if profiler.trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+def disable():
+    "Deactivates the current profiler, returning it"
+    global _active_profiler
+    profiler = _active_profiler
+    _active_profiler = None
+    if profiler and profiler.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return profiler
+
+def stage(name, session=None):
+    """Returns a context manager that measures a stage if profiling is enabled.
+    If a session is given, the rows it inserted are also counted.
+    """
+    if _active_profiler is None:
+        return contextlib.nullcontext()
+    return _active_profiler.stage(name, session)
@@ -1,11 +1,6 @@
 import click
 import sys
 
-import mhdata.load as data
-import mhdata.repair as repair_functions
-
-from mhdata.io import DataReaderWriter
-
 # Python 3.6 dictionaries preserve insertion order, and python 3.7 added it to the spec officially
 # Older versions of python won't maintain order when importing data for the build.
 if sys.version_info < (3,6):
@@ -14,30 +9,57 @@ if sys.version_info < (3,6):
     print("Earlier versions of Python will still build the project, but will not have a consistent build.")
     print("When creating a final build, make sure to use a newer version of python.")
 
+def run_repair(ctx, name):
+    "Runs a repair in the running daemon if --daemon was given, otherwise runs it here"
+    from mhdata.io import data_path
+
+    if ctx.obj['daemon']:
+        from mhdata.daemon import connect, DaemonError
+
+        client = connect(source_path=data_path)
+        if client:
+            try:
+                client.repair(name)
+            except DaemonError as ex:
+                raise click.ClickException(str(ex))
+            print("Repair complete")
+            return
+        print("No daemon is running, repairing without one")
+
+    # Repairs import marshmallow, so they're imported once needed
+    from mhdata.repair import repairs
+    repairs[name]()
+
 @click.group()
-def repair():
+@click.option('--daemon', is_flag=True, help="Repair using a running daemon (see build.py serve) if there is one")
+@click.pass_context
+def repair(ctx, daemon):
     "Contains subcommands to repair (aka reorder) certain data elements"
-    pass
+    ctx.obj = { 'daemon': daemon }
 
 @repair.command()
-def rewards():
+@click.pass_context
+def rewards(ctx):
     "Reorders monster rewards to match a new data ordering"
-    repair_functions.repair_rewards()
+    run_repair(ctx, 'rewards')
 
 @repair.command()
-def skills():
+@click.pass_context
+def skills(ctx):
     "Reorders skill level details to match the base's data ordering"
-    repair_functions.repair_skill_data()
+    run_repair(ctx, 'skills')
 
 @repair.command()
-def armor():
+@click.pass_context
+def armor(ctx):
     "Repairs all armor data to synchronize data order"
-    repair_functions.repair_armor_data()
+    run_repair(ctx, 'armor')
 
 @repair.command()
-def decorations():
+@click.pass_context
+def decorations(ctx):
     "Repairs decoration colors by updating colors to match the skill"
-    repair_functions.repair_decoration_colors()
+    run_repair(ctx, 'decorations')
 
 if __name__ == '__main__':
-    repair()
\ No newline at end of file
+    repair()
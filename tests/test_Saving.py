@@ -73,3 +73,31 @@ def test_save_data_csv_symmetric_listmode(writer: DataReaderWriter):
     abc = new_data.to_dict()
 
     assert extdata.to_dict() == new_data.to_dict(), "expected data to match"
+
+def test_save_csv_fields_in_first_seen_order(tmpdir):
+    from mhdata.io.csv import save_csv
+    from decimal import Decimal
+    location = str(tmpdir.join('fields.csv'))
+    save_csv([{ 'b': 1, 'a': Decimal('1.5') }, { 'c': None, 'a': 2 }], location)
+    with open(location, encoding='utf-8') as f:
+        assert f.read() == 'b,a,c\n1,1.5,\n,2,\n'
+
+def test_save_csv_rejects_nested_values(tmpdir):
+    from mhdata.io.csv import save_csv
+    location = str(tmpdir.join('nested.csv'))
+    with pytest.raises(Exception):
+        save_csv([{ 'a': 1 }, { 'a': [1, 2] }], location)
+    assert not os.path.exists(location)
+
+def test_concurrent_writes(writer: DataReaderWriter):
+    data = DataMap()
+    data.insert(create_entry_en('test1', { 'id': '1' }))
+    data.insert(create_entry_en('test2', { 'id': '2' }))
+
+    with writer.concurrent_writes():
+        for idx in range(5):
+            writer.save_base_map_csv(f'testbase{idx}.csv', data, groups=['name', 'description'])
+
+    for idx in range(5):
+        new_data = writer.load_base_csv(f'testbase{idx}.csv', languages, groups=['name', 'description'])
+        assert data.to_list() == new_data.to_list()
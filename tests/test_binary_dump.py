@@ -0,0 +1,52 @@
+import io
+import json
+import struct
+
+from mhw_armor_edit.ftypes import itm, kire, wep_wsl
+from mhdata.merge.binary import dump
+
+def create_struct_file(struct_file, num_entries):
+    "Returns the bytes of a struct file with empty entries"
+    header = bytearray(struct_file.ENTRY_OFFSET)
+    struct.pack_into('<H', header, struct_file.MAGIC_OFFSET, struct_file.MAGIC)
+    struct.pack_into('<I', header, struct_file.NUM_ENTRY_OFFSET, num_entries)
+    return bytes(header) + bytes(num_entries * struct_file.EntryFactory.STRUCT_SIZE)
+
+def test_dump_struct_file_records(tmpdir):
+    location = tmpdir.join('itemData.itm')
+    location.write_binary(create_struct_file(itm.Itm, 3))
+
+    output = io.StringIO()
+    assert dump.dump_file(str(location), output) == 3
+
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [r['index'] for r in records] == [0, 1, 2]
+    assert set(itm.ItmEntry.fields()) <= set(records[0].keys())
+
+def test_detect_type_from_magic(tmpdir):
+    # Both types share the same magic, but have differently sized entries
+    kire_file = tmpdir.join('unknown1.bin')
+    kire_file.write_binary(create_struct_file(kire.Kire, 2))
+    wsl_file = tmpdir.join('unknown2.bin')
+    wsl_file.write_binary(create_struct_file(wep_wsl.WepWsl, 2))
+    other_file = tmpdir.join('other.bin')
+    other_file.write_binary(b'not a game file')
+
+    assert dump.detect_type(str(kire_file)).name == 'kire'
+    assert dump.detect_type(str(wsl_file)).name == 'wep_wsl'
+    assert dump.detect_type(str(other_file)) is None
+
+def test_dump_tree(tmpdir):
+    root = tmpdir.mkdir('chunk')
+    root.mkdir('common').join('itemData.itm').write_binary(create_struct_file(itm.Itm, 2))
+    root.join('common', 'reward.rem').write_binary(bytes(114))
+    root.join('readme.txt').write('not a game file')
+
+    output_dir = tmpdir.join('output')
+    results = dump.dump_tree(str(root), str(output_dir), max_workers=2)
+
+    assert set(results.keys()) == { 'common/itemData.itm', 'common/reward.rem' }
+    assert results['common/itemData.itm'] == 2
+    assert results['common/reward.rem'] == 1
+    rem_record = json.loads(output_dir.join('common', 'reward.rem.ndjson').read())
+    assert rem_record['item_ids'] == [0] * 16
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from mhdata.binary.load import registry, bcore
+from mhdata.binary.load.bcore import GmdGroup
+
+def test_registry_only_loads_once(tmpdir):
+    location = tmpdir.join('resource.bin')
+    location.write_binary(b'12345678')
+    loads = []
+
+    def load():
+        loads.append(1)
+        return object()
+
+    with registry.session() as resources:
+        first = registry.memoized(('schema', 'resource.bin'), [str(location)], load)
+        second = registry.memoized(('schema', 'resource.bin'), [str(location)], load)
+
+    assert first is second
+    assert len(loads) == 1
+    assert resources.loads == 1
+    assert resources.bytes_read == 8
+    assert resources.bytes_saved == 8
+    assert resources.hits[('schema', 'resource.bin')] == 1
+
+def test_nothing_is_cached_without_a_registry():
+    assert not registry.enabled()
+    first = registry.memoized(('schema', 'resource.bin'), [], object)
+    assert registry.memoized(('schema', 'resource.bin'), [], object) is not first
+
+def test_text_copies_are_independent():
+    group = GmdGroup({ 0: { 'en': 'Potion' } }, { 'ITEM_0': { 'en': 'Potion' } })
+    copied = group.copy()
+    copied[0]['en'] = 'Mega Potion'
+    copied['ITEM_0']['en'] = 'Mega Potion'
+    assert group[0]['en'] == 'Potion'
+    assert group['ITEM_0']['en'] == 'Potion'
+
+def test_text_files_are_counted_once(tmpdir, monkeypatch):
+    for ext_lang in bcore.lang_map:
+        tmpdir.join(f'item_{ext_lang}.gmd').write_binary(b'1234')
+    item = SimpleNamespace(key='ITEM_0', value='Potion')
+    monkeypatch.setattr(bcore, 'CHUNK_DIRECTORY', str(tmpdir))
+    monkeypatch.setattr(bcore.gmd.Gmd, 'load', classmethod(lambda cls, f: SimpleNamespace(items=[item])))
+
+    with registry.session() as resources:
+        bcore.load_text('item')
+        bcore.load_text('item')
+        bcore.load_text('item', exclude_keys=True)
+
+    file_size = 4 * len(bcore.lang_map)
+    assert resources.loads == 2
+    assert resources.bytes_read == 2 * file_size
+    assert resources.bytes_saved == file_size
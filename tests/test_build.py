@@ -1,5 +1,6 @@
 import os
 import os.path
+import sqlite3
 import pytest
 
 from mhdata import build
@@ -25,3 +26,8 @@ def test_builds_sql(tmpdir, mhdata):
 
     dbexists = os.path.exists(fname)
     assert dbexists, 'Database should have been created'
+
+    conn = sqlite3.connect(str(fname))
+    num_sources = conn.execute("SELECT COUNT(*) FROM item_source").fetchone()[0]
+    conn.close()
+    assert num_sources > 0, 'Lookup tables should have been populated'
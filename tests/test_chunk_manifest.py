@@ -0,0 +1,71 @@
+from mhdata.binary.load import registry
+from mhdata.binary.load.manifest import Manifest
+
+def create_chunks(tmpdir):
+    tmpdir.mkdir('quest').mkdir('q00101').join('questData_00101.mib').write_binary(b'quest')
+    tmpdir.mkdir('common').join('itemData.itm').write_binary(b'items')
+    tmpdir.join('common', 'armor.am_dat').write_binary(b'armor')
+
+def record_merge(tmpdir):
+    "Reads the files like a merge would, returning the manifest"
+    with registry.session() as resources:
+        registry.memoized(('schema', 'itm'), [str(tmpdir.join('common', 'itemData.itm'))], object)
+        with registry.stage('update_quests'):
+            registry.rglob(tmpdir.join('quest'), '*.mib')
+        with registry.stage('update_armor'):
+            registry.memoized(('schema', 'am_dat'), [str(tmpdir.join('common', 'armor.am_dat'))], object)
+    return Manifest.from_registry(resources, root=str(tmpdir))
+
+def test_files_are_recorded_by_stage(tmpdir):
+    create_chunks(tmpdir)
+    manifest = record_merge(tmpdir)
+
+    assert manifest.stage_files == {
+        registry.shared_stage: ['common/itemData.itm'],
+        'update_quests': ['quest/q00101/questData_00101.mib'],
+        'update_armor': ['common/armor.am_dat']
+    }
+    assert set(manifest.files.keys()) == {
+        'common/itemData.itm', 'common/armor.am_dat', 'quest/q00101/questData_00101.mib'
+    }
+
+def test_changed_files_map_to_stages(tmpdir):
+    create_chunks(tmpdir)
+    manifest = record_merge(tmpdir)
+    unchanged = manifest.compare(manifest.snapshot(str(tmpdir)))
+    assert unchanged.all() == []
+    assert manifest.affected_stages(unchanged) == set()
+
+    # A new quest file is found through the pattern the quest loader searched with
+    tmpdir.join('quest').mkdir('q00102').join('questData_00102.mib').write_binary(b'quest2')
+    diff = manifest.compare(manifest.snapshot(str(tmpdir)))
+    assert diff.added == ['quest/q00102/questData_00102.mib']
+    assert manifest.affected_stages(diff) == { 'update_quests' }
+
+    # Files read outside of a stage affect every stage
+    tmpdir.join('common', 'itemData.itm').write_binary(b'items2')
+    diff = manifest.compare(manifest.snapshot(str(tmpdir)))
+    assert diff.changed == ['common/itemData.itm']
+    assert manifest.affected_stages(diff) is None
+
+def test_manifest_save_and_load(tmpdir):
+    create_chunks(tmpdir)
+    manifest = record_merge(tmpdir)
+    manifest.save(str(tmpdir.join('manifest.json')))
+    loaded = Manifest.load(str(tmpdir.join('manifest.json')))
+    assert loaded.to_dict() == manifest.to_dict()
+
+def test_added_files_that_were_read_map_to_stages(tmpdir):
+    create_chunks(tmpdir)
+    rem_path = tmpdir.join('quest', 'rem', 'remData_500.rem')
+    with registry.session() as resources:
+        with registry.stage('update_quests'):
+            registry.record_files([str(rem_path)])
+    manifest = Manifest.from_registry(resources, root=str(tmpdir))
+    assert manifest.files == {}
+
+    tmpdir.join('quest').mkdir('rem')
+    rem_path.write_binary(b'rewards')
+    diff = manifest.compare(manifest.snapshot(str(tmpdir)))
+    assert diff.added == ['quest/rem/remData_500.rem']
+    assert manifest.affected_stages(diff) == { 'update_quests' }
@@ -0,0 +1,56 @@
+import os
+
+from mhdata.io import DataReader
+from mhdata.io.csv import read_csv
+from mhdata.io.compiled import CompiledSources, compile_sources
+from mhdata.build.watch import scan_files
+
+def create_sources(tmpdir):
+    tmpdir.mkdir('items').join('item_base.csv').write('name_en,rarity\nPotion,1\nHerb,\n')
+    tmpdir.mkdir('skills').join('skill_base.csv').write('name_en,max_level\nAttack Boost,7\n')
+    return CompiledSources(str(tmpdir))
+
+def test_compiled_rows_match_csv(tmpdir):
+    compiled = create_sources(tmpdir)
+    assert compile_sources(str(tmpdir)) == ['items', 'skills']
+    assert compile_sources(str(tmpdir)) == []
+
+    location = str(tmpdir.join('items', 'item_base.csv'))
+    assert compiled.read(location) == read_csv(location)
+    assert compiled.read(location) == [
+        { 'name_en': 'Potion', 'rarity': '1' },
+        { 'name_en': 'Herb', 'rarity': None }
+    ]
+
+def test_compiled_rows_are_validated(tmpdir, capsys):
+    compiled = create_sources(tmpdir)
+    location = tmpdir.join('items', 'item_base.csv')
+    location.write('name_en,rarity\nPotion ,1\n')
+    compile_sources(str(tmpdir))
+    capsys.readouterr()
+
+    compiled.read(str(location))
+    assert "Warning: Some values in CSV are not trimmed" in capsys.readouterr().out
+
+def test_changed_csv_files_are_stale(tmpdir):
+    compiled = create_sources(tmpdir)
+    compile_sources(str(tmpdir))
+    location = tmpdir.join('items', 'item_base.csv')
+
+    # Touching a file doesn't make it stale if the content is the same
+    os.utime(str(location), (0, 0))
+    assert compiled.stale_files() == []
+
+    location.write('name_en,rarity\nPotion,2\nHerb,\n')
+    assert compiled.stale_files() == ['items/item_base.csv']
+
+    reader = DataReader(languages=['en'], data_path=str(tmpdir))
+    assert reader.load_list_csv('items/item_base.csv')[0]['rarity'] == '2'
+
+    assert compile_sources(str(tmpdir)) == ['items']
+    assert compiled.stale_files() == []
+
+def test_compiled_files_are_not_source_files(tmpdir):
+    create_sources(tmpdir)
+    compile_sources(str(tmpdir))
+    assert set(scan_files(str(tmpdir))) == { 'items/item_base.csv', 'skills/skill_base.csv' }
@@ -0,0 +1,85 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from mhdata import daemon as daemon_module
+from mhdata.daemon import DaemonClient, DaemonError, token_header
+from mhdata.daemon import server as server_module
+from mhdata.daemon.server import BuildDaemon, create_server
+
+@pytest.fixture(scope='module')
+def client(tmpdir_factory):
+    output_dir = tmpdir_factory.mktemp('daemon')
+    token_path = str(output_dir.join('test.daemon_token'))
+
+    # The token is kept out of the source folder, so that a developer's running daemon keeps its own
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.setattr(daemon_module, 'get_token_path', lambda source_path=None: token_path)
+        monkeypatch.setattr(server_module, 'get_token_path', lambda source_path=None: token_path)
+
+        daemon = BuildDaemon(str(output_dir.join('unused.db')), output_dirs=[str(output_dir)])
+        daemon.start()
+        server = create_server(daemon, port=0)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+
+        yield DaemonClient(server.server_address[1])
+
+        server.shutdown()
+        server.server_close()
+        thread.join()
+        assert not os.path.exists(token_path)
+
+def test_daemon_looks_up_entities(client):
+    potion_id = client.id_of('item_map', 'Potion')
+    assert potion_id is not None
+    assert client.entity('item_map', id=potion_id)['name']['en'] == 'Potion'
+    assert client.entity('item_map', name='Not an item') is None
+    assert client.status()['collections']['item_map'] > 0
+
+def test_daemon_validates_edited_row(client):
+    quest = client.entity('quest_map', id=101)
+    assert client.validate_row('quest_map', quest) == []
+
+    quest['rewards'][0]['item_en'] = 'Not an item'
+    diagnostics = client.validate_row('quest_map', quest)
+    assert [d['column'] for d in diagnostics] == ['item_en']
+    assert diagnostics[0]['severity'] == 'error'
+
+def test_daemon_reports_invalid_commands(client):
+    with pytest.raises(DaemonError):
+        client.id_of('not_a_collection', 'Potion')
+    with pytest.raises(DaemonError):
+        client.call('not_a_command')
+
+def send(client, command, method='POST', headers=None, body=b'{}'):
+    "Sends a raw request to the daemon, returning (http status, response)"
+    request = urllib.request.Request(f'{client.url}/{command}', method=method,
+        data=body if method == 'POST' else None, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as ex:
+        return ex.code, json.loads(ex.read())
+
+def test_daemon_rejects_requests_web_pages_can_send(client):
+    with open(client.token_path, encoding='utf-8') as f:
+        token = f.read()
+    json_headers = { 'Content-Type': 'application/json', token_header: token }
+
+    assert send(client, 'status', headers=json_headers)[0] == 200
+    assert send(client, 'shutdown', method='GET')[0] == 405
+    assert send(client, 'status', headers={ **json_headers, 'Content-Type': 'text/plain' })[0] == 415
+    assert send(client, 'status', headers={ **json_headers, 'Origin': 'http://example.com' })[0] == 403
+    assert send(client, 'status', headers={ 'Content-Type': 'application/json' })[0] == 403
+    assert send(client, 'status', headers={ **json_headers, token_header: 'wrong' })[0] == 403
+
+def test_daemon_only_builds_to_output_dirs(client, tmpdir):
+    with pytest.raises(DaemonError, match="must be a .db file"):
+        client.build(str(tmpdir.join('elsewhere.db')))
+    with pytest.raises(DaemonError, match="must be a .db file"):
+        client.build(client.status()['output'][:-len('.db')] + '.txt')
@@ -0,0 +1,75 @@
+import sqlite3
+import pytest
+
+import mhdata.sql as db
+from mhdata.build import diff
+
+def create_db(path, items):
+    sessionbuilder = db.recreate_database(str(path))
+    with db.session_scope(sessionbuilder) as session:
+        session.add(db.Language(id='en', name='English', is_complete=True))
+        for item_id, name in items.items():
+            item = db.Item(id=item_id, category='item', rarity=1)
+            item.translations.append(db.ItemText(lang_id='en', name=name))
+            session.add(item)
+
+def read_item_names(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return dict(conn.execute("SELECT id, name FROM item_text ORDER BY id").fetchall())
+    finally:
+        conn.close()
+
+@pytest.fixture()
+def databases(tmpdir):
+    old_path = tmpdir.join('old.db')
+    new_path = tmpdir.join('new.db')
+    create_db(old_path, { 1: 'Potion', 2: 'Mega Potion', 3: 'Antidote' })
+    create_db(new_path, { 1: 'Potion', 2: 'Max Potion', 4: 'Herbal Medicine' })
+    return old_path, new_path
+
+def test_diff_finds_changes(databases):
+    changeset = diff.diff_databases(str(databases[0]), str(databases[1]))
+    counts = diff.count_changes(changeset)
+
+    assert counts['item'] == (1, 0, 1), "expected one item inserted and one deleted"
+    assert counts['item_text'] == (1, 1, 1), "expected one of each text change"
+    assert 'language' not in counts, "unchanged tables should be omitted"
+
+def test_apply_brings_db_up_to_date(databases, tmpdir):
+    old_path, new_path = databases
+    changeset = diff.diff_databases(str(old_path), str(new_path))
+
+    patch_path = str(tmpdir.join('patch.json'))
+    diff.save_changeset(changeset, patch_path)
+    diff.apply_changeset(str(old_path), diff.load_changeset(patch_path))
+
+    assert read_item_names(old_path) == read_item_names(new_path)
+    remaining = diff.diff_databases(str(old_path), str(new_path))
+    assert not remaining['tables'], "expected no differences after applying"
+
+def create_usage_db(path, usages):
+    sessionbuilder = db.recreate_database(str(path))
+    with db.session_scope(sessionbuilder) as session:
+        for item_id, usage_id, quantity in usages:
+            session.add(db.ItemUsage(item_id=item_id, usage_type='weapon', usage_id=usage_id, quantity=quantity))
+
+def read_usages(path):
+    conn = sqlite3.connect(str(path))
+    try:
+        return sorted(conn.execute("SELECT item_id, usage_id, quantity FROM item_usage").fetchall())
+    finally:
+        conn.close()
+
+def test_surrogate_key_rows_are_matched_by_value(tmpdir):
+    old_path = tmpdir.join('old.db')
+    new_path = tmpdir.join('new.db')
+    create_usage_db(old_path, [(1, 10, 2), (1, 10, 2), (2, 10, 1), (3, 11, 1)])
+    create_usage_db(new_path, [(5, 9, 1), (3, 11, 1), (1, 10, 2), (2, 10, 1)])
+
+    changeset = diff.diff_databases(str(old_path), str(new_path))
+    assert diff.count_changes(changeset)['item_usage'] == (1, 0, 1), \
+        "renumbered rows should be unchanged, and only one of the duplicates removed"
+
+    diff.apply_changeset(str(old_path), changeset)
+    assert read_usages(old_path) == read_usages(new_path)
@@ -0,0 +1,44 @@
+from decimal import Decimal
+from fractions import Fraction
+
+from mhdata.io import DataMap
+from mhdata.load import droptable
+from mhdata.load.droptable import DecorationDropTable
+
+def create_drop_table():
+    decoration_map = DataMap({
+        1: { 'name': { 'en': 'Attack Jewel' }, 'rarity': 5 },
+        2: { 'name': { 'en': 'Defense Jewel' }, 'rarity': 5 },
+        3: { 'name': { 'en': 'Expert Jewel' }, 'rarity': 6 },
+        4: { 'name': { 'en': 'Critical Jewel' }, 'rarity': 8 }
+    })
+    droprates = {
+        'mysterious': { 5: Fraction(3, 4), 6: Fraction(1, 4), 8: Fraction(0) },
+        'sealed': { 5: Fraction(0), 6: Fraction(1, 2), 8: Fraction(1, 2) }
+    }
+    return DecorationDropTable(droprates, decoration_map)
+
+def test_decorations_share_their_table_chance():
+    drops = create_drop_table()
+    assert drops.chance(1, 'mysterious') == Fraction(3, 8)
+    assert drops.chance(2, 'mysterious') == Fraction(3, 8)
+    assert drops.chance(3, 'sealed') == Fraction(1, 2)
+    assert drops.chance(4, 'mysterious') == 0
+    assert drops.percents(1) == { 'mysterious': Decimal('37.50000'), 'sealed': Decimal('0.00000') }
+
+def test_feystone_count_queries():
+    drops = create_drop_table()
+    assert drops.expected_feystones(1, 'mysterious') == Fraction(8, 3)
+    assert drops.expected_feystones(1, 'sealed') is None
+    assert drops.chance_from(3, 'sealed', 2) == Fraction(3, 4)
+    assert drops.chance_from(4, 'mysterious', 100) == 0
+
+def test_droprates_are_cached_by_contents(tmpdir):
+    location = tmpdir.join('decoration_droprates.csv')
+    location.write('feystone,5,6,7,8,9,10,11,12,13\nmysterious,85,15,,,,,,,\n')
+    rates = droptable.read_droprates(str(location))
+    assert rates['mysterious'][5] == Fraction(85, 100)
+    assert droptable.read_droprates(str(location)) is rates
+
+    location.write('feystone,5,6,7,8,9,10,11,12,13\nmysterious,80,20,,,,,,,\n')
+    assert droptable.read_droprates(str(location))['mysterious'][5] == Fraction(80, 100)
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from mhdata.binary.load.equipment_bload import EquipmentNode, EquipmentTree
+
+def create_tree(rows):
+    "Creates a tree from (id, parent id, tree name, craft, upgrade) rows"
+    nodes = {}
+    for entry_id, parent_id, tree, craft, upgrade in rows:
+        nodes[entry_id] = EquipmentNode(SimpleNamespace(id=entry_id), 'great-sword',
+            { 'en': f'Weapon {entry_id}' }, tree, craft, upgrade)
+        if parent_id is not None:
+            nodes[parent_id].add_child(nodes[entry_id])
+    return EquipmentTree(nodes)
+
+def create_sample_tree():
+    return create_tree([
+        (1, None, 'Ore', [(100, 2)], []),
+        (2, 1, 'Ore', [], [(100, 1), (101, 1)]),
+        (3, 2, 'Ore', [], [(102, 3)]),
+        (4, 1, 'Bone', [(200, 5)], [(101, 2)]),
+        (5, None, 'Bone', [(200, 1)], []),
+        (6, None, None, [(300, 1)], [])
+    ])
+
+def ids(nodes):
+    return [n.id for n in nodes]
+
+def test_crafted_order():
+    tree = create_sample_tree()
+    assert ids(tree.crafted()) == [1, 2, 3, 4, 5]
+    assert ids(tree.isolated()) == [6]
+    assert ids(tree.all()) == [1, 2, 3, 4, 5, 6]
+
+def test_descendant_and_path_queries():
+    tree = create_sample_tree()
+
+    assert ids(tree.descendants_of(1)) == [2, 3, 4]
+    assert ids(tree.descendants_of(2)) == [3]
+    assert tree.descendants_of(3) == []
+    assert tree.is_descendant(3, 1)
+    assert not tree.is_descendant(1, 3)
+    assert not tree.is_descendant(4, 2)
+    assert not tree.is_descendant(5, 1)
+    assert ids(tree.path_to(3)) == [1, 2, 3]
+    assert tree.depth_of(3) == 2
+    assert tree.depth_of(6) == 0
+
+def test_crafting_cost_rolls_up_the_path():
+    tree = create_sample_tree()
+
+    assert tree.crafting_cost(3) == [(100, 3), (101, 1), (102, 3)]
+    assert tree.crafting_cost(2) == [(100, 3), (101, 1)]
+    assert tree.crafting_cost(4) == [(100, 2), (101, 2)], "upgraded weapons use their upgrade recipe"
+    assert tree.crafting_cost(1) == [(100, 2)]
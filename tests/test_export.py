@@ -0,0 +1,30 @@
+import json
+from types import SimpleNamespace
+
+from mhdata.io import DataMap
+from mhdata.build import export
+
+def create_test_data():
+    item_map = DataMap()
+    item_map.insert({ 'name': { 'en': 'Potion', 'ja': '回復薬' }, 'rarity': 1 })
+    item_map.insert({ 'name': { 'en': 'Antidote', 'ja': '解毒薬' }, 'rarity': 1 })
+    return SimpleNamespace(
+        item_map=item_map,
+        item_combinations=[{ 'id': 1, 'result': 'Potion', 'first': 'Herb', 'second': None }])
+
+def read_ndjson(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+def test_export_splits_translations(tmpdir):
+    counts = export.export_data(create_test_data(), str(tmpdir))
+
+    assert counts['item'] == 2
+    assert counts['item_combinations'] == 1
+
+    items = read_ndjson(tmpdir.join('item.ndjson'))
+    assert items[0] == { 'id': 1, 'rarity': 1 }, "translated fields should be excluded"
+
+    texts = read_ndjson(tmpdir.join('item_text.ndjson'))
+    ja_names = [t['name'] for t in texts if t['lang_id'] == 'ja']
+    assert ja_names == ['回復薬', '解毒薬']
@@ -0,0 +1,52 @@
+import os
+
+from mhdata.io import DataReaderWriter, DataMap, output
+
+def create_writer(tmpdir):
+    return DataReaderWriter(languages=['en'], data_path=str(tmpdir))
+
+def create_map(*names):
+    return DataMap({ idx: { 'name': { 'en': name }, 'rarity': 1 } for idx, name in enumerate(names, 1) })
+
+def test_unchanged_files_are_not_rewritten(tmpdir):
+    writer = create_writer(tmpdir)
+    writer.save_base_map_csv('items.csv', create_map('Potion', 'Herb'))
+    location = tmpdir.join('items.csv')
+    os.utime(str(location), (0, 0))
+
+    with output.session() as changes:
+        writer.save_base_map_csv('items.csv', create_map('Potion', 'Herb'))
+
+    assert location.mtime() == 0
+    assert changes.changes == []
+    assert changes.unchanged == ['items.csv']
+
+def test_changes_are_summarized_by_row(tmpdir):
+    writer = create_writer(tmpdir)
+    writer.save_base_map_csv('items.csv', create_map('Potion', 'Herb'))
+
+    updated = create_map('Potion', 'Herb', 'Mega Potion')
+    updated[2]['rarity'] = 2
+    with output.session() as changes:
+        writer.save_base_map_csv('items.csv', updated)
+        writer.save_base_map_csv('new.csv', create_map('Potion'))
+
+    assert changes.changes == [
+        output.FileChange('items.csv', created=False, added=1, removed=0, changed=1),
+        output.FileChange('new.csv', created=True, added=1, removed=0, changed=0)
+    ]
+    assert 'Mega Potion' in tmpdir.join('items.csv').read()
+    assert [f for f in os.listdir(str(tmpdir)) if f.startswith('.tmp')] == []
+
+def test_dry_run_does_not_write(tmpdir):
+    writer = create_writer(tmpdir)
+    writer.save_base_map_csv('items.csv', create_map('Potion', 'Herb'))
+    original = tmpdir.join('items.csv').read()
+
+    with output.session(dry_run=True) as changes:
+        writer.save_base_map_csv('items.csv', create_map('Potion'))
+        writer.save_base_map('items.json', create_map('Potion'))
+
+    assert tmpdir.join('items.csv').read() == original
+    assert not tmpdir.join('items.json').exists()
+    assert [c.describe() for c in changes.changes] == ['0 added, 1 removed, 0 changed', 'created']
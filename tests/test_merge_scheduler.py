@@ -0,0 +1,79 @@
+import io
+import sys
+import threading
+import time
+
+import pytest
+
+from mhdata.merge.binary.scheduler import StageScheduler, StageOutput
+
+def test_stages_depend_on_earlier_conflicting_stages():
+    scheduler = StageScheduler()
+    noop = lambda: None
+    scheduler.add('armor', noop, inputs=['armor_map'], outputs=['armors/armor_base.csv', 'item_ids/armor'])
+    scheduler.add('tools', noop, inputs=['tool_map'], outputs=['tools/tool_base.csv'])
+    scheduler.add('merge_ids', noop, inputs=['item_ids/armor'], outputs=['item_ids'])
+    scheduler.add('items', noop, inputs=['item_ids', *scheduler.outputs()], outputs=['items/item_base.csv'])
+
+    assert scheduler.dependencies() == {
+        'armor': [],
+        'tools': [],
+        'merge_ids': ['armor'],
+        'items': ['armor', 'tools', 'merge_ids']
+    }
+
+def test_independent_stages_run_concurrently():
+    # Each stage waits for the other, which fails if they run one after another
+    barrier = threading.Barrier(2, timeout=5)
+    results = []
+
+    scheduler = StageScheduler()
+    scheduler.add('first', lambda: results.append(barrier.wait()), outputs=['a.csv'])
+    scheduler.add('second', lambda: results.append(barrier.wait()), outputs=['b.csv'])
+    scheduler.add('last', lambda: results.append('last'), inputs=['a.csv', 'b.csv'])
+    scheduler.run()
+
+    assert sorted(results[:2]) == [0, 1]
+    assert results[2] == 'last'
+
+def test_output_is_written_in_stage_order():
+    stream = io.StringIO()
+    output = StageOutput(stream)
+    scheduler = StageScheduler(output=output)
+    scheduler.add('slow', lambda: (time.sleep(0.1), print("slow", file=output)), outputs=['a.csv'])
+    scheduler.add('fast', lambda: print("fast", file=output), outputs=['b.csv'])
+    scheduler.run()
+
+    assert stream.getvalue() == "slow\nfast\n"
+
+def test_stdout_is_not_replaced():
+    streams = []
+    scheduler = StageScheduler(output=StageOutput(io.StringIO()))
+    scheduler.add('stage', lambda: streams.append(sys.stdout))
+    original = sys.stdout
+    scheduler.run()
+
+    assert streams == [original]
+
+def test_failed_stage_stops_dependent_stages():
+    def fail():
+        raise ValueError("bad data")
+
+    results = []
+    scheduler = StageScheduler()
+    scheduler.add('fail', fail, outputs=['a.csv'])
+    scheduler.add('after', lambda: results.append('after'), inputs=['a.csv'])
+
+    with pytest.raises(ValueError):
+        scheduler.run()
+    assert results == []
+
+def test_only_runs_selected_stages_and_shared_inputs():
+    results = []
+    scheduler = StageScheduler()
+    scheduler.add('monsters', lambda: results.append('monsters'), outputs=['monster_data', 'monsters/monster_base.csv'])
+    scheduler.add('armor', lambda: results.append('armor'), outputs=['armors/armor_base.csv'])
+    scheduler.add('quests', lambda: results.append('quests'), inputs=['monster_data'], outputs=['quests/quest_base.csv'])
+    scheduler.run(only=['quests'])
+
+    assert results == ['monsters', 'quests']
@@ -0,0 +1,41 @@
+from mhdata.util import profiling
+
+def test_stage_is_noop_when_disabled():
+    with profiling.stage('unused'):
+        pass
+    assert profiling.disable() is None
+
+def test_records_nested_stages():
+    profiler = profiling.BuildProfiler()
+    profiling.enable(profiler)
+    try:
+        with profiling.stage('outer'):
+            with profiling.stage('inner'):
+                data = [0] * 100000
+    finally:
+        profiling.disable()
+
+    stages = { s['name']: s for s in profiler.report()['stages'] }
+    assert list(stages.keys()) == ['outer/inner', 'outer']
+    assert stages['outer']['wall_time'] >= stages['outer/inner']['wall_time']
+    assert stages['outer']['peak_memory'] >= stages['outer/inner']['peak_memory'] > 0
+
+def test_session_flush_is_part_of_the_stage():
+    import time
+
+    class SlowFlushSession:
+        def flush(self):
+            time.sleep(0.05)
+
+    profiler = profiling.BuildProfiler(trace_memory=False)
+    profiler._count_inserted_rows = lambda session: { 'item': 1 }
+    profiling.enable(profiler)
+    try:
+        with profiling.stage('build_items', session=SlowFlushSession()):
+            pass
+    finally:
+        profiling.disable()
+
+    stage = profiler.report()['stages'][0]
+    assert stage['wall_time'] >= 0.05
+    assert stage['rows_inserted'] == { 'item': 1 }
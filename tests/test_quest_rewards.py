@@ -0,0 +1,50 @@
+import pytest
+from types import SimpleNamespace
+
+from mhdata.merge.binary.items import ItemUpdater, DummyItemError
+from mhdata.merge.binary.quest_rewards import get_quest_rewards, get_quests_by_item
+
+ITEM_NAMES = { 1: 'Potion', 2: 'Herb', 3: 'Armor Sphere', 4: 'HARDUMMY' }
+
+class FakeItems:
+    def by_id(self, item_id):
+        return SimpleNamespace(id=item_id, name={ 'en': ITEM_NAMES[item_id] }, description={})
+
+def create_rem(rem_id, items, drop_mechanic=0):
+    "Creates a rem file from the (item id, qty, chance) triples of its filled slots"
+    return SimpleNamespace(id=rem_id, drop_mechanic=drop_mechanic, iter_items=lambda: iter(items))
+
+def create_quest(quest_id, rems):
+    return SimpleNamespace(id=quest_id, reward_data_list=rems)
+
+def test_rewards_are_grouped_and_ordered():
+    quest = create_quest(10, [
+        create_rem(1, [(1, 1, 40), (2, 3, 100), (3, 1, 10)]),
+        create_rem(2, [(2, 2, 50)], drop_mechanic=1)
+    ])
+
+    assert get_quest_rewards(quest, ItemUpdater(FakeItems())) == [
+        { 'group': 'A', 'item_en': 'Potion', 'stack': 1, 'percentage': 100 },
+        { 'group': 'A', 'item_en': 'Herb', 'stack': 3, 'percentage': 100 },
+        { 'group': 'A', 'item_en': 'Potion', 'stack': 1, 'percentage': 40 },
+        { 'group': 'A', 'item_en': 'Armor Sphere', 'stack': 1, 'percentage': 10 },
+        { 'group': 'B', 'item_en': 'Herb', 'stack': 2, 'percentage': 50 }
+    ]
+
+def test_dummy_items_skip_rewards():
+    quest = create_quest(10, [create_rem(1, [(1, 1, 50), (4, 1, 50), (2, 1, 50)])])
+    updater = ItemUpdater(FakeItems())
+
+    with pytest.raises(DummyItemError):
+        get_quest_rewards(quest, updater)
+    assert updater.encountered_item_ids == { 1 }
+
+def test_quests_by_item_lists_duplicate_quest_ids_once():
+    quests = [
+        create_quest(10, [create_rem(1, [(1, 1, 50), (1, 2, 50)]), create_rem(2, [(2, 1, 100)])]),
+        create_quest(11, []),
+        create_quest(12, [create_rem(3, [(1, 1, 100)])]),
+        create_quest(10, [create_rem(4, [(1, 1, 100), (3, 1, 100)])])
+    ]
+
+    assert get_quests_by_item(quests) == { 1: [10, 12], 2: [10], 3: [10] }
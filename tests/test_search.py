@@ -0,0 +1,43 @@
+import sqlite3
+import pytest
+
+import mhdata.sql as db
+from mhdata.build import search
+
+@pytest.fixture()
+def conn(tmpdir):
+    path = str(tmpdir.join('search.db'))
+    sessionbuilder = db.recreate_database(path)
+    with db.session_scope(sessionbuilder) as session:
+        names = [
+            (1, 'Potion', '回復薬', 'Restores a small amount of health.'),
+            (2, 'Mega Potion', '回復薬グレート', 'Restores a moderate amount of health.'),
+            (3, 'Antidote', '解毒薬', 'Cures poison.')
+        ]
+        for item_id, name_en, name_ja, description in names:
+            item = db.Item(id=item_id)
+            item.translations.append(db.ItemText(lang_id='en', name=name_en, description=description))
+            item.translations.append(db.ItemText(lang_id='ja', name=name_ja, description=None))
+            session.add(item)
+
+    conn = sqlite3.connect(path)
+    for statement in search.index_statements():
+        conn.execute(statement)
+    yield conn
+    conn.close()
+
+def test_search_matches_word_prefix(conn):
+    results = search.search(conn, 'pot', 'en')
+    assert [r[1] for r in results] == [1, 2], "expected both potions, ordered by relevance"
+
+def test_search_matches_descriptions(conn):
+    results = search.search(conn, 'poison', 'en')
+    assert [r[1] for r in results] == [3]
+
+def test_search_cjk_substring(conn):
+    results = search.search(conn, '復薬グ', 'ja')
+    assert [r[2] for r in results] == ['回復薬グレート']
+
+def test_search_cjk_short_query(conn):
+    results = search.search(conn, '回復', 'ja')
+    assert sorted(r[1] for r in results) == [1, 2]
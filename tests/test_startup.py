@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+root_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Modules that commands which don't load data or build shouldn't import
+heavy_modules = ('sqlalchemy', 'marshmallow', 'requests', 'Crypto', 'regex')
+
+def get_imports(*args):
+    "Runs a script with -X importtime, and returns the names of the top level modules it imported"
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args],
+        cwd=root_path, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        name = line[len('import time:'):].split('|')[2]
+        if not name.startswith('  '):
+            imports.append(name.strip())
+    return imports
+
+@pytest.mark.parametrize('args', [
+    ('build.py', '--help'),
+    ('build.py', 'diff', '--help'),
+    ('repair.py', '--help'),
+    ('binary.py', '--help'),
+    ('binary.py', 'dump', '--help'),
+    ('binary.py', 'update', '--help')
+])
+def test_light_commands_skip_heavy_imports(args):
+    imports = get_imports(*args)
+    loaded_heavy = [name for name in imports if name.split('.')[0] in heavy_modules]
+    assert not loaded_heavy, f"{' '.join(args)} imported {', '.join(loaded_heavy)}"
@@ -0,0 +1,29 @@
+from benchmarks import synthetic
+
+def test_scaled_rows_have_unique_names_and_ids():
+    rows = [
+        { 'id': '1', 'name_en': 'Potion', 'name_ja': '回復薬', 'category': 'item' },
+        { 'id': '2', 'name_en': 'Mega Potion', 'name_ja': None, 'category': 'item' },
+    ]
+    scaled = synthetic.scale_rows(rows, 3, id_stride=10)
+
+    assert len(scaled) == 6
+    assert len(set(r['id'] for r in scaled)) == 6, "ids should be unique"
+    assert len(set(r['name_en'] for r in scaled)) == 6, "names should be unique"
+    assert scaled[2]['name_ja'] == '回復薬 #1'
+    assert scaled[3]['name_ja'] is None, "empty names should stay empty"
+    assert scaled[4]['category'] == 'item', "non-name columns should be unchanged"
+
+def test_scaled_references_match_names():
+    rows = [{ 'base_name_en': 'Rathalos', 'item_en': 'Rathalos Scale', 'condition_en': 'Carve' }]
+    scaled = synthetic.scale_rows(rows, 2, id_stride=10)
+
+    assert scaled[1]['base_name_en'] == 'Rathalos #1'
+    assert scaled[1]['item_en'] == 'Rathalos Scale #1'
+    assert scaled[1]['condition_en'] == 'Carve', "references to unscaled data should be unchanged"
+
+def test_scaled_ids_default_to_offsets_past_the_largest_id():
+    rows = [{ 'id': '3', 'name_en': 'Potion' }, { 'id': '7', 'name_en': 'Herb' }]
+    scaled = synthetic.scale_rows(rows, 2)
+
+    assert [r['id'] for r in scaled] == ['3', '7', '11', '15']
@@ -0,0 +1,89 @@
+from mhdata.load import validation
+from mhdata.load.validation import ValidationEngine, LOAD, MERGE, BUILD
+
+def create_engine():
+    engine = ValidationEngine()
+
+    @engine.rule(LOAD, file='items/item_base.csv')
+    def load_rule(data, report):
+        report.warning("load warning", row='Potion', column='rarity')
+
+    @engine.rule(MERGE)
+    def merge_rule(data, report):
+        report.error("merge error", file='items/item_combination_list.csv', row=2)
+        report.error("merge error", file='items/item_combination_list.csv', row=2)
+
+    @engine.rule(BUILD)
+    def build_rule(data, report):
+        raise KeyError('missing')
+
+    return engine
+
+def test_stages_are_cumulative():
+    engine = create_engine()
+    assert [r.name for r in engine.rules_for(LOAD)] == ['load_rule']
+    assert [r.name for r in engine.rules_for(MERGE)] == ['load_rule', 'merge_rule']
+    assert len(engine.rules_for(BUILD)) == 3
+
+def test_collects_all_diagnostics():
+    diagnostics = create_engine().run(None, BUILD)
+
+    assert [d.rule for d in diagnostics] == ['load_rule', 'merge_rule', 'build_rule'], \
+        "duplicates should be removed, and a failing rule reported as an error"
+    assert str(diagnostics[0]) == "items/item_base.csv (Potion, rarity): load warning"
+    assert diagnostics[1].file == 'items/item_combination_list.csv'
+    assert len(validation.errors(diagnostics)) == 2
+
+def create_row_engine():
+    engine = ValidationEngine()
+
+    @engine.rule(MERGE, each='combos')
+    def combo_rule(data, combo, report):
+        if not report.exists('item_map', combo['result']):
+            report.error(f"{combo['result']} doesn't exist", row=combo['result'])
+
+    return engine
+
+def test_row_rules_look_up_other_collections():
+    from types import SimpleNamespace
+    from mhdata.io import DataMap
+
+    data = SimpleNamespace()
+    data.item_map = DataMap()
+    data.item_map.insert({ 'name': { 'en': 'Potion' } })
+    data.combos = [{ 'result': 'Potion' }, { 'result': 'Mega Potion' }]
+
+    engine = create_row_engine()
+    assert [d.row for d in engine.run(data)] == ['Mega Potion']
+    assert engine.run_row(data, 'combos', { 'result': 'Potion' }) == []
+
+def test_reward_percentages():
+    from types import SimpleNamespace
+    from mhdata.io import DataMap
+    from mhdata.load.validate import validate_reward_percentages
+
+    def reward(condition, percentage):
+        return { 'rank': 'LR', 'condition_en': condition, 'item_en': 'Potion', 'percentage': percentage }
+
+    data = SimpleNamespace(monster_map=DataMap(), quest_map=DataMap())
+    data.monster_map.insert({ 'name': { 'en': 'Rathalos' }, 'rewards': [
+        reward('Carve', 100),
+        reward('Tail Carve', 70), reward('Tail Carve', 20),
+        reward('Capture', None), reward('Capture', 50), reward('Capture', 50),
+        reward('Shiny Drop', None)
+    ]})
+    data.quest_map.insert({ 'name': { 'en': 'Quest' }, 'rewards': [
+        { 'group': 'A', 'item_en': 'Potion', 'percentage': 100 },
+        { 'group': 'A', 'item_en': 'Potion', 'percentage': 60 },
+        { 'group': 'A', 'item_en': 'Potion', 'percentage': 40 }
+    ]})
+
+    report = validation.DiagnosticReport('rewards')
+    validate_reward_percentages(data, report)
+
+    assert [(d.severity, d.file, d.row) for d in report.diagnostics] == [
+        ('warning', 'monsters/monster_rewards.csv', 'Rathalos'),
+        ('error', 'monsters/monster_rewards.csv', 'Rathalos')
+    ]
+    assert 'Tail Carve' in report.diagnostics[0].message
+    assert 'Capture' in report.diagnostics[1].message
@@ -0,0 +1,54 @@
+from mhdata.build.watch import BuildWatcher
+
+def create_watcher():
+    watcher = BuildWatcher('unused.db')
+    watcher.collection_files = {
+        'item_map': { 'items/item_base.csv', 'items/item_base_translations.csv' },
+        'armor_map': { 'armors/armor_base.csv' },
+        'charm_map': { 'charms/charm_base.csv' },
+        'tool_map': { 'tools/tool_base.csv' }
+    }
+    watcher.step_reads = {
+        'build_items': { 'item_map' },
+        'build_armor': { 'armor_map', 'item_map' },
+        'build_charms': { 'charm_map', 'item_map' },
+        'build_tools': { 'tool_map' },
+        'build_search_index': set()
+    }
+    watcher.step_tables = {
+        'build_items': { 'item', 'item_text' },
+        'build_armor': { 'armor', 'recipe_item' },
+        'build_charms': { 'charm', 'recipe_item' },
+        'build_tools': { 'tool', 'tool_text' },
+        'build_search_index': set()
+    }
+    return watcher
+
+def test_changed_files_map_to_collections():
+    watcher = create_watcher()
+    assert watcher.collections_for({ 'items/item_base_translations.csv' }) == { 'item_map' }
+    assert watcher.collections_for({ 'decorations/decoration_droprates.csv' }) is None, \
+        "unknown files should trigger a full reload"
+
+def test_only_affected_steps_are_rebuilt():
+    watcher = create_watcher()
+    assert watcher.steps_for({ 'tool_map' }) == { 'build_tools', 'build_search_index' }
+    assert watcher.steps_for({ 'armor_map' }) == { 'build_armor', 'build_search_index' }, \
+        "recipes are found through foreign keys, so charms don't need a rebuild"
+    assert watcher.steps_for({ 'item_map' }) == { 'build_items', 'build_armor', 'build_charms', 'build_search_index' }
+    assert watcher.steps_for(set()) == set()
+
+def test_failed_updates_are_rebuilt_once_valid():
+    watcher = create_watcher()
+    rebuilt = []
+    results = iter([False, True])
+    watcher.reload = lambda files: set(watcher.collections_for(files))
+    watcher.validate = lambda: next(results)
+    watcher.rebuild_steps = lambda steps: rebuilt.append(steps)
+
+    assert watcher.update({ 'armors/armor_base.csv' }) is None
+    assert rebuilt == []
+
+    assert watcher.update({ 'tools/tool_base.csv' }) is not None
+    assert rebuilt == [{ 'build_armor', 'build_tools', 'build_search_index' }]
+    assert watcher.pending == set()
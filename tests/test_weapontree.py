@@ -0,0 +1,45 @@
+from mhdata.io import DataMap
+from mhdata.load.weapontree import WeaponTree
+
+def create_weapon_map(rows):
+    weapon_map = DataMap(languages=['en'], keys_ex=['weapon_type'])
+    for name, weapon_type, previous in rows:
+        weapon_map.insert({ 'name': { 'en': name }, 'weapon_type': weapon_type, 'previous_en': previous })
+    return weapon_map
+
+def test_tree_structure():
+    weapon_map = create_weapon_map([
+        ('Iron Sword I', 'great-sword', None),
+        ('Iron Sword II', 'great-sword', 'Iron Sword I'),
+        ('Buster Sword I', 'great-sword', 'Iron Sword I'),
+        ('Iron Sword I', 'long-sword', None),
+        ('Iron Katana I', 'long-sword', 'Iron Sword I')
+    ])
+    tree = WeaponTree(weapon_map)
+    ids = { (e.name('en'), e['weapon_type']): e.id for e in weapon_map.values() }
+    gs_root = ids[('Iron Sword I', 'great-sword')]
+    ls_root = ids[('Iron Sword I', 'long-sword')]
+
+    assert tree.roots('great-sword') == [gs_root]
+    assert tree.children_of(gs_root) == [ids[('Iron Sword II', 'great-sword')], ids[('Buster Sword I', 'great-sword')]]
+    assert tree.parent_of(ids[('Iron Katana I', 'long-sword')]) == ls_root, "parents resolve within the weapon type"
+    assert tree.depth_of(ids[('Buster Sword I', 'great-sword')]) == 1
+    assert not tree.is_final(gs_root)
+    assert tree.ordered('long-sword') == [ls_root, ids[('Iron Katana I', 'long-sword')]]
+    assert not tree.orphans and not tree.cycles
+
+def test_finds_orphans_and_cycles():
+    weapon_map = create_weapon_map([
+        ('Root', 'bow', None),
+        ('Lost', 'bow', 'Missing Bow'),
+        ('Cycle A', 'bow', 'Cycle B'),
+        ('Cycle B', 'bow', 'Cycle A'),
+        ('Cycle Child', 'bow', 'Cycle B'),
+    ])
+    tree = WeaponTree(weapon_map)
+
+    assert tree.orphans == [(weapon_map.id_of('en', 'Lost', 'bow'), 'Missing Bow')]
+    assert len(tree.cycles) == 1
+    assert sorted(tree.cycles[0]) == sorted([weapon_map.id_of('en', 'Cycle A', 'bow'), weapon_map.id_of('en', 'Cycle B', 'bow')])
+    assert tree.depth_of(weapon_map.id_of('en', 'Cycle Child', 'bow')) is None
+    assert len(tree.ordered()) == 2, "orphans are roots, cycles are excluded"